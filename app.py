@@ -1,11 +1,14 @@
-from flask import Flask, request, jsonify
-from flask_cors import CORS
 import os
+if os.getenv('STARTUP_REPORT'):
+    # Record what every import costs; the report is logged once warm-up finishes
+    from src.utils import import_report
+    import_report.start()
+from flask import Flask, Response, request, jsonify
+from flask_cors import CORS
+import asyncio
 import logging
-from dotenv import load_dotenv
-from src.experts import SportsExpert, FoodExpert, AIExpert, SudoStarExpert
-from src.core.expert_selector import ExpertSelector
-from config.config import EXPERT_CONFIG, APP_CONFIG
+from src.api import ExpertService, response_headers
+from src.utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
 
 # Configure logging
 logging.basicConfig(
@@ -18,128 +21,84 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)
 
-# Global variables
-openai_api_key = None
-expert_system = None
+# Expert system shared by all requests of this worker
+service = ExpertService()
 
 def init_app():
     """Initialize the application and its dependencies"""
-    global openai_api_key, expert_system
-    
+    return service.init()
+
+def warm_up():
+    """Build the expert system before the first request, called from gunicorn.conf.py"""
+    if init_app():
+        # Each request runs on its own event loop here, so connections opened now
+        # could not be reused; only caches are warmed
+        asyncio.run(service.warm_up(preconnect=False))
+
+def respond(result):
+    """Turn a service (payload, status) result into a Flask response"""
+    payload, status = result
+    return jsonify(payload), status, response_headers(payload)
+
+def iterate_async(agen):
+    """Drive an async generator from Flask's synchronous response iterator"""
+    loop = asyncio.new_event_loop()
     try:
-        # Load environment variables
-        load_dotenv()
-        
-        # Get OpenAI API key
-        openai_api_key = os.getenv('OPENAI_API_KEY')
-        if not openai_api_key:
-            logger.warning("OPENAI_API_KEY environment variable is not set")
-            return False
-            
-        # Initialize expert system only if needed
-        if expert_system is None:
-            expert_system = {
-                'sports': SportsExpert(EXPERT_CONFIG['sports']),
-                'food': FoodExpert(EXPERT_CONFIG['food']),
-                'ai': AIExpert(EXPERT_CONFIG['ai']),
-                'sudostar': SudoStarExpert(EXPERT_CONFIG['sudostar']),
-                'selector': ExpertSelector()
-            }
-            
-            logger.info("Expert system initialized successfully")
-        return True
-        
-    except Exception as e:
-        logger.error(f"Error initializing application: {str(e)}")
-        return False
+        while True:
+            try:
+                yield loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(agen.aclose())
+        loop.close()
 
 @app.route('/')
 def home():
-    is_initialized = init_app()
-    return jsonify({
-        'status': 'online',
-        'initialized': is_initialized,
-        'version': '1.0.0',
-        'config': {
-            'openai_api': 'configured' if openai_api_key else 'missing',
-            'expert_system': 'running' if expert_system else 'error'
-        }
-    })
+    return respond(service.home())
 
 @app.route('/health')
 def health():
-    is_initialized = init_app()
-    
-    response = {
-        'status': 'healthy' if is_initialized else 'unhealthy',
-        'services': {
-            'api': 'running',
-            'openai_api': 'configured' if openai_api_key else 'missing',
-            'expert_system': 'running' if expert_system else 'error'
-        }
-    }
-    
-    if not is_initialized:
-        response['error'] = 'System not properly initialized'
-    
-    return jsonify(response), 200 if is_initialized else 503
+    return respond(service.health())
+
+@app.route('/route/batch', methods=['POST'])
+async def route_batch():
+    return respond(await service.route_batch(request.get_json(silent=True)))
+
+@app.route('/metrics')
+def metrics():
+    body, status = service.metrics()
+    return Response(body, status=status, content_type=METRICS_CONTENT_TYPE)
+
+@app.route('/stats')
+def stats():
+    return respond(service.stats())
 
 @app.route('/ask', methods=['POST'])
 async def ask():
-    if not init_app():
-        return jsonify({
-            'status': 'error',
-            'error': 'System not properly initialized',
-            'code': 'INIT_ERROR'
-        }), 503
+    return respond(await service.ask(request.get_json(silent=True)))
 
-    try:
-        data = request.get_json()
-        if not data or 'question' not in data:
-            return jsonify({
-                'status': 'error',
-                'error': 'Question is required',
-                'code': 'MISSING_QUESTION'
-            }), 400
-
-        question = data['question']
-        logger.info(f"Received question: {question}")
-        
-        # Select expert and get response
-        expert_type, direct_response = await expert_system['selector'].select_expert(question)
-        logger.info(f"Selected expert: {expert_type}")
-        
-        response = None
-        if expert_type and expert_type in expert_system:
-            response = await expert_system[expert_type].get_response(question)
-        else:
-            response = direct_response
-
-        if not response:
-            return jsonify({
-                'status': 'error',
-                'error': 'Could not generate response',
-                'code': 'NO_RESPONSE'
-            }), 500
-
-        logger.info(f"Generated response for {expert_type} expert")
-        return jsonify({
-            'status': 'success',
-            'data': {
-                'answer': response,
-                'expert_type': expert_type or 'general'
-            }
-        })
-
-    except Exception as e:
-        logger.error(f"Error in /ask endpoint: {str(e)}")
-        return jsonify({
-            'status': 'error',
-            'error': str(e),
-            'code': 'INTERNAL_ERROR'
-        }), 500
+@app.route('/ask/batch', methods=['POST'])
+async def ask_batch():
+    return respond(await service.ask_batch(request.get_json(silent=True)))
+
+@app.route('/ask/async', methods=['POST'])
+def ask_async():
+    return respond(service.ask_async(request.get_json(silent=True)))
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    return respond(service.get_job(job_id))
+
+@app.route('/ask/stream', methods=['POST'])
+def ask_stream():
+    error, events = service.ask_stream(request.get_json(silent=True))
+    if error:
+        return respond(error)
+    return Response(iterate_async(events), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
 
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
     logger.info(f"Starting Flask app on port {port}")
-    app.run(host='0.0.0.0', port=port) 
\ No newline at end of file
+    warm_up()
+    app.run(host='0.0.0.0', port=port)
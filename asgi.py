@@ -0,0 +1,102 @@
+"""ASGI entry point
+
+Serves the same endpoints as app.py, but every worker runs one long-lived
+event loop, so many /ask calls can wait on upstream I/O at the same time and
+the OpenAI connection pool is reused across requests. Run with:
+
+    gunicorn asgi:app -k uvicorn.workers.UvicornWorker --workers 4
+"""
+import os
+if os.getenv('STARTUP_REPORT'):
+    # Record what every import costs; the report is logged once warm-up finishes
+    from src.utils import import_report
+    import_report.start()
+import json
+import logging
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from src.api import ExpertService, response_headers
+from src.utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+
+# Configure logging
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Expert system shared by all requests of this worker
+service = ExpertService()
+
+async def _get_json(request: Request):
+    """Parse the request body, None if it is not valid JSON"""
+    try:
+        return await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+
+def _respond(result) -> JSONResponse:
+    payload, status = result
+    return JSONResponse(payload, status_code=status, headers=response_headers(payload))
+
+async def home(request: Request) -> JSONResponse:
+    return _respond(service.home())
+
+async def health(request: Request) -> JSONResponse:
+    return _respond(service.health())
+
+async def metrics(request: Request) -> Response:
+    body, status = service.metrics()
+    return Response(body, status_code=status, headers={'Content-Type': METRICS_CONTENT_TYPE})
+
+async def stats(request: Request) -> JSONResponse:
+    return _respond(service.stats())
+
+async def ask(request: Request) -> JSONResponse:
+    return _respond(await service.ask(await _get_json(request)))
+
+async def ask_batch(request: Request) -> JSONResponse:
+    return _respond(await service.ask_batch(await _get_json(request)))
+
+async def ask_async(request: Request) -> JSONResponse:
+    return _respond(service.ask_async(await _get_json(request)))
+
+async def get_job(request: Request) -> JSONResponse:
+    return _respond(service.get_job(request.path_params['job_id']))
+
+async def ask_stream(request: Request) -> Response:
+    error, events = service.ask_stream(await _get_json(request))
+    if error:
+        return _respond(error)
+    return StreamingResponse(events, media_type='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+async def route_batch(request: Request) -> JSONResponse:
+    return _respond(await service.route_batch(await _get_json(request)))
+
+app = Starlette(
+    routes=[
+        Route('/', home),
+        Route('/health', health),
+        Route('/metrics', metrics),
+        Route('/stats', stats),
+        Route('/ask', ask, methods=['POST']),
+        Route('/ask/batch', ask_batch, methods=['POST']),
+        Route('/ask/async', ask_async, methods=['POST']),
+        Route('/jobs/{job_id}', get_job),
+        Route('/ask/stream', ask_stream, methods=['POST']),
+        Route('/route/batch', route_batch, methods=['POST'])
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    on_startup=[service.startup]
+)
+
+if __name__ == '__main__':
+    import uvicorn
+
+    port = int(os.getenv('PORT', 5000))
+    logger.info(f"Starting ASGI app on port {port}")
+    uvicorn.run(app, host='0.0.0.0', port=port)
@@ -0,0 +1,152 @@
+"""Throughput benchmark: Flask (WSGI) vs ASGI serving
+
+Starts a fake OpenAI-compatible upstream with a fixed latency, then runs the
+app under both serving modes with the same worker count and load-tests /ask.
+Questions are unique and outside every expert's keywords, so each request
+costs exactly one upstream routing call that answers directly; the numbers
+measure how many requests a worker can keep waiting on upstream I/O.
+
+Usage:
+    python benchmarks/bench_serving.py --workers 4 --concurrency 200 --requests 2000
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import statistics
+import subprocess
+import aiohttp
+from aiohttp import web
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = {
+    'flask': ['gunicorn', 'app:app'],
+    'asgi': ['gunicorn', 'asgi:app', '-k', 'uvicorn.workers.UvicornWorker']
+}
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+async def start_upstream(port: int, latency: float) -> web.AppRunner:
+    """Serve /v1/chat/completions with a direct routing answer after latency seconds"""
+    async def completions(request: web.Request) -> web.Response:
+        body = await request.json()
+        await asyncio.sleep(latency)
+        content = json.dumps({'experts': [], 'confidence': 0.95, 'answer': 'Merhaba!'})
+        return web.json_response({
+            'id': 'chatcmpl-bench',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'gpt-4'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop'
+            }],
+            'usage': {'prompt_tokens': 100, 'completion_tokens': 20, 'total_tokens': 120}
+        })
+
+    upstream = web.Application()
+    upstream.router.add_post('/v1/chat/completions', completions)
+    runner = web.AppRunner(upstream, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', port).start()
+    return runner
+
+async def wait_ready(session: aiohttp.ClientSession, url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(url) as resp:
+                if resp.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not become ready")
+
+async def load(url: str, total: int, concurrency: int, tag: str) -> dict:
+    """Send total /ask requests with at most concurrency in flight"""
+    latencies = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def client(session: aiohttp.ClientSession) -> None:
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                async with session.post(f"{url}/ask", json={'question': f"bugün hava nasıl {tag} {i}"}) as resp:
+                    await resp.read()
+                    if resp.status != 200:
+                        errors += 1
+                        continue
+            except aiohttp.ClientError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=300)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        await wait_ready(session, f"{url}/health")
+        started = time.perf_counter()
+        await asyncio.gather(*(client(session) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'ok': len(latencies),
+        'errors': errors,
+        'throughput': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': statistics.median(latencies) * 1000 if latencies else 0.0,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0
+    }
+
+async def run(args: argparse.Namespace) -> None:
+    upstream_port = free_port()
+    upstream = await start_upstream(upstream_port, args.latency)
+
+    env = dict(
+        os.environ,
+        OPENAI_API_KEY='bench-key',
+        OPENAI_BASE_URL=f"http://127.0.0.1:{upstream_port}/v1",
+        TAVILY_API_KEY='bench-key'
+    )
+
+    print(f"upstream latency {args.latency * 1000:.0f} ms, {args.workers} workers, "
+          f"concurrency {args.concurrency}, {args.requests} requests")
+    try:
+        for name in args.modes:
+            port = free_port()
+            cmd = SERVERS[name] + ['--workers', str(args.workers), '--bind', f"127.0.0.1:{port}",
+                                   '--timeout', '300', '--log-level', 'warning']
+            server = subprocess.Popen(cmd, cwd=ROOT, env=env,
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                result = await load(f"http://127.0.0.1:{port}", args.requests, args.concurrency, name)
+            finally:
+                server.terminate()
+                server.wait()
+            print(f"{name:>6}: {result['throughput']:8.1f} req/s  p50 {result['p50_ms']:8.1f} ms  "
+                  f"p99 {result['p99_ms']:8.1f} ms  ok {result['ok']}  errors {result['errors']}")
+    finally:
+        await upstream.cleanup()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--latency', type=float, default=0.2, help='Upstream latency in seconds')
+    parser.add_argument('--modes', nargs='+', choices=sorted(SERVERS), default=['flask', 'asgi'])
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == '__main__':
+    sys.exit(main())
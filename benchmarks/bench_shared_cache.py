@@ -0,0 +1,81 @@
+"""Response cache benchmark: per-worker Cache vs SharedCache
+
+Simulates gunicorn workers as processes answering a Zipf-distributed question
+stream, the way requests are spread across workers. Every miss stores the
+answer, as an expert would. Reports the hit rate each backend reaches and the
+cost of a lookup.
+
+Usage:
+    python benchmarks/bench_shared_cache.py --workers 4 --requests 20000 --questions 5000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+import multiprocessing
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.utils.cache import create_cache
+
+def zipf_stream(count: int, questions: int, skew: float, seed: int) -> list:
+    rng = random.Random(seed)
+    weights = [1 / (rank ** skew) for rank in range(1, questions + 1)]
+    return [f"soru {i}" for i in rng.choices(range(questions), weights=weights, k=count)]
+
+def worker(args: tuple) -> dict:
+    backend, path, stream = args
+    cache = create_cache('bench', ttl=3600, config={'backend': backend, 'path': path})
+    answer = 'x' * 400
+    hits = 0
+    lookups = []
+    for question in stream:
+        started = time.perf_counter()
+        value = cache.get(question)
+        lookups.append(time.perf_counter() - started)
+        if value is not None:
+            hits += 1
+        else:
+            cache.set(question, answer)
+    return {'hits': hits, 'lookups': lookups}
+
+def run(backend: str, args: argparse.Namespace) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), 'cache.sqlite3')
+    if backend == 'sqlite':
+        # Create the schema once before the workers race to do it
+        create_cache('bench', config={'backend': backend, 'path': path})
+    stream = zipf_stream(args.requests, args.questions, args.skew, args.seed)
+    # Round-robin the stream across workers, like a load balancer would
+    shards = [(backend, path, stream[i::args.workers]) for i in range(args.workers)]
+    with multiprocessing.Pool(args.workers) as pool:
+        results = pool.map(worker, shards)
+
+    lookups = sorted(t for result in results for t in result['lookups'])
+    return {
+        'hit_rate': sum(result['hits'] for result in results) / args.requests,
+        'mean_us': statistics.mean(lookups) * 1e6,
+        'p50_us': statistics.median(lookups) * 1e6,
+        'p99_us': lookups[int(len(lookups) * 0.99) - 1] * 1e6
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--questions', type=int, default=5000, help='Distinct questions')
+    parser.add_argument('--skew', type=float, default=1.0, help='Zipf exponent of question popularity')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{args.workers} workers, {args.requests} requests over {args.questions} questions, skew {args.skew}")
+    for backend in ('memory', 'sqlite'):
+        result = run(backend, args)
+        print(f"{backend:>6}: hit rate {result['hit_rate']:6.1%}  lookup mean {result['mean_us']:7.1f} us  "
+              f"p50 {result['p50_us']:7.1f} us  p99 {result['p99_us']:7.1f} us")
+
+if __name__ == '__main__':
+    sys.exit(main())
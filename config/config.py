@@ -36,11 +36,22 @@ APP_CONFIG = {
     'cache_ttl': 3600  # 1 hour
 }
 
+# Expert response cache backend: 'memory' keeps a cache per worker, 'sqlite'
+# shares one WAL file between the workers of a host behind an in-process L1
+CACHE_BACKEND_CONFIG = {
+    'backend': os.getenv('CACHE_BACKEND', 'memory'),
+    'path': os.getenv('CACHE_PATH', 'cache.sqlite3'),
+    'l1_size': 1000,
+    # Seconds a worker may serve an entry without checking the shared file
+    'l1_ttl': 30
+}
+
 # Expert System Configuration
 EXPERT_CONFIG = {
     'sports': {
         'cache_enabled': True,
         'cache_ttl': 3600,
+        'cache_backend': CACHE_BACKEND_CONFIG,
         'openai': {
             'model': 'gpt-4',
             'max_tokens': 300,
@@ -54,6 +65,7 @@ EXPERT_CONFIG = {
     'food': {
         'cache_enabled': True,
         'cache_ttl': 3600,
+        'cache_backend': CACHE_BACKEND_CONFIG,
         'openai': {
             'model': 'gpt-4',
             'max_tokens': 300,
@@ -67,6 +79,7 @@ EXPERT_CONFIG = {
     'ai': {
         'cache_enabled': True,
         'cache_ttl': 3600,
+        'cache_backend': CACHE_BACKEND_CONFIG,
         'openai': {
             'model': 'gpt-4',
             'max_tokens': 300,
@@ -80,6 +93,7 @@ EXPERT_CONFIG = {
     'sudostar': {
         'cache_enabled': True,
         'cache_ttl': 3600,
+        'cache_backend': CACHE_BACKEND_CONFIG,
         'openai': {
             'model': 'gpt-4',
             'max_tokens': 300,
@@ -91,4 +105,165 @@ EXPERT_CONFIG = {
 # System Messages
 SYSTEM_MESSAGES = {
     'openai_prompt': "Sen profesyonel ve arkadaş canlısı bir asistansın. En fazla 3 kısa cümle kullanarak, özlü ve yararlı yanıtlar vermelisin. Emoji kullanabilirsin."
-} 
\ No newline at end of file
+} 
+
+# Expert Routing Configuration
+ROUTING_CONFIG = {
+    'local_classifier': {
+        'enabled': True,
+        # Queries classified at or above this confidence skip the LLM router
+        'threshold': 0.6,
+        # Fraction of local hits also sent to the LLM to measure accuracy above the threshold
+        'shadow_rate': 0.0
+    },
+    'cache': {
+        'enabled': True,
+        'max_size': 5000,
+        'ttl': 3600
+    },
+    'cascade': {
+        # Cheaper router models tried in order before gpt-4
+        'enabled': True,
+        'models': ['gpt-3.5-turbo'],
+        # Lower self-reported confidence escalates to the next model
+        'min_confidence': 0.7
+    },
+    'batch': {
+        # Queries per request on /route/batch
+        'max_queries': 500,
+        # Budgets for a single batch routing prompt; larger backlogs are split
+        'max_prompt_tokens': 3000,
+        'max_items': 40,
+        'tokens_per_answer': 60
+    },
+    'fanout': {
+        # Answer cross-domain questions with several experts at once
+        'enabled': True,
+        # 'first' keeps the first good answer and cancels the rest, 'merge' joins every good answer
+        'strategy': 'first',
+        # Experts below this routing weight are not asked
+        'min_weight': 0.25,
+        # With 'merge', secondary experts below this weight are not asked either
+        'merge_min_weight': 0.4,
+        'max_experts': 2,
+        # Shared deadline in seconds for all fanned-out experts
+        'deadline': 20.0
+    },
+    'single_flight': {
+        # Concurrent cache misses for the same question share one routing call
+        'enabled': True
+    },
+    'speculation': {
+        # 'off', 'likely' (local classifier's best guess) or 'all' experts. Off until an
+        # expert has a local knowledge stage: overlapping only the cache lookup saves ~0.1 ms
+        'mode': 'off'
+    },
+    'warmup': {
+        # Open OpenAI connections at worker startup (ASGI only, Flask runs a loop per request)
+        'preconnect': True,
+        # Connections opened per OpenAI connection pool
+        'connections': 4,
+        'timeout': 5.0,
+        # Experts built at startup; the others are imported and built on their first question
+        'preload_experts': [],
+        # Popular questions whose routes are cached before the first request
+        'questions': [
+            'SudoStar nedir?',
+            'SudoStar minimum çekim tutarı nedir?',
+            'Galatasaray maçı ne zaman?',
+            'Fenerbahçe maç sonucu',
+            'Menemen tarifi',
+            'Yapay zeka nedir?'
+        ]
+    },
+    'openai_pool': {
+        # One HTTP connection pool per event loop, endpoint and API key, shared by all experts
+        'max_connections': 100,
+        'max_keepalive_connections': 32,
+        # Seconds idle connections stay open for reuse
+        'keepalive_expiry': 60.0,
+        'connect_timeout': 5.0,
+        # SDK retries stay off: openai_retry below retries with backoff behind a circuit breaker
+        'max_retries': 0
+    },
+    'openai_rate_limit': {
+        # Client-side limit below the organisation quota, so bursts queue here instead of
+        # drawing 429s. Budgets are per process: give each worker, and the Twitter bot,
+        # its share of the quota.
+        'enabled': os.getenv('OPENAI_RATE_LIMIT', 'true').lower() == 'true',
+        'requests_per_minute': int(os.getenv('OPENAI_RPM', '500')),
+        'tokens_per_minute': int(os.getenv('OPENAI_TPM', '90000'))
+    },
+    'completion_cache': {
+        # Identical completions (model, prompts, temperature, max_tokens) served from a
+        # SQLite file shared by the workers; used by the router and document grading
+        'enabled': os.getenv('COMPLETION_CACHE', 'false').lower() == 'true',
+        'path': os.getenv('COMPLETION_CACHE_PATH', 'completions.sqlite3'),
+        'ttl': 86400,
+        'l1_size': 1000,
+        'l1_ttl': 300
+    },
+    'openai_hedge': {
+        # A gpt-4 call slower than the 95th percentile of recent ones gets a duplicate
+        # request; the first answer wins and the other is cancelled. Used by the
+        # router and the expert answer calls.
+        'enabled': os.getenv('OPENAI_HEDGE', 'false').lower() == 'true',
+        'percentile': 0.95,
+        'window': 200,
+        'min_samples': 20,
+        'min_delay': 0.5,
+        # Extra requests are capped at 5% of calls, at most 10 in a burst
+        'max_ratio': 0.05,
+        'burst': 10.0
+    },
+    'openai_retry': {
+        # Attempts per completion, including the first, within the caller's deadline
+        'max_attempts': 3,
+        # Full-jitter exponential backoff; a Retry-After header is honoured as a floor
+        'base_delay': 0.5,
+        'max_delay': 8.0,
+        # Consecutive failures of one model that open its circuit, and seconds it stays open
+        'failure_threshold': 5,
+        'reset_timeout': 30.0
+    },
+    'deadline': {
+        # Seconds a single /ask request may take end to end
+        'total': 25.0,
+        # Share of the remaining time one router model call may use
+        'routing_share': 0.3
+    },
+    'admission': {
+        # Shed /ask load per worker before requests queue up behind a slow upstream
+        'enabled': True,
+        'max_in_flight': 64,
+        # Reject queued requests when the estimated time to answer exceeds this many seconds;
+        # kept above deadline.total so one request cut at the deadline cannot exceed it alone
+        'max_wait': 30.0,
+        # Requests expected to make progress at once
+        'concurrency': 32,
+        # Weight of the newest latency in the moving average
+        'ewma_alpha': 0.2
+    },
+    'jobs': {
+        # Background jobs behind /ask/async and /jobs/<id>
+        'enabled': True,
+        # 'memory' (per worker) or 'sqlite' (shared by workers, survives restarts)
+        'store': 'memory',
+        'path': 'jobs.sqlite3',
+        # Jobs running at once per worker, and queued plus running jobs accepted
+        'workers': 4,
+        'max_queued': 100,
+        # Seconds a job may take, and seconds finished jobs are kept
+        'deadline': 120.0,
+        'ttl': 3600,
+        # Lease on a worker's unfinished jobs, renewed while it runs; jobs whose
+        # lease expired are taken over at worker startup
+        'stale_after': 300
+    },
+    'ask_batch': {
+        # Questions per request on /ask/batch
+        'max_questions': 50,
+        # Expert pipelines running at once for one batch
+        'concurrency': 8
+    }
+}
@@ -0,0 +1,14 @@
+"""Gunicorn configuration
+
+Builds the expert system in every worker right after it loads the app, so the
+first request does not pay for it and /health only reports readiness. The
+ASGI app (asgi:app) warms up in its own startup event instead.
+"""
+import sys
+
+def post_worker_init(worker):
+    """Run the app module's warm_up hook, if it has one"""
+    module = sys.modules.get(worker.app.app_uri.split(':')[0])
+    warm_up = getattr(module, 'warm_up', None)
+    if warm_up:
+        warm_up()
@@ -0,0 +1,4 @@
+"""HTTP API shared by the Flask (WSGI) and ASGI entry points"""
+from .service import ExpertService, response_headers
+
+__all__ = ['ExpertService', 'response_headers']
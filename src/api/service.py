@@ -0,0 +1,568 @@
+"""Expert system service behind the HTTP endpoints
+
+Request handling lives here so app.py (Flask, WSGI) and asgi.py (Starlette)
+serve the same contract; the entry points only translate requests and
+responses. Handlers return (payload, status code).
+"""
+import os
+import time
+import json
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from dotenv import load_dotenv
+from src.experts.registry import ExpertRegistry
+from src.core.expert_selector import ExpertSelector
+from src.core.expert_dispatcher import ExpertDispatcher
+from src.core.admission import AdmissionController
+from src.core.jobs import JobRunner, create_job_store
+from src.utils.deadline import Deadline
+from src.utils import import_report
+from src.utils import metrics
+from src.utils import rate_limiter
+from src.utils.openai_client import (
+    configure_completion_cache, configure_hedging, configure_pool, configure_rate_limit, configure_retries,
+    get_pool_stats
+)
+from config.config import EXPERT_CONFIG, ROUTING_CONFIG
+
+logger = logging.getLogger(__name__)
+
+Response = Tuple[Dict[str, Any], int]
+
+def error_response(error: str, code: str, status: int, retry_after: Optional[int] = None) -> Response:
+    """Build an error payload
+
+    Args:
+        error (str): Error message
+        code (str): Machine readable error code
+        status (int): HTTP status code
+        retry_after (int, optional): Seconds the client should wait before retrying,
+            sent as the Retry-After header. Defaults to None.
+
+    Returns:
+        Response: Error payload and status code
+    """
+    payload = {
+        'status': 'error',
+        'error': error,
+        'code': code
+    }
+    if retry_after is not None:
+        payload['retry_after'] = retry_after
+    return payload, status
+
+def response_headers(payload: Dict[str, Any]) -> Dict[str, str]:
+    """Get the HTTP headers an entry point should send with a payload
+
+    Args:
+        payload (Dict[str, Any]): Response payload
+
+    Returns:
+        Dict[str, str]: Extra response headers
+    """
+    if 'retry_after' in payload:
+        return {'Retry-After': str(payload['retry_after'])}
+    return {}
+
+INIT_ERROR = ('System not properly initialized', 'INIT_ERROR', 503)
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Format a server-sent event
+
+    Args:
+        event (str): Event name
+        data (Dict[str, Any]): Event data, sent as JSON
+
+    Returns:
+        str: Event in text/event-stream format
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+class ExpertService:
+    """Holds the expert system and implements the API endpoints"""
+
+    def __init__(self):
+        """Initialize service"""
+        self.openai_api_key: Optional[str] = None
+        self.expert_system: Optional[Dict[str, Any]] = None
+        # Set once the expert system is built; /health reports it without building anything
+        self.ready = False
+        self.jobs: Optional[JobRunner] = None
+        self._job_system: Optional[Dict[str, Any]] = None
+
+        admission_config = ROUTING_CONFIG.get('admission', {})
+        self.admission = None
+        if admission_config.get('enabled', False):
+            self.admission = AdmissionController(admission_config)
+
+    def init(self) -> bool:
+        """Initialize the application and its dependencies
+
+        Normally called once per worker at startup. Request handlers only call it
+        when no startup hook ran, e.g. under the Flask development server.
+
+        Returns:
+            bool: True if the expert system is ready
+        """
+        if self.ready:
+            return True
+
+        try:
+            started_at = time.perf_counter()
+
+            # Load environment variables
+            load_dotenv()
+
+            # Get OpenAI API key
+            self.openai_api_key = os.getenv('OPENAI_API_KEY')
+            if not self.openai_api_key:
+                logger.warning("OPENAI_API_KEY environment variable is not set")
+                return False
+
+            # Initialize expert system only if needed
+            if self.expert_system is None:
+                configure_pool(ROUTING_CONFIG.get('openai_pool', {}))
+                configure_retries(ROUTING_CONFIG.get('openai_retry', {}))
+                configure_rate_limit(ROUTING_CONFIG.get('openai_rate_limit', {}))
+                configure_completion_cache(ROUTING_CONFIG.get('completion_cache', {}))
+                configure_hedging(ROUTING_CONFIG.get('openai_hedge', {}))
+                self.expert_system = self._build_expert_system()
+                logger.info(f"Expert system initialized in {(time.perf_counter() - started_at) * 1000:.0f} ms")
+
+            jobs_config = ROUTING_CONFIG.get('jobs', {})
+            if self.jobs is None and jobs_config.get('enabled', True):
+                self.jobs = JobRunner(create_job_store(jobs_config), self._run_job, jobs_config)
+                self.jobs.start()
+
+            self.ready = True
+            return True
+
+        except Exception as e:
+            logger.error(f"Error initializing application: {str(e)}")
+            return False
+
+    @staticmethod
+    def _build_expert_system() -> Dict[str, Any]:
+        """Build the selector, the dispatcher and a registry that builds experts on first use
+
+        Returns:
+            Dict[str, Any]: 'experts' registry, 'selector' and 'dispatcher'
+        """
+        experts = ExpertRegistry(EXPERT_CONFIG)
+        selector = ExpertSelector(ROUTING_CONFIG)
+        return {
+            'experts': experts,
+            'selector': selector,
+            'dispatcher': ExpertDispatcher(experts, selector, ROUTING_CONFIG)
+        }
+
+    async def _run_job(self, question: str) -> Dict[str, Any]:
+        """Answer a background job's question on the job loop
+
+        The job loop gets its own expert system: the request-serving one holds
+        connections bound to another event loop. Its OpenAI calls run at
+        background priority, so they yield the rate limit to /ask requests.
+
+        Args:
+            question (str): User question
+
+        Returns:
+            Dict[str, Any]: Answer and expert type
+        """
+        if self._job_system is None:
+            self._job_system = self._build_expert_system()
+
+        deadline = Deadline(ROUTING_CONFIG['jobs'].get('deadline', 120.0))
+        with rate_limiter.priority(rate_limiter.BACKGROUND):
+            expert_type, response = await self._job_system['dispatcher'].answer(question, deadline)
+        if not response:
+            raise RuntimeError('Could not generate response')
+        return {
+            'answer': response,
+            'expert_type': expert_type or 'general'
+        }
+
+    async def warm_up(self, preconnect: bool = True) -> None:
+        """Warm caches and upstream connections after init
+
+        Args:
+            preconnect (bool, optional): Open OpenAI connections now. Only useful when
+                requests run on the calling event loop. Defaults to True.
+        """
+        if not self.ready:
+            return
+
+        warmup_config = ROUTING_CONFIG.get('warmup', {})
+        started_at = time.perf_counter()
+
+        experts = self.expert_system['experts']
+        preloaded = experts.preload(warmup_config.get('preload_experts', []))
+        cached = self.expert_system['selector'].warm_up(warmup_config.get('questions', []))
+
+        connected = 0
+        if preconnect and warmup_config.get('preconnect', True):
+            clients = self.expert_system['selector'].get_clients() + [
+                expert.openai_client for expert in experts.loaded().values()
+            ]
+            # Clients share a connection pool per endpoint and key; open connections once per pool
+            pools = {client.pool_key: client for client in clients}
+            connections = warmup_config.get('connections', 4)
+            try:
+                results = await asyncio.wait_for(
+                    asyncio.gather(*(client.warm_up(connections) for client in pools.values())),
+                    timeout=warmup_config.get('timeout', 5.0)
+                )
+                connected = sum(results) * connections
+            except asyncio.TimeoutError:
+                logger.warning("Timed out opening OpenAI connections during warm-up")
+
+        logger.info(
+            f"Warm-up finished in {(time.perf_counter() - started_at) * 1000:.0f} ms: "
+            f"{preloaded} experts loaded, {cached} routes cached, {connected} connections opened"
+        )
+        # Logs the import report if STARTUP_REPORT started one
+        import_report.stop_and_log()
+
+    async def startup(self) -> None:
+        """Build the expert system and warm it up on the serving event loop"""
+        if self.init():
+            await self.warm_up()
+
+    def home(self) -> Response:
+        return {
+            'status': 'online',
+            'initialized': self.ready,
+            'version': '1.0.0',
+            'config': {
+                'openai_api': 'configured' if self.openai_api_key else 'missing',
+                'expert_system': 'running' if self.expert_system else 'error'
+            }
+        }, 200
+
+    def health(self) -> Response:
+        is_initialized = self.ready
+
+        response = {
+            'status': 'healthy' if is_initialized else 'unhealthy',
+            'services': {
+                'api': 'running',
+                'openai_api': 'configured' if self.openai_api_key else 'missing',
+                'expert_system': 'running' if self.expert_system else 'error'
+            }
+        }
+
+        if not is_initialized:
+            response['error'] = 'System not properly initialized'
+
+        return response, 200 if is_initialized else 503
+
+    def metrics(self) -> Tuple[str, int]:
+        """Render metrics in the Prometheus text format
+
+        Never builds the expert system, so scrapes work before the worker is ready.
+
+        Returns:
+            Tuple[str, int]: Exposition text (metrics.CONTENT_TYPE) and status code
+        """
+        if self.admission:
+            metrics.IN_FLIGHT.set(self.admission.in_flight)
+        if self.jobs:
+            metrics.JOBS_PENDING.set(self.jobs.get_stats()['pending'])
+        if self.expert_system:
+            metrics.EXPERTS_LOADED.set(len(self.expert_system['experts'].loaded()))
+        return metrics.REGISTRY.render(), 200
+
+    def stats(self) -> Response:
+        if not self.init():
+            return error_response(*INIT_ERROR)
+
+        return {
+            'status': 'success',
+            'data': {
+                'routing': self.expert_system['selector'].get_stats(),
+                'dispatch': self.expert_system['dispatcher'].get_stats(),
+                'admission': self.admission.get_stats() if self.admission else None,
+                'jobs': self.jobs.get_stats() if self.jobs else None,
+                'openai_pool': get_pool_stats(),
+                # Only experts that answered something are built; the rest are not loaded yet
+                'experts': {
+                    expert_type: expert.get_stats()
+                    for expert_type, expert in self.expert_system['experts'].loaded().items()
+                },
+                'expert_load_ms': self.expert_system['experts'].load_times
+            }
+        }, 200
+
+    async def ask(self, data: Optional[Dict[str, Any]]) -> Response:
+        if not self.init():
+            return error_response(*INIT_ERROR)
+
+        try:
+            if not data or 'question' not in data:
+                return error_response('Question is required', 'MISSING_QUESTION', 400)
+
+            question = data['question']
+            logger.info(f"Received question: {question}")
+
+            admitted_at = self.admission.admit() if self.admission else None
+            if self.admission and admitted_at is None:
+                return await self._shed(question)
+
+            try:
+                # Select expert and get response within the request deadline
+                deadline = Deadline(ROUTING_CONFIG['deadline']['total'])
+                expert_type, response = await self.expert_system['dispatcher'].answer(question, deadline)
+            finally:
+                if admitted_at is not None:
+                    self.admission.release(admitted_at)
+            logger.info(f"Selected expert: {expert_type}")
+
+            if not response:
+                return error_response('Could not generate response', 'NO_RESPONSE', 500)
+
+            logger.info(f"Generated response for {expert_type} expert")
+            return {
+                'status': 'success',
+                'data': {
+                    'answer': response,
+                    'expert_type': expert_type or 'general'
+                }
+            }, 200
+
+        except Exception as e:
+            logger.error(f"Error in /ask endpoint: {str(e)}")
+            return error_response(str(e), 'INTERNAL_ERROR', 500)
+
+    def ask_async(self, data: Optional[Dict[str, Any]]) -> Response:
+        if not self.init():
+            return error_response(*INIT_ERROR)
+
+        if not self.jobs:
+            return error_response('Background jobs are disabled', 'JOBS_DISABLED', 404)
+
+        try:
+            if not data or 'question' not in data:
+                return error_response('Question is required', 'MISSING_QUESTION', 400)
+
+            job = self.jobs.submit(data['question'])
+            if job is None:
+                return error_response('Too many queued jobs, please retry later', 'QUEUE_FULL', 429, retry_after=30)
+
+            logger.info(f"Queued job {job['id']}")
+            return {
+                'status': 'success',
+                'data': {
+                    'job_id': job['id'],
+                    'job_status': job['status'],
+                    'poll_url': f"/jobs/{job['id']}"
+                }
+            }, 202
+
+        except Exception as e:
+            logger.error(f"Error in /ask/async endpoint: {str(e)}")
+            return error_response(str(e), 'INTERNAL_ERROR', 500)
+
+    def get_job(self, job_id: str) -> Response:
+        if not self.init():
+            return error_response(*INIT_ERROR)
+
+        if not self.jobs:
+            return error_response('Background jobs are disabled', 'JOBS_DISABLED', 404)
+
+        try:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return error_response('Job not found or expired', 'JOB_NOT_FOUND', 404)
+
+            data = {
+                'job_id': job['id'],
+                'job_status': job['status'],
+                'question': job['question'],
+                'created_at': job['created_at'],
+                'updated_at': job['updated_at']
+            }
+            if job['status'] == 'done':
+                data.update(job['result'])
+            elif job['status'] == 'failed':
+                data['error'] = job['error']
+
+            return {
+                'status': 'success',
+                'data': data
+            }, 200
+
+        except Exception as e:
+            logger.error(f"Error in /jobs endpoint: {str(e)}")
+            return error_response(str(e), 'INTERNAL_ERROR', 500)
+
+    async def _shed(self, question: str) -> Response:
+        """Answer an overloaded request from cache, or reject it with 429
+
+        Args:
+            question (str): User question
+
+        Returns:
+            Response: Cached answer, or error payload with retry_after
+        """
+        expert_type, response = await self.expert_system['dispatcher'].answer_cached(question)
+        if response:
+            self.admission.stats['served_from_cache'] += 1
+            return {
+                'status': 'success',
+                'data': {
+                    'answer': response,
+                    'expert_type': expert_type or 'general',
+                    'cached': True
+                }
+            }, 200
+
+        return error_response('Server is overloaded, please retry later', 'OVERLOADED', 429,
+                              retry_after=self.admission.retry_after())
+
+    def ask_stream(self, data: Optional[Dict[str, Any]]) -> Tuple[Optional[Response], Optional[AsyncIterator[str]]]:
+        """Validate a streaming question
+
+        Args:
+            data (Optional[Dict[str, Any]]): Request body
+
+        Returns:
+            Tuple[Optional[Response], Optional[AsyncIterator[str]]]: Error response, or the
+            server-sent events carrying the routing decision and the answer chunks
+        """
+        if not self.init():
+            return error_response(*INIT_ERROR), None
+
+        if not data or 'question' not in data:
+            return error_response('Question is required', 'MISSING_QUESTION', 400), None
+
+        # Optional cap on the answer length, e.g. 280 for a tweet; generation stops there
+        max_chars = data.get('max_chars')
+        if max_chars is not None and (not isinstance(max_chars, int) or isinstance(max_chars, bool) or max_chars < 1):
+            return error_response('max_chars must be a positive integer', 'INVALID_MAX_CHARS', 400), None
+
+        return None, self._stream_events(data['question'], max_chars)
+
+    async def _stream_events(self, question: str, max_chars: Optional[int] = None) -> AsyncIterator[str]:
+        logger.info(f"Received streaming question: {question}")
+        # Admitted here rather than in ask_stream so the slot is released by the
+        # same generator, however the client leaves; headers are already sent, so
+        # a shed stream ends with an error event instead of a 429
+        admitted_at = self.admission.admit() if self.admission else None
+        try:
+            if self.admission and admitted_at is None:
+                async for event in self._shed_stream(question):
+                    yield event
+                return
+
+            deadline = Deadline(ROUTING_CONFIG['deadline']['total'])
+            async for event, payload in self.expert_system['dispatcher'].answer_stream(question, max_chars, deadline):
+                yield format_sse(event, payload)
+        except Exception as e:
+            logger.error(f"Error in /ask/stream endpoint: {str(e)}")
+            yield format_sse('error', {'error': str(e), 'code': 'INTERNAL_ERROR'})
+        finally:
+            if admitted_at is not None:
+                self.admission.release(admitted_at)
+
+    async def _shed_stream(self, question: str) -> AsyncIterator[str]:
+        """Stream events of an overloaded request: a cached answer, or an error with retry_after
+
+        Args:
+            question (str): User question
+
+        Yields:
+            str: Server-sent events
+        """
+        expert_type, response = await self.expert_system['dispatcher'].answer_cached(question)
+        if response:
+            self.admission.stats['served_from_cache'] += 1
+            yield format_sse('route', {'expert_type': expert_type or 'general'})
+            yield format_sse('token', {'text': response})
+            yield format_sse('done', {'answered': True, 'cached': True})
+            return
+
+        yield format_sse('error', {
+            'error': 'Server is overloaded, please retry later',
+            'code': 'OVERLOADED',
+            'retry_after': self.admission.retry_after()
+        })
+
+    async def ask_batch(self, data: Optional[Dict[str, Any]]) -> Response:
+        if not self.init():
+            return error_response(*INIT_ERROR)
+
+        try:
+            questions = data.get('questions') if data else None
+            if not isinstance(questions, list) or not questions:
+                return error_response('Questions list is required', 'MISSING_QUESTIONS', 400)
+
+            max_questions = ROUTING_CONFIG['ask_batch']['max_questions']
+            if len(questions) > max_questions:
+                return error_response(f'At most {max_questions} questions per request', 'TOO_MANY_QUESTIONS', 400)
+
+            # Every question of the batch takes an in-flight slot
+            admitted_at = self.admission.admit(len(questions)) if self.admission else None
+            if self.admission and admitted_at is None:
+                return error_response('Server is overloaded, please retry later', 'OVERLOADED', 429,
+                                      retry_after=self.admission.retry_after())
+
+            logger.info(f"Answering batch of {len(questions)} questions")
+            try:
+                # One deadline for the whole batch: its questions run concurrently
+                deadline = Deadline(ROUTING_CONFIG['deadline']['total'])
+                answers = await self.expert_system['dispatcher'].answer_many([str(q) for q in questions], deadline)
+            finally:
+                if admitted_at is not None:
+                    self.admission.release(admitted_at, len(questions), record_latency=False)
+
+            items = []
+            for question, (expert_type, response) in zip(questions, answers):
+                item = {'question': question, 'expert_type': expert_type or 'general'}
+                if response:
+                    item.update({'status': 'success', 'answer': response})
+                else:
+                    item.update({'status': 'error', 'error': 'Could not generate response', 'code': 'NO_RESPONSE'})
+                items.append(item)
+
+            return {
+                'status': 'success',
+                'data': items
+            }, 200
+
+        except Exception as e:
+            logger.error(f"Error in /ask/batch endpoint: {str(e)}")
+            return error_response(str(e), 'INTERNAL_ERROR', 500)
+
+    async def route_batch(self, data: Optional[Dict[str, Any]]) -> Response:
+        if not self.init():
+            return error_response(*INIT_ERROR)
+
+        try:
+            questions = data.get('questions') if data else None
+            if not isinstance(questions, list) or not questions:
+                return error_response('Questions list is required', 'MISSING_QUESTIONS', 400)
+
+            max_queries = ROUTING_CONFIG['batch']['max_queries']
+            if len(questions) > max_queries:
+                return error_response(f'At most {max_queries} questions per request', 'TOO_MANY_QUESTIONS', 400)
+
+            logger.info(f"Routing batch of {len(questions)} questions")
+            deadline = Deadline(ROUTING_CONFIG['deadline']['total'])
+            routes = await self.expert_system['selector'].select_experts([str(q) for q in questions], deadline)
+
+            return {
+                'status': 'success',
+                'data': [
+                    {
+                        'question': question,
+                        'expert_type': expert_type or 'general',
+                        'direct_response': direct_response
+                    }
+                    for question, (expert_type, direct_response) in zip(questions, routes)
+                ]
+            }, 200
+
+        except Exception as e:
+            logger.error(f"Error in /route/batch endpoint: {str(e)}")
+            return error_response(str(e), 'INTERNAL_ERROR', 500)
@@ -2,8 +2,16 @@
 
 Bu modül, temel API istemcilerini içerir:
 - Twitter istemcisi
+
+İstemciler ilk erişimde yüklenir; böylece src.core altındaki bir modülü
+içe aktarmak tweepy'yi yüklemez.
 """
+from src.utils.lazy import lazy_exports
+
+_EXPORTS = {
+    'TwitterClient': ('.twitter_client', 'TwitterClient')
+}
 
-from .twitter_client import TwitterClient
+__all__ = list(_EXPORTS)
 
-__all__ = ['TwitterClient'] 
\ No newline at end of file
+__getattr__, __dir__ = lazy_exports(__name__, globals(), _EXPORTS)
@@ -0,0 +1,119 @@
+"""Admission control for expensive endpoints"""
+import math
+import time
+import logging
+from typing import Dict, Any, Optional
+
+class AdmissionController:
+    """Tracks in-flight requests and sheds load before queues build up
+
+    The expected wait of a new request is estimated from the moving average of
+    recent request latencies and the number of requests already in flight,
+    assuming up to `concurrency` of them make progress at once. A request is
+    rejected when the in-flight limit is reached or, once every concurrency
+    slot is busy, the estimated wait exceeds max_wait, so clients can retry
+    elsewhere instead of timing out in a queue. Requests are always admitted
+    while a slot is free, so a slow average is corrected by the requests that
+    follow it instead of shedding everything from then on.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """Initialize admission controller
+
+        Args:
+            config (Dict[str, Any], optional): Admission configuration. Defaults to None.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.config = config or {}
+        self.max_in_flight = self.config.get('max_in_flight', 64)
+        self.max_wait = self.config.get('max_wait', 15.0)
+        self.concurrency = max(1, self.config.get('concurrency', 32))
+        self.alpha = self.config.get('ewma_alpha', 0.2)
+
+        self.in_flight = 0
+        # Moving average of admitted request latency in seconds, None until the first one finishes
+        self.avg_latency: Optional[float] = None
+        self.stats = {
+            'admitted': 0,
+            'shed': 0,
+            'served_from_cache': 0,
+            'peak_in_flight': 0
+        }
+
+    def estimated_wait(self, slots: int = 1) -> float:
+        """Estimate how long a newly admitted request would take
+
+        Args:
+            slots (int, optional): Slots the request takes, one per question. Defaults to 1.
+
+        Returns:
+            float: Estimated seconds until a new request completes
+        """
+        if self.avg_latency is None:
+            return 0.0
+        return self.avg_latency * math.ceil((self.in_flight + slots) / self.concurrency)
+
+    def admit(self, slots: int = 1) -> Optional[float]:
+        """Admit a request if there is capacity
+
+        Args:
+            slots (int, optional): Slots the request takes, one per question of a batch. Defaults to 1.
+
+        Returns:
+            Optional[float]: Admission time to pass to release, None if the request is shed
+        """
+        queued = self.in_flight + slots > self.concurrency
+        if (self.in_flight + slots > self.max_in_flight or
+                (queued and self.estimated_wait(slots) > self.max_wait)):
+            self.stats['shed'] += 1
+            self.logger.warning(
+                f"Shedding request for {slots} slot(s): {self.in_flight} in flight, "
+                f"estimated wait {self.estimated_wait(slots):.1f}s"
+            )
+            return None
+
+        self.in_flight += slots
+        self.stats['admitted'] += 1
+        self.stats['peak_in_flight'] = max(self.stats['peak_in_flight'], self.in_flight)
+        return time.monotonic()
+
+    def release(self, admitted_at: float, slots: int = 1, record_latency: bool = True) -> None:
+        """Mark an admitted request as finished
+
+        Args:
+            admitted_at (float): Value returned by admit
+            slots (int, optional): Slots passed to admit. Defaults to 1.
+            record_latency (bool, optional): Count the request's latency in the average; off for
+                batches, whose latency is not that of one question. Defaults to True.
+        """
+        self.in_flight -= slots
+        if not record_latency:
+            return
+        latency = time.monotonic() - admitted_at
+        if self.avg_latency is None:
+            self.avg_latency = latency
+        else:
+            self.avg_latency += self.alpha * (latency - self.avg_latency)
+
+    def retry_after(self) -> int:
+        """Suggest when a shed client should retry
+
+        Returns:
+            int: Seconds for the Retry-After header
+        """
+        return max(1, math.ceil(self.estimated_wait() - self.max_wait), math.ceil(self.avg_latency or 0))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get admission statistics
+
+        Returns:
+            Dict[str, Any]: Queue depth, latency estimate and shed counts
+        """
+        stats = dict(self.stats)
+        stats['in_flight'] = self.in_flight
+        stats['max_in_flight'] = self.max_in_flight
+        stats['avg_latency_ms'] = self.avg_latency * 1000 if self.avg_latency is not None else None
+        stats['estimated_wait_ms'] = self.estimated_wait() * 1000
+        total = stats['admitted'] + stats['shed']
+        stats['shed_rate'] = stats['shed'] / total if total else 0.0
+        return stats
@@ -3,11 +3,37 @@ from src.utils.logger import Logger
 from src.core.event_bus import EventBus
 from src.core.resource_manager import ResourceManager
 from src.utils.config import ConfigLoader
-import json
+from src.utils.metrics import STAGE_SECONDS
+from src.utils.prompt_budget import PromptBuilder
 
 class BaseExpert:
     """Temel uzman sınıfı"""
     
+    # Aynı dokümanların aynı soru için değerlendirmesi tamamlama önbelleğinden gelir (saniye)
+    GRADING_CACHE_TTL = 3600
+    
+    # Model çıktısının beklenen yapısı; uymayan yanıtlar geçersiz sayılır
+    GRADING_SCHEMA = {
+        "type": "object",
+        "required": ["is_useful", "relevance_score", "freshness_score", "reliability_score"],
+        "properties": {
+            "is_useful": {"type": "boolean"},
+            "reason": {"type": "string"},
+            "relevance_score": {"type": "number", "minimum": 0, "maximum": 1},
+            "freshness_score": {"type": "number", "minimum": 0, "maximum": 1},
+            "reliability_score": {"type": "number", "minimum": 0, "maximum": 1}
+        }
+    }
+    GENERATION_SCHEMA = {
+        "type": "object",
+        "required": ["text", "is_supported", "confidence"],
+        "properties": {
+            "text": {"type": ["string", "null"]},
+            "is_supported": {"type": "boolean"},
+            "confidence": {"type": "number", "minimum": 0, "maximum": 1}
+        }
+    }
+    
     def __init__(self, name: str):
         """Uzmanı başlat"""
         self.name = name
@@ -21,6 +47,13 @@ class BaseExpert:
         # API istemcilerini al
         self.openai_client = self.resource_manager.get_openai_client()
         
+        # Dokümanlar modelin bağlam penceresine, yanıt için max_tokens bırakılarak sığdırılır
+        self.prompt_builder = PromptBuilder(
+            model=self.openai_client.model,
+            max_tokens=self.openai_client.max_tokens,
+            name=self.name
+        )
+        
         # Event'lere abone ol
         self.event_bus.subscribe("question_received", self._on_question_received)
         self.event_bus.subscribe("response_generated", self._on_response_generated)
@@ -61,6 +94,9 @@ class BaseExpert:
             print("\n2. YEREL DOKÜMANLARI DEĞERLENDİRME")
             print("-"*30)
             grade_result = await self._grade_documents(local_docs, message)
+            if grade_result.get("upstream_down"):
+                print("- OpenAI erişilemiyor, yanıt üretilemez")
+                return None
             print(f"- Faydalı mı: {grade_result['is_useful']}")
             print(f"- Sebep: {grade_result.get('reason', '-')}")
             if 'relevance_score' in grade_result:
@@ -104,6 +140,10 @@ class BaseExpert:
                 print("\n5. WEB DOKÜMANLARINI DEĞERLENDİRME")
                 print("-"*30)
                 grade_result = await self._grade_documents(web_docs, message)
+                if grade_result.get("upstream_down"):
+                    # Yeni web aramaları OpenAI'yi düzeltmez, yalnızca yükü artırır
+                    print("- OpenAI erişilemiyor, web araması durduruldu")
+                    return None
                 print(f"- Faydalı mı: {grade_result['is_useful']}")
                 print(f"- Sebep: {grade_result.get('reason', '-')}")
                 if 'relevance_score' in grade_result:
@@ -125,6 +165,9 @@ class BaseExpert:
                             "source": "web"
                         })
                         return response["text"]
+                    elif response and response.get("upstream_down"):
+                        print("- OpenAI erişilemiyor, web araması durduruldu")
+                        return None
                     elif response and not response["is_supported"]:
                         print("- Yanıt desteklenmiyor, web araması tekrarlanacak")
                         continue
@@ -165,16 +208,29 @@ class BaseExpert:
             "reliability_score": float # 0-1 arası güvenilirlik
         }"""
         
-        user_message = f"""Soru: {message}
+        def frame(documents_text: str) -> str:
+            return f"""Soru: {message}
         
         Dokümanlar:
-        {chr(10).join(documents)}
+        {documents_text}
         
         Bu dokümanları yukarıdaki kriterlere göre değerlendir."""
         
+        # Dokümanlar öncelik sırasıyla (önce yerel, sonra web) bütçeye sığdığı kadar eklenir
+        packed = self.prompt_builder.pack(documents, system_prompt, frame(''), stage='grading')
+        user_message = frame(packed.join())
+        
         try:
-            response = await self.openai_client.get_completion(system_prompt, user_message)
-            result = json.loads(response)
+            with STAGE_SECONDS.time(stage='grading', expert=self.name):
+                completion = await self.openai_client.complete_json(
+                    system_prompt, user_message, schema=self.GRADING_SCHEMA,
+                    stage='grading', cache_ttl=self.GRADING_CACHE_TTL
+                )
+            if completion.upstream_down:
+                return {"is_useful": False, "reason": "OpenAI erişilemiyor", "upstream_down": True}
+            if not completion.ok:
+                return {"is_useful": False, "reason": "Değerlendirme yapılamadı"}
+            result = completion.data
             
             # Skorlar yeterince yüksek değilse faydasız olarak işaretle
             min_score = 0.7
@@ -195,10 +251,11 @@ class BaseExpert:
         
         try:
             # Tavily API ile web araması
-            results = await self.web_search.search(
-                search_query,
-                max_results=5
-            )
+            with STAGE_SECONDS.time(stage='web_search', expert=self.name):
+                results = await self.web_search.search(
+                    search_query,
+                    max_results=5
+                )
             
             if not results:
                 return []
@@ -234,16 +291,27 @@ class BaseExpert:
         5. Yanıtı JSON formatında ver: {{"text": string, "is_supported": boolean, "confidence": float}}
         6. Bilgiler yetersiz, güncel değil veya güvenilir değilse is_supported: false döndür"""
         
-        user_message = f"""Soru: {message}
+        def frame(documents_text: str) -> str:
+            return f"""Soru: {message}
 
         Web arama sonuçları:
-        {chr(10).join(documents)}
+        {documents_text}
         
         Bu bilgileri kullanarak soruya yanıt ver."""
         
+        packed = self.prompt_builder.pack(documents, system_prompt, frame(''), stage='generation')
+        user_message = frame(packed.join())
+        
         try:
-            response = await self.openai_client.get_completion(system_prompt, user_message)
-            result = json.loads(response)
+            with STAGE_SECONDS.time(stage='generation', expert=self.name):
+                completion = await self.openai_client.complete_json(
+                    system_prompt, user_message, schema=self.GENERATION_SCHEMA, stage='generation'
+                )
+            if completion.upstream_down:
+                return {"text": None, "is_supported": False, "upstream_down": True}
+            if not completion.ok:
+                return None
+            result = completion.data
             
             # Güven skoru yeterince yüksek değilse desteklenmez olarak işaretle
             if result.get("confidence", 0) < 0.7:
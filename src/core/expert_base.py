@@ -6,10 +6,14 @@ from bs4 import BeautifulSoup
 from src.utils.openai_client import OpenAIClient
 from src.utils.web_search import WebSearch
 from src.utils.cache import Cache
+from src.utils.prompt_budget import PromptBuilder, rank_by_query
 
 logger = logging.getLogger(__name__)
 
 class ExpertBase:
+    # Token cap on URL extraction prompts; a page is long and most of it is unrelated
+    URL_PROMPT_TOKENS = 1500
+    
     def __init__(self, expert_type: str):
         """Initialize expert
         
@@ -18,6 +22,12 @@ class ExpertBase:
         """
         self.expert_type = expert_type
         self.openai_client = OpenAIClient()
+        self.prompt_builder = PromptBuilder(
+            model=self.openai_client.model,
+            max_tokens=self.openai_client.max_tokens,
+            max_prompt_tokens=self.URL_PROMPT_TOKENS,
+            name=expert_type
+        )
         self.web_search = WebSearch()
         self.cache = Cache()
         
@@ -108,11 +118,12 @@ class ExpertBase:
             logger.error(f"Error getting AI answer: {str(e)}")
             return None
             
-    async def _get_url_content(self, question: str) -> Optional[str]:
+    async def _get_url_content(self, question: str, timeout: float = 10.0) -> Optional[str]:
         """Get answer from relevant URLs
         
         Args:
             question (str): User's question
+            timeout (float, optional): Timeout per URL fetch in seconds. Defaults to 10.0.
             
         Returns:
             Optional[str]: Answer extracted from URLs
@@ -125,7 +136,7 @@ class ExpertBase:
                 return None
                 
             # Fetch and parse content from URLs
-            async with aiohttp.ClientSession() as session:
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
                 for url in urls:
                     try:
                         async with session.get(url) as response:
@@ -144,12 +155,20 @@ class ExpertBase:
                                 system_prompt = """Verilen metin içeriğinden soruya en uygun yanıtı çıkar.
                                 Eğer uygun yanıt bulunamazsa None döndür."""
                                 
-                                user_prompt = f"""Soru: {question}
+                                def frame(page_text: str) -> str:
+                                    return f"""Soru: {question}
                                 
-                                Metin: {text[:2000]}  # İlk 2000 karakter
+                                Metin: {page_text}
                                 
                                 Yanıt:"""
                                 
+                                # Paragraphs sharing the most words with the question go first
+                                paragraphs = [line.strip() for line in text.splitlines() if line.strip()]
+                                packed = self.prompt_builder.pack(
+                                    rank_by_query(paragraphs, question), system_prompt, frame(''), stage='url'
+                                )
+                                user_prompt = frame(packed.join())
+                                
                                 if answer := await self.openai_client.get_completion(system_prompt, user_prompt):
                                     if answer.lower() != "none":
                                         return answer
@@ -0,0 +1,249 @@
+"""Local keyword classifier used to route queries without an LLM call"""
+import re
+import logging
+import importlib.util
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, Iterable, List, Optional, Tuple
+from src.utils.text import fold_turkish, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Weight for named entities (teams, dishes, the app name) and for plain topic words
+ENTITY_WEIGHT = 2.0
+TOPIC_WEIGHT = 1.0
+
+# Shorter terms only match whole tokens: as prefixes 'gol' would match "gölge"
+# and 'mac' "machine"
+MIN_PREFIX_LENGTH = 4
+
+# Domain words the sources packages do not spell out; kept short on purpose,
+# everything else is harvested from the experts' own data
+SEED_KEYWORDS: Dict[str, Dict[str, float]] = {
+    'sports': {
+        'spor': 1.0, 'futbol': 2.0, 'basketbol': 2.0, 'voleybol': 2.0, 'mac': 1.0,
+        'gol': 1.0, 'lig': 1.0, 'sampiyon': 1.0, 'antrenman': 2.0, 'fitness': 2.0,
+        'takim': 1.0, 'stadyum': 2.0, 'besiktas': 2.0,
+        'trabzonspor': 2.0, 'football': 2.0, 'basketball': 2.0
+    },
+    'food': {
+        'yemek': 2.0, 'tarif': 2.0, 'mutfak': 2.0, 'restoran': 2.0, 'kalori': 2.0,
+        'beslenme': 1.0, 'pisir': 2.0, 'malzeme': 1.0, 'tatli': 1.0, 'corba': 2.0,
+        'recipe': 2.0, 'cooking': 2.0
+    },
+    'ai': {
+        'yapay zeka': 2.0, 'makine ogrenmesi': 2.0, 'derin ogrenme': 2.0, 'sinir agi': 2.0,
+        'artificial intelligence': 2.0, 'machine learning': 2.0, 'deep learning': 2.0,
+        'chatgpt': 2.0, 'gpt': 2.0, 'openai': 2.0, 'llm': 2.0, 'bert': 2.0, 'llama': 2.0,
+        'dall-e': 2.0, 'stable diffusion': 2.0, 'algoritma': 1.0, 'ai': 2.0
+    },
+    'sudostar': {
+        'sudostar': 3.0, 'elmas': 2.0, 'diamond': 2.0, 'cekim': 1.0, 'odeme': 1.0,
+        'paypal': 2.0
+    }
+}
+
+# Template filler words that say nothing about the domain
+STOP_WORDS = {
+    've', 'veya', 'ile', 'icin', 'bir', 'bu', 'su', 'ne', 'nedir', 'nelerdir', 'nasil',
+    'yapilir', 'kullanilir', 'kac', 'en', 'iyi', 'yeni', 'son', 'sonucu', 'canli',
+    'durumu', 'yerine', 'yenir', 'acilan', 'yorumlari', 'program', 'programi',
+    'sistemi', 'gelistirme', 'onerileri', 'haberleri', 'app', 'the', 'and', 'what',
+    'how', 'is', 'are', 'fiyatlari', 'prices', 'features', 'methods', 'ozellikleri',
+    # Generic enough to turn up in any domain's questions
+    'model', 'transfer', 'oyuncu', 'teknik', 'performansi', 'istatistikleri', 'degerleri',
+    'noktalari', 'cesitleri', 'faydalari', 'yontemleri', 'minimum'
+}
+
+_PLACEHOLDER_RE = re.compile(r"\{[^}]*\}")
+
+EXPERTS_DIR = Path(__file__).resolve().parent.parent / 'experts'
+
+
+def _load_source(expert_type: str, name: str) -> ModuleType:
+    """Load one of an expert's sources modules from its file
+
+    Importing src.experts.<type>.sources would run the expert package's
+    __init__, which imports the expert class with its clients and SDKs; the
+    registry only loads those when the expert is first asked. The module is
+    not added to sys.modules.
+    """
+    path = EXPERTS_DIR / expert_type / 'sources' / f'{name}.py'
+    spec = importlib.util.spec_from_file_location(f'_keyword_sources.{expert_type}.{name}', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _add(keywords: Dict[str, float], terms: Iterable[str], weight: float) -> None:
+    """Add terms to a keyword table, keeping the highest weight per term"""
+    for term in terms:
+        term = fold_turkish(_PLACEHOLDER_RE.sub(' ', term)).strip()
+        if len(term) < 3 or term in STOP_WORDS:
+            continue
+        keywords[term] = max(keywords.get(term, 0.0), weight)
+
+
+def _template_words(templates: Dict[str, Dict[str, str]]) -> List[str]:
+    """Collect the literal words from a nested search template table"""
+    words = []
+    for group in templates.values():
+        for template in group.values():
+            words.extend(tokenize(_PLACEHOLDER_RE.sub(' ', template)))
+    return words
+
+
+def _sports_keywords() -> Dict[str, float]:
+    SEARCH_TEMPLATES = _load_source('sports', 'search_queries').SEARCH_TEMPLATES
+    get_knowledge_base = _load_source('sports', 'local_data').get_knowledge_base
+
+    keywords: Dict[str, float] = {}
+    _add(keywords, _template_words(SEARCH_TEMPLATES), TOPIC_WEIGHT)
+    _add(keywords, SEARCH_TEMPLATES.keys(), TOPIC_WEIGHT)
+    teams = get_knowledge_base().get('football', {}).get('teams', {})
+    for key, team in teams.items():
+        _add(keywords, [key, team.get('name', '')], ENTITY_WEIGHT)
+    return keywords
+
+
+def _food_keywords() -> Dict[str, float]:
+    SEARCH_TEMPLATES = _load_source('food', 'search_queries').SEARCH_TEMPLATES
+    FOOD_KNOWLEDGE_BASE = _load_source('food', 'local_data').FOOD_KNOWLEDGE_BASE
+
+    keywords: Dict[str, float] = {}
+    _add(keywords, _template_words(SEARCH_TEMPLATES), TOPIC_WEIGHT)
+    dishes = FOOD_KNOWLEDGE_BASE.get('yemekler', {})
+    _add(keywords, dishes.keys(), ENTITY_WEIGHT)
+    for dish in dishes.values():
+        _add(keywords, [m for m in dish.get('malzemeler', []) if ' ' not in m], TOPIC_WEIGHT)
+    for names in FOOD_KNOWLEDGE_BASE.get('tarifler', {}).values():
+        _add(keywords, names, ENTITY_WEIGHT)
+    return keywords
+
+
+def _ai_keywords() -> Dict[str, float]:
+    get_knowledge_base = _load_source('ai', 'local_data').get_knowledge_base
+
+    keywords: Dict[str, float] = {}
+    for section in get_knowledge_base().values():
+        if isinstance(section, dict):
+            _add(keywords, section.get('keywords', []), ENTITY_WEIGHT)
+    return keywords
+
+
+def _sudostar_keywords() -> Dict[str, float]:
+    SEARCH_QUERIES = _load_source('sudostar', 'search_queries').SEARCH_QUERIES
+    SUDOSTAR_KNOWLEDGE_BASE = _load_source('sudostar', 'local_data').SUDOSTAR_KNOWLEDGE_BASE
+
+    keywords: Dict[str, float] = {}
+    for queries in SEARCH_QUERIES.values():
+        for query in queries:
+            _add(keywords, tokenize(query), TOPIC_WEIGHT)
+    _add(keywords, SUDOSTAR_KNOWLEDGE_BASE.get('pricing', {}).get('payment_methods', []), ENTITY_WEIGHT)
+    return keywords
+
+
+def build_expert_keywords() -> Dict[str, Dict[str, float]]:
+    """Build per-expert keyword tables from the experts' sources packages
+
+    Terms claimed by more than one expert are dropped, they only add noise.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Keyword -> weight table per expert type
+    """
+    builders = {
+        'sports': _sports_keywords,
+        'food': _food_keywords,
+        'ai': _ai_keywords,
+        'sudostar': _sudostar_keywords
+    }
+
+    tables: Dict[str, Dict[str, float]] = {}
+    for expert_type, builder in builders.items():
+        table: Dict[str, float] = {}
+        try:
+            table = builder()
+        except Exception as e:
+            logger.error(f"Error loading {expert_type} keywords: {str(e)}")
+        for term, weight in SEED_KEYWORDS.get(expert_type, {}).items():
+            table[term] = max(table.get(term, 0.0), weight)
+        tables[expert_type] = table
+
+    owners: Dict[str, int] = {}
+    for table in tables.values():
+        for term in table:
+            owners[term] = owners.get(term, 0) + 1
+    for table in tables.values():
+        for term in [t for t in table if owners[t] > 1]:
+            del table[term]
+
+    return tables
+
+
+class KeywordClassifier:
+    """Scores a query against per-expert keyword tables"""
+
+    def __init__(self, keywords: Optional[Dict[str, Dict[str, float]]] = None):
+        """Initialize classifier
+
+        Args:
+            keywords (Dict[str, Dict[str, float]], optional): Keyword tables per expert type.
+                Defaults to tables built from the experts' sources.
+        """
+        if keywords is None:
+            keywords = build_expert_keywords()
+
+        # Single words are indexed by their first three letters, phrases are matched on the text
+        self._words: Dict[str, List[Tuple[str, str, float]]] = {}
+        self._phrases: List[Tuple[str, str, float]] = []
+        for expert_type, table in keywords.items():
+            for term, weight in table.items():
+                term = fold_turkish(term)
+                if ' ' in term or '-' in term:
+                    self._phrases.append((term, expert_type, weight))
+                else:
+                    self._words.setdefault(term[:3], []).append((term, expert_type, weight))
+
+    def classify(self, query: str) -> Tuple[Optional[str], float]:
+        """Classify query
+
+        Confidence is the winning margin damped by the amount of evidence:
+        one topic word scores 0.5, a team or dish name alone about 0.67.
+
+        Args:
+            query (str): User query
+
+        Returns:
+            Tuple[Optional[str], float]: Expert type (None if no keyword matched) and confidence 0-1
+        """
+        tokens = tokenize(query)
+        scores: Dict[str, float] = {}
+
+        for token in tokens:
+            matched: Dict[str, float] = {}
+            for term, expert_type, weight in self._words.get(token[:3], ()):
+                # Prefix match covers Turkish suffixes ("tarifi", "galatasaray'ın")
+                if len(term) < MIN_PREFIX_LENGTH:
+                    hit = token == term
+                else:
+                    hit = token.startswith(term) or (len(token) >= 5 and term.startswith(token))
+                if hit:
+                    matched[expert_type] = max(matched.get(expert_type, 0.0), weight)
+            for expert_type, weight in matched.items():
+                scores[expert_type] = scores.get(expert_type, 0.0) + weight
+
+        if self._phrases:
+            text = f" {' '.join(tokens)} "
+            dashed = f" {fold_turkish(query)} "
+            for term, expert_type, weight in self._phrases:
+                if f" {term}" in text or f" {term}" in dashed:
+                    scores[expert_type] = scores.get(expert_type, 0.0) + weight
+
+        if not scores:
+            return None, 0.0
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        top_type, top_score = ranked[0]
+        second_score = ranked[1][1] if len(ranked) > 1 else 0.0
+        confidence = (top_score - second_score) / (top_score + 1.0)
+        return top_type, round(confidence, 3)
@@ -0,0 +1,369 @@
+"""Expert dispatcher: routes a question and collects the expert's answer"""
+import time
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator
+from src.core.expert_selector import ExpertSelector, EXPERT_TYPES
+from src.utils.text import normalize_query
+from src.utils.deadline import Deadline
+
+SPECULATION_MODES = ('off', 'likely', 'all')
+FANOUT_STRATEGIES = ('merge', 'first')
+
+class ExpertDispatcher:
+    """Runs routing and answering for a question
+
+    With speculation enabled, the cheap local stages of the likely expert (or of
+    every expert) start while the router is still deciding. Their result is used
+    when the router agrees and cancelled when it does not.
+
+    With fan-out enabled, questions the router spreads over several experts are
+    answered by all of them concurrently under a shared deadline; the first good
+    answer wins and the rest are cancelled, or the answers are merged. A merged
+    answer is reported under every contributing expert type joined by '+'.
+    """
+
+    def __init__(self, experts: Dict[str, Any], selector: ExpertSelector, config: Optional[Dict[str, Any]] = None):
+        """Initialize dispatcher
+
+        Args:
+            experts (Dict[str, Any]): Expert instances keyed by expert type
+            selector (ExpertSelector): Expert selector
+            config (Dict[str, Any], optional): Dispatch configuration. Defaults to None.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.experts = experts
+        self.selector = selector
+        self.config = config or {}
+
+        self.speculation_mode = self.config.get('speculation', {}).get('mode', 'off')
+        if self.speculation_mode not in SPECULATION_MODES:
+            raise ValueError(f"Unknown speculation mode: {self.speculation_mode}")
+
+        fanout_config = self.config.get('fanout', {})
+        self.fanout_enabled = fanout_config.get('enabled', False)
+        self.fanout_strategy = fanout_config.get('strategy', 'first')
+        self.fanout_merge_min_weight = fanout_config.get('merge_min_weight', 0.4)
+        self.fanout_deadline = fanout_config.get('deadline', 20.0)
+        if self.fanout_strategy not in FANOUT_STRATEGIES:
+            raise ValueError(f"Unknown fan-out strategy: {self.fanout_strategy}")
+
+        self.batch_concurrency = self.config.get('ask_batch', {}).get('concurrency', 8)
+
+        self.stats = {
+            'requests': 0,
+            'streams': 0,
+            'batches': 0,
+            'batch_questions': 0,
+            'batch_deduplicated': 0,
+            'fanouts': 0,
+            'fanout_timeouts': 0,
+            'fanout_cancelled': 0,
+            'speculated': 0,
+            'speculation_hits': 0,
+            'speculation_misses': 0,
+            'speculation_cancelled': 0,
+            'latency_saved_ms': 0.0
+        }
+
+    async def answer(self, question: str, deadline: Optional[Deadline] = None) -> Tuple[Optional[str], Optional[str]]:
+        """Route question and get the response
+
+        Args:
+            question (str): User question
+            deadline (Deadline, optional): Request deadline shared by routing and the experts. Defaults to None.
+
+        Returns:
+            Tuple[Optional[str], Optional[str]]: Expert type (None for direct responses) and response
+        """
+        self.stats['requests'] += 1
+
+        speculative = self._start_speculation(question)
+        try:
+            if self.fanout_enabled:
+                weighted, direct_response = await self.selector.select_expert_weights(question, deadline)
+                weighted = [(e, w) for e, w in weighted if e in self.experts]
+                if self.fanout_strategy == 'merge':
+                    # A weak secondary expert would only pad the answer
+                    weighted = weighted[:1] + [(e, w) for e, w in weighted[1:] if w >= self.fanout_merge_min_weight]
+                if len(weighted) > 1:
+                    return await self._fan_out(question, weighted, deadline)
+                expert_type = weighted[0][0] if weighted else None
+            else:
+                expert_type, direct_response = await self.selector.select_expert(question, deadline)
+            routed_at = time.perf_counter()
+
+            if not expert_type or expert_type not in self.experts:
+                return None, direct_response
+
+            response = None
+            if speculative:
+                response = await self._take_speculation(speculative.pop(expert_type, None), routed_at)
+            if response:
+                return expert_type, response
+
+            return expert_type, await self.experts[expert_type].get_response(question, deadline)
+
+        finally:
+            for task, _ in speculative.values():
+                if not task.done():
+                    task.cancel()
+                    self.stats['speculation_cancelled'] += 1
+                elif not task.cancelled():
+                    task.exception()  # Mark a failed lookup as retrieved
+
+    async def answer_cached(self, question: str) -> Tuple[Optional[str], Optional[str]]:
+        """Answer only from cached routes and the experts' cheap local stages
+
+        Used when the system is overloaded: no LLM, web search or URL call is made.
+
+        Args:
+            question (str): User question
+
+        Returns:
+            Tuple[Optional[str], Optional[str]]: Expert type and response, response None if nothing is cached
+        """
+        route = self.selector.select_expert_cached(question)
+        if route is None:
+            return None, None
+
+        expert_type, direct_response = route
+        if not expert_type or expert_type not in self.experts:
+            return None, direct_response
+
+        try:
+            return expert_type, await self.experts[expert_type].get_local_response(question)
+        except Exception as e:
+            self.logger.error(f"Error in cached lookup for {expert_type} expert: {str(e)}")
+            return expert_type, None
+
+    async def answer_stream(self, question: str, max_chars: Optional[int] = None,
+                            deadline: Optional[Deadline] = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Route question and stream the response
+
+        The routing decision is sent first so clients can show which expert is
+        answering; the response follows as chunks. Questions spread over several
+        experts are answered by the most relevant one.
+
+        Args:
+            question (str): User question
+            max_chars (int, optional): Stop the expert's generation at this many characters. Defaults to None.
+            deadline (Deadline, optional): Request deadline shared by routing and the expert. Defaults to None.
+
+        Yields:
+            Tuple[str, Dict[str, Any]]: Event name ('route', 'token' or 'done') and event data
+        """
+        self.stats['requests'] += 1
+        self.stats['streams'] += 1
+
+        expert_type, direct_response = await self.selector.select_expert(question, deadline)
+        if expert_type not in self.experts:
+            expert_type = None
+        yield 'route', {'expert_type': expert_type or 'general'}
+
+        if expert_type is None:
+            if direct_response:
+                yield 'token', {'text': direct_response[:max_chars] if max_chars else direct_response}
+            yield 'done', {'answered': bool(direct_response)}
+            return
+
+        answered = False
+        async for chunk in self.experts[expert_type].stream_response(question, max_chars=max_chars, deadline=deadline):
+            answered = True
+            yield 'token', {'text': chunk}
+        yield 'done', {'answered': answered}
+
+    async def answer_many(self, questions: List[str],
+                          deadline: Optional[Deadline] = None) -> List[Tuple[Optional[str], Optional[str]]]:
+        """Route and answer many questions in one go
+
+        Routing goes through the selector's batch path. Expert pipelines then run
+        concurrently, at most batch_concurrency at a time, and repeated questions
+        routed to the same expert are answered once.
+
+        Args:
+            questions (List[str]): User questions
+            deadline (Deadline, optional): Request deadline shared by routing and every pipeline. Defaults to None.
+
+        Returns:
+            List[Tuple[Optional[str], Optional[str]]]: Expert type and response per question, in input order
+        """
+        self.stats['batches'] += 1
+        self.stats['batch_questions'] += len(questions)
+
+        routes = await self.selector.select_experts(questions, deadline)
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+
+        async def run(expert_type: str, question: str) -> Optional[str]:
+            async with semaphore:
+                return await self.experts[expert_type].get_response(question, deadline)
+
+        tasks: Dict[Tuple[str, str], asyncio.Future] = {}
+        keys: List[Optional[Tuple[str, str]]] = []
+        for question, (expert_type, _) in zip(questions, routes):
+            if not expert_type or expert_type not in self.experts:
+                keys.append(None)
+                continue
+            key = (expert_type, normalize_query(question))
+            if key in tasks:
+                self.stats['batch_deduplicated'] += 1
+            else:
+                tasks[key] = asyncio.ensure_future(run(expert_type, question))
+            keys.append(key)
+
+        responses: Dict[Tuple[str, str], Optional[str]] = {}
+        for key, result in zip(tasks, await asyncio.gather(*tasks.values(), return_exceptions=True)):
+            if isinstance(result, BaseException):
+                self.logger.error(f"Error in {key[0]} expert during batch: {str(result)}")
+                result = None
+            responses[key] = result
+
+        return [
+            (key[0], responses[key]) if key else (None, direct_response)
+            for key, (_, direct_response) in zip(keys, routes)
+        ]
+
+    async def _fan_out(self, question: str, weighted: List[Tuple[str, float]],
+                       deadline: Optional[Deadline] = None) -> Tuple[Optional[str], Optional[str]]:
+        """Ask several experts concurrently under a shared deadline
+
+        Args:
+            question (str): User question
+            weighted (List[Tuple[str, float]]): Expert types with weights, most relevant first
+            deadline (Deadline, optional): Request deadline, caps the fan-out deadline. Defaults to None.
+
+        Returns:
+            Tuple[Optional[str], Optional[str]]: Answering expert type ('+'-joined when merged) and response
+        """
+        self.stats['fanouts'] += 1
+        self.logger.info(f"Fanning out to experts: {weighted}")
+
+        loop = asyncio.get_running_loop()
+        fanout_timeout = self.fanout_deadline
+        if deadline is not None:
+            fanout_timeout = min(fanout_timeout, deadline.remaining())
+        expires_at = loop.time() + fanout_timeout
+        tasks = {
+            asyncio.ensure_future(self.experts[expert_type].get_response(question, deadline)): expert_type
+            for expert_type, _ in weighted
+        }
+        pending = set(tasks)
+        responses: Dict[str, Optional[str]] = {}
+
+        try:
+            while pending:
+                timeout = expires_at - loop.time()
+                if timeout <= 0:
+                    self.stats['fanout_timeouts'] += 1
+                    break
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    expert_type = tasks[task]
+                    try:
+                        responses[expert_type] = task.result()
+                    except Exception as e:
+                        self.logger.error(f"Error in {expert_type} expert during fan-out: {str(e)}")
+                        responses[expert_type] = None
+
+                    if self.fanout_strategy == 'first' and self.experts[expert_type].is_answer(responses[expert_type]):
+                        return expert_type, responses[expert_type]
+        finally:
+            for task in pending:
+                task.cancel()
+                self.stats['fanout_cancelled'] += 1
+
+        answers = [
+            (expert_type, responses[expert_type])
+            for expert_type, _ in weighted
+            if self.experts[expert_type].is_answer(responses.get(expert_type))
+        ]
+        if not answers:
+            # Fall back to an apology from the most relevant expert that produced one
+            for expert_type, _ in weighted:
+                if responses.get(expert_type):
+                    return expert_type, responses[expert_type]
+            return weighted[0][0], None
+
+        merged = []
+        contributors = []
+        for expert_type, response in answers:
+            if response not in merged:
+                merged.append(response)
+                contributors.append(expert_type)
+        return '+'.join(contributors), "\n\n".join(merged)
+
+    def _start_speculation(self, question: str) -> Dict[str, Tuple[asyncio.Task, float]]:
+        """Start local stages of the candidate experts
+
+        Args:
+            question (str): User question
+
+        Returns:
+            Dict[str, Tuple[asyncio.Task, float]]: Task and start time per expert type
+        """
+        if self.speculation_mode == 'off':
+            return {}
+
+        if self.speculation_mode == 'all':
+            candidates = [t for t in EXPERT_TYPES if t in self.experts]
+        else:
+            likely_type, _ = self.selector.classify_local(question)
+            candidates = [likely_type] if likely_type in self.experts else []
+
+        started = {}
+        for expert_type in candidates:
+            task = asyncio.ensure_future(self.experts[expert_type].get_local_response(question))
+            started[expert_type] = (task, time.perf_counter())
+        if started:
+            self.stats['speculated'] += 1
+        return started
+
+    async def _take_speculation(self, speculation: Optional[Tuple[asyncio.Task, float]], routed_at: float) -> Optional[str]:
+        """Collect the speculative result for the routed expert
+
+        Args:
+            speculation (Optional[Tuple[asyncio.Task, float]]): Task and start time, if speculated
+            routed_at (float): perf_counter value when routing finished
+
+        Returns:
+            Optional[str]: Speculative response or None
+        """
+        if speculation is None:
+            self.stats['speculation_misses'] += 1
+            return None
+
+        task, started_at = speculation
+        try:
+            response = await task
+        except Exception as e:
+            self.logger.error(f"Speculative local lookup failed: {str(e)}")
+            response = None
+
+        if not response:
+            self.stats['speculation_misses'] += 1
+            return None
+
+        # Whatever part of the local stages ran before routing finished is off the critical path
+        finished_at = time.perf_counter()
+        saved_ms = (min(finished_at, routed_at) - started_at) * 1000
+        self.stats['speculation_hits'] += 1
+        self.stats['latency_saved_ms'] += saved_ms
+        self.logger.info(f"Speculation hit, saved {saved_ms:.1f} ms")
+        return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get dispatch statistics
+
+        Returns:
+            Dict[str, Any]: Speculation hit rate, latency saved and fan-out counters
+        """
+        stats = dict(self.stats)
+        stats['fanout_strategy'] = self.fanout_strategy if self.fanout_enabled else None
+        stats['speculation_mode'] = self.speculation_mode
+        stats['speculation_hit_rate'] = (
+            stats['speculation_hits'] / stats['speculated'] if stats['speculated'] else 0.0
+        )
+        stats['avg_latency_saved_ms'] = (
+            stats['latency_saved_ms'] / stats['speculation_hits'] if stats['speculation_hits'] else 0.0
+        )
+        return stats
@@ -1,56 +1,649 @@
 """Expert selector module"""
+import re
+import json
+import time
+import random
+import asyncio
 import logging
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Dict, Any, List, Set
 from src.utils.openai_client import OpenAIClient
+from src.utils.cache import LRUCache
+from src.utils.single_flight import SingleFlight
+from src.utils.deadline import Deadline, run_with_timeout
+from src.utils.text import normalize_query, estimate_tokens
+from src.utils.metrics import STAGE_SECONDS
+from src.core.expert_classifier import KeywordClassifier
+
+EXPERT_TYPES = ('sports', 'food', 'ai', 'sudostar')
+
+ROUTING_PROMPT = """You are an expert classifier. Your task is to determine which expert should handle a given query.
+            Available experts are:
+            - sports: For sports and fitness related queries
+            - food: For food, cooking, and nutrition related queries
+            - ai: For artificial intelligence and technology related queries
+            - sudostar: For questions about the SudoStar mobile application
+
+            Respond with ONLY a JSON object:
+            {"experts": [{"name": "sports", "weight": 0.7}, {"name": "food", "weight": 0.3}], "confidence": 0.9, "answer": null}
+            List every expert whose domain the query touches, most relevant first, with weights summing to 1.
+            If no specific expert is needed, leave "experts" empty and put a brief direct response in "answer".
+            "confidence" is how sure you are about the routing, between 0 and 1."""
+
+# Legacy plain-text answer: label, optional confidence, optional direct response
+ROUTE_RE = re.compile(r"\s*([a-z]+)[\s.:,]*(?:(0(?:\.\d+)?|1(?:\.0+)?)(?=\s|$))?\s*(.*)", re.DOTALL)
+
+BATCH_ROUTING_PROMPT = """You are an expert classifier. For each numbered query decide which expert should handle it.
+            Available experts are:
+            - sports: For sports and fitness related queries
+            - food: For food, cooking, and nutrition related queries
+            - ai: For artificial intelligence and technology related queries
+            - sudostar: For questions about the SudoStar mobile application
+            - none: No specific expert is needed
+
+            Respond with ONLY a JSON array with one object per query, in order:
+            [{"id": 1, "expert": "sports"}, {"id": 2, "expert": "none", "answer": "brief direct response"}]
+            Include "answer" only for 'none'."""
+
+Route = Tuple[Optional[str], Optional[str]]
+# Experts with weights, most relevant first, and the direct response when the list is empty
+WeightedRoute = Tuple[List[Tuple[str, float]], Optional[str]]
 
 class ExpertSelector:
     """Expert selector class for routing queries to appropriate experts"""
-    
-    def __init__(self):
-        """Initialize expert selector"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """Initialize expert selector
+
+        Args:
+            config (Dict[str, Any], optional): Routing configuration. Defaults to None.
+        """
         self.logger = logging.getLogger(__name__)
+        self.config = config or {}
         self.openai_client = OpenAIClient(
             model='gpt-4',
-            max_tokens=100,
-            temperature=0.3
+            max_tokens=150,
+            temperature=0.3,
+            name='router',
+            cache=True,
+            hedge=True
         )
-        
-    async def select_expert(self, query: str) -> Tuple[Optional[str], Optional[str]]:
+
+        # Local fast path in front of the LLM router
+        classifier_config = self.config.get('local_classifier', {})
+        self.classifier = None
+        if classifier_config.get('enabled', True):
+            self.classifier = KeywordClassifier()
+        self.threshold = classifier_config.get('threshold', 0.6)
+        self.shadow_rate = classifier_config.get('shadow_rate', 0.0)
+        # Running shadow routing calls; referenced so they are not garbage collected mid-flight
+        self._shadow_tasks: Set[asyncio.Task] = set()
+
+        # Routing decisions keyed by normalized query, including 'none' direct responses
+        cache_config = self.config.get('cache', {})
+        self.cache = None
+        if cache_config.get('enabled', True):
+            self.cache = LRUCache(
+                max_size=cache_config.get('max_size', 1000),
+                ttl=cache_config.get('ttl', 3600)
+            )
+
+        self.stats = {
+            'requests': 0,
+            'local_hits': 0,
+            'llm_calls': 0,
+            'batch_calls': 0,
+            'deadline_fallbacks': 0,
+            'evaluated': 0,
+            'agreed': 0
+        }
+        # Agreement with the LLM per 0.1 confidence bucket: bucket -> [evaluated, agreed]
+        self._buckets: Dict[float, list] = {}
+
+        # Cheaper router models tried before gpt-4; their answer is kept only when
+        # it is a valid label with enough self-reported confidence
+        cascade_config = self.config.get('cascade', {})
+        self.cascade_min_confidence = cascade_config.get('min_confidence', 0.7)
+        self.cascade_clients: List[OpenAIClient] = []
+        if cascade_config.get('enabled', False):
+            self.cascade_clients = [
+                OpenAIClient(model=model, max_tokens=150, temperature=0.3, name='router', cache=True)
+                for model in cascade_config.get('models', ['gpt-3.5-turbo'])
+            ]
+        # Per-tier counters: position in get_clients() -> calls, accepted, escalated, latency_ms;
+        # by position since two tiers may use the same model
+        self._tier_stats: Dict[int, Dict[str, float]] = {}
+
+        # Batch routing packs queries into one prompt up to these budgets
+        batch_config = self.config.get('batch', {})
+        self.batch_prompt_tokens = batch_config.get('max_prompt_tokens', 3000)
+        self.batch_max_items = batch_config.get('max_items', 40)
+        self.batch_answer_tokens = batch_config.get('tokens_per_answer', 60)
+
+        # Multi-expert routes keep experts at or above min_weight, up to max_experts
+        fanout_config = self.config.get('fanout', {})
+        self.fanout_min_weight = fanout_config.get('min_weight', 0.25)
+        self.fanout_max_experts = fanout_config.get('max_experts', 2)
+
+        # Concurrent cache misses for the same normalized query share one LLM routing call
+        self.single_flight = None
+        if self.config.get('single_flight', {}).get('enabled', True):
+            self.single_flight = SingleFlight()
+
+        # Share of a request's remaining deadline one router model call may use
+        self.deadline_share = self.config.get('deadline', {}).get('routing_share', 0.3)
+
+    def classify_local(self, query: str) -> Tuple[Optional[str], float]:
+        """Classify query with the local keyword classifier
+
+        Args:
+            query (str): User query
+
+        Returns:
+            Tuple[Optional[str], float]: Expert type and confidence
+        """
+        if not self.classifier:
+            return None, 0.0
+        return self.classifier.classify(query)
+
+    def warm_up(self, queries: List[str]) -> int:
+        """Fill the routing cache with the local classifier's confident decisions
+
+        Args:
+            queries (List[str]): Expected popular queries
+
+        Returns:
+            int: Number of routes cached
+        """
+        cached = 0
+        for query in queries:
+            local_type, confidence = self.classify_local(query)
+            if local_type and confidence >= self.threshold:
+                self._cache_route(query, ([(local_type, 1.0)], None))
+                cached += 1
+        return cached
+
+    def get_clients(self) -> List[OpenAIClient]:
+        """Get every OpenAI client the router may call, cheapest first
+
+        Returns:
+            List[OpenAIClient]: Cascade clients followed by the final router client
+        """
+        return [*self.cascade_clients, self.openai_client]
+
+    async def select_expert(self, query: str, deadline: Optional[Deadline] = None) -> Tuple[Optional[str], Optional[str]]:
         """Select appropriate expert for query
-        
+
         Args:
             query (str): User query
-            
+            deadline (Deadline, optional): Request deadline. Defaults to None.
+
         Returns:
             Tuple[Optional[str], Optional[str]]: Expert type and direct response if no expert needed
         """
+        return self._top(await self._route(query, deadline))
+
+    def select_expert_cached(self, query: str) -> Optional[Route]:
+        """Select expert without calling the LLM router
+
+        Args:
+            query (str): User query
+
+        Returns:
+            Optional[Route]: Route from the routing cache or a confident local
+                classification, None if only the LLM could decide
+        """
+        if self.cache is not None:
+            cached = self.cache.get(normalize_query(query))
+            if cached:
+                return self._top(cached)
+
+        local_type, confidence = self.classify_local(query)
+        if local_type and confidence >= self.threshold:
+            return local_type, None
+        return None
+
+    async def select_expert_weights(self, query: str, deadline: Optional[Deadline] = None) -> WeightedRoute:
+        """Select every expert relevant to a query, with weights
+
+        Experts below the configured minimum weight are dropped and the rest
+        renormalized, so a single-domain query comes back as one expert with weight 1.
+
+        Args:
+            query (str): User query
+            deadline (Deadline, optional): Request deadline. Defaults to None.
+
+        Returns:
+            WeightedRoute: (expert type, weight) pairs, most relevant first, and the
+                direct response if no expert needed
+        """
+        experts, direct_response = await self._route(query, deadline)
+        kept = [(e, w) for e, w in experts if w >= self.fanout_min_weight][:self.fanout_max_experts]
+        if not kept and experts:
+            kept = experts[:1]
+        total = sum(w for _, w in kept) or 1.0
+        return [(e, w / total) for e, w in kept], direct_response
+
+    async def _route(self, query: str, deadline: Optional[Deadline] = None) -> WeightedRoute:
+        """Route a single query through cache, local classifier and LLM
+
+        Args:
+            query (str): User query
+            deadline (Deadline, optional): Request deadline. Defaults to None.
+
+        Returns:
+            WeightedRoute: Weighted experts and direct response
+        """
+        self.stats['requests'] += 1
+
+        with STAGE_SECONDS.time(stage='routing', expert='router'):
+            result, local_type, confidence = await self._select_fast(query)
+            if result:
+                return result
+
+            if self.single_flight is not None:
+                return await self.single_flight.do(
+                    normalize_query(query),
+                    lambda: self._route_with_llm(query, local_type, confidence, deadline)
+                )
+            return await self._route_with_llm(query, local_type, confidence, deadline)
+
+    async def _route_with_llm(self, query: str, local_type: Optional[str], confidence: float,
+                              deadline: Optional[Deadline] = None) -> WeightedRoute:
+        """Route a query the fast path could not resolve and cache the decision
+
+        Args:
+            query (str): User query
+            local_type (Optional[str]): Local classifier's guess, to measure its accuracy
+            confidence (float): Local classifier confidence
+            deadline (Deadline, optional): Request deadline. Defaults to None.
+
+        Returns:
+            WeightedRoute: Weighted experts and direct response
+        """
+        result = await self._select_with_llm(query, deadline)
+        if not result[0] and not result[1] and local_type and deadline is not None and deadline.expired():
+            # Out of time: the local guess beats answering nothing
+            self.stats['deadline_fallbacks'] += 1
+            return [(local_type, 1.0)], None
+
+        if local_type:
+            self._record_agreement(local_type, confidence, self._top(result)[0])
+        self._cache_route(query, result)
+        return result
+
+    @staticmethod
+    def _top(route: WeightedRoute) -> Route:
+        """Reduce a weighted route to the single most relevant expert"""
+        experts, direct_response = route
+        if experts:
+            return experts[0][0], None
+        return None, direct_response
+
+    async def select_experts(self, queries: List[str], deadline: Optional[Deadline] = None) -> List[Route]:
+        """Select experts for many queries with as few LLM calls as possible
+
+        Cache and local classifier hits are resolved first. The remaining distinct
+        queries are packed into numbered prompts within the token budget, the prompts
+        run concurrently, and any query the batch answer does not cover falls back
+        to a single routing call.
+
+        Args:
+            queries (List[str]): User queries
+            deadline (Deadline, optional): Request deadline shared by every routing call. Defaults to None.
+
+        Returns:
+            List[Route]: Expert type and direct response per query, in input order
+        """
+        results: List[Optional[WeightedRoute]] = [None] * len(queries)
+        pending: Dict[str, List[int]] = {}
+        local_guesses: Dict[str, Tuple[Optional[str], float]] = {}
+
+        for index, query in enumerate(queries):
+            self.stats['requests'] += 1
+            result, local_type, confidence = await self._select_fast(query)
+            if result:
+                results[index] = result
+                continue
+            key = normalize_query(query)
+            if key not in pending:
+                local_guesses[key] = (local_type, confidence)
+            pending.setdefault(key, []).append(index)
+
+        unique_queries = [queries[indexes[0]] for indexes in pending.values()]
+        chunks = self._pack_batches(unique_queries)
+        chunk_routes = await asyncio.gather(*(self._select_batch_with_llm(chunk, deadline) for chunk in chunks))
+
+        routes: Dict[str, Optional[WeightedRoute]] = {}
+        for chunk, chunk_result in zip(chunks, chunk_routes):
+            for query, route in zip(chunk, chunk_result):
+                routes[normalize_query(query)] = route
+
+        missing = [query for query in unique_queries if routes[normalize_query(query)] is None]
+        fallback_routes = await asyncio.gather(*(self._select_with_llm(query, deadline) for query in missing))
+        for query, route in zip(missing, fallback_routes):
+            routes[normalize_query(query)] = route
+
+        for key, indexes in pending.items():
+            route = routes[key]
+            local_type, confidence = local_guesses[key]
+            if local_type:
+                self._record_agreement(local_type, confidence, self._top(route)[0])
+            self._cache_route(queries[indexes[0]], route)
+            for index in indexes:
+                results[index] = route
+
+        return [self._top(route) for route in results]
+
+    async def _select_fast(self, query: str) -> Tuple[Optional[WeightedRoute], Optional[str], float]:
+        """Resolve query from the routing cache or the local classifier
+
+        Args:
+            query (str): User query
+
+        Returns:
+            Tuple[Optional[WeightedRoute], Optional[str], float]: Route if resolved, plus the
+                local classifier label and confidence for accuracy tracking
+        """
+        if self.cache is not None:
+            cached = self.cache.get(normalize_query(query))
+            if cached:
+                return cached, None, 0.0
+
+        local_type, confidence = self.classify_local(query)
+        if local_type and confidence >= self.threshold:
+            self.stats['local_hits'] += 1
+            if self.shadow_rate and random.random() < self.shadow_rate:
+                # Measured off the request path: the local hit is answered right away
+                task = asyncio.ensure_future(self._shadow(query, local_type, confidence))
+                self._shadow_tasks.add(task)
+                task.add_done_callback(self._shadow_tasks.discard)
+            route = ([(local_type, 1.0)], None)
+            self._cache_route(query, route)
+            return route, local_type, confidence
+
+        return None, local_type, confidence
+
+    async def _shadow(self, query: str, local_type: str, confidence: float) -> None:
+        """Route a local hit with the LLM too, to measure the classifier's accuracy"""
         try:
-            system_prompt = """You are an expert classifier. Your task is to determine which expert should handle a given query.
-            Available experts are:
-            - sports: For sports and fitness related queries
-            - food: For food, cooking, and nutrition related queries
-            - ai: For artificial intelligence and technology related queries
-            - sudostar: For questions about the SudoStar mobile application
-            
-            Respond with ONLY the expert type (sports/food/ai/sudostar) or 'none' if no specific expert is needed.
-            If responding with 'none', also provide a brief direct response to the query."""
-            
-            response = await self.openai_client.get_completion(system_prompt, query)
+            llm_route = await self._select_with_llm(query)
+            self._record_agreement(local_type, confidence, self._top(llm_route)[0])
+        except Exception as e:
+            self.logger.error(f"Error in shadow routing: {str(e)}")
+
+    def _cache_route(self, query: str, route: WeightedRoute) -> None:
+        """Store a routing decision; failed routing ([], None) is not cached
+        so the next request retries"""
+        if self.cache is not None and (route[0] or route[1]):
+            self.cache.set(normalize_query(query), route)
+
+    def _pack_batches(self, queries: List[str]) -> List[List[str]]:
+        """Split queries into chunks that fit the batch prompt and answer budgets
+
+        Args:
+            queries (List[str]): Queries to pack
+
+        Returns:
+            List[List[str]]: Query chunks
+        """
+        chunks: List[List[str]] = []
+        current: List[str] = []
+        used = estimate_tokens(BATCH_ROUTING_PROMPT)
+
+        for query in queries:
+            # Line number and newline cost a few tokens on top of the query itself
+            cost = estimate_tokens(query) + 4
+            if current and (used + cost > self.batch_prompt_tokens or len(current) >= self.batch_max_items):
+                chunks.append(current)
+                current = []
+                used = estimate_tokens(BATCH_ROUTING_PROMPT)
+            current.append(query)
+            used += cost
+
+        if current:
+            chunks.append(current)
+        return chunks
+
+    async def _select_batch_with_llm(self, queries: List[str],
+                                     deadline: Optional[Deadline] = None) -> List[Optional[WeightedRoute]]:
+        """Route a chunk of queries with one LLM call
+
+        Args:
+            queries (List[str]): Queries in the chunk
+            deadline (Deadline, optional): Request deadline; the call gets a share of the remaining time.
+                Defaults to None.
+
+        Returns:
+            List[Optional[WeightedRoute]]: Route per query, None where the answer was missing or invalid
+        """
+        if len(queries) == 1:
+            return [await self._select_with_llm(queries[0], deadline)]
+
+        routes: List[Optional[WeightedRoute]] = [None] * len(queries)
+        try:
+            self.stats['llm_calls'] += 1
+            self.stats['batch_calls'] += 1
+            user_prompt = "\n".join(
+                f"{number}. {' '.join(query.split())}" for number, query in enumerate(queries, 1)
+            )
+            timeout = deadline.share(self.deadline_share) if deadline is not None else None
+            response = await run_with_timeout(
+                self.openai_client.get_completion(
+                    BATCH_ROUTING_PROMPT,
+                    user_prompt,
+                    max_tokens=self.batch_answer_tokens * len(queries),
+                    timeout=timeout
+                ),
+                timeout
+            )
             if not response:
-                return None, None
-                
-            # Parse response
-            response = response.strip().lower()
-            if response.startswith(('sports', 'food', 'ai', 'sudostar')):
-                return response.split()[0], None
-                
-            # If no specific expert needed, extract direct response
-            if response.startswith('none'):
-                direct_response = response[5:].strip()  # Remove 'none' prefix
-                return None, direct_response if direct_response else None
-                
-            return None, None
-            
+                return routes
+
+            match = re.search(r"\[.*\]", response, re.DOTALL)
+            items = json.loads(match.group(0)) if match else []
+            for item in items:
+                # One malformed element must not cost the routes of the rest
+                if not isinstance(item, dict):
+                    continue
+                try:
+                    index = int(item.get('id', 0)) - 1
+                except (TypeError, ValueError):
+                    continue
+                expert = str(item.get('expert', '')).strip().lower()
+                if not 0 <= index < len(queries):
+                    continue
+                if expert in EXPERT_TYPES:
+                    routes[index] = ([(expert, 1.0)], None)
+                elif expert == 'none':
+                    routes[index] = ([], item.get('answer') or None)
+
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Batch routing of {len(queries)} queries timed out")
         except Exception as e:
-            self.logger.error(f"Error selecting expert: {str(e)}")
-            return None, None 
\ No newline at end of file
+            self.logger.error(f"Error selecting experts in batch: {str(e)}")
+
+        return routes
+
+    async def _select_with_llm(self, query: str, deadline: Optional[Deadline] = None) -> WeightedRoute:
+        """Select expert using the LLM router
+
+        With a deadline, each model call gets a share of the remaining time. When
+        the deadline passes before the last tier, the best route so far is kept.
+
+        Args:
+            query (str): User query
+            deadline (Deadline, optional): Request deadline. Defaults to None.
+
+        Returns:
+            WeightedRoute: Weighted experts and direct response if no expert needed
+        """
+        tiers = self.get_clients()
+        best: Optional[WeightedRoute] = None
+        for position, client in enumerate(tiers):
+            if deadline is not None and deadline.expired():
+                self.logger.warning("Routing deadline passed, keeping best route so far")
+                return best or ([], None)
+
+            is_last = position == len(tiers) - 1
+            tier_stats = self._tier_stats.setdefault(position, {
+                'calls': 0, 'accepted': 0, 'escalated': 0, 'latency_ms': 0.0
+            })
+
+            started_at = time.perf_counter()
+            try:
+                self.stats['llm_calls'] += 1
+                timeout = deadline.share(self.deadline_share) if deadline is not None else None
+                response = await run_with_timeout(
+                    client.get_completion(ROUTING_PROMPT, query, timeout=timeout), timeout
+                )
+                route, confidence = self._parse_route(response)
+            except asyncio.TimeoutError:
+                self.logger.warning(f"Routing with {client.model} timed out")
+                route, confidence = None, None
+            except Exception as e:
+                self.logger.error(f"Error selecting expert: {str(e)}")
+                route, confidence = None, None
+            finally:
+                # Failed and timed out calls count too, so escalation_rate stays within 0-1
+                tier_stats['calls'] += 1
+                tier_stats['latency_ms'] += (time.perf_counter() - started_at) * 1000
+
+            if is_last:
+                tier_stats['accepted'] += int(route is not None)
+                # A failed last tier keeps the best earlier route, like an expired deadline does
+                return route or best or ([], None)
+
+            if route is not None and confidence is not None and confidence >= self.cascade_min_confidence:
+                tier_stats['accepted'] += 1
+                return route
+            best = route or best
+
+            tier_stats['escalated'] += 1
+            self.logger.info(f"Escalating routing from {client.model} (confidence: {confidence})")
+
+        return [], None
+
+    def _parse_route(self, response: Optional[str]) -> Tuple[Optional[WeightedRoute], Optional[float]]:
+        """Parse a routing answer
+
+        The JSON object asked for by the prompt is preferred; a plain
+        "<label> [confidence] [direct response]" answer is still understood.
+
+        Args:
+            response (Optional[str]): Raw router output
+
+        Returns:
+            Tuple[Optional[WeightedRoute], Optional[float]]: Route (None if malformed) and confidence if given
+        """
+        if not response:
+            return None, None
+
+        json_match = re.search(r"\{.*\}", response, re.DOTALL)
+        if json_match:
+            try:
+                return self._parse_json_route(json.loads(json_match.group(0)))
+            except (ValueError, TypeError, AttributeError):
+                pass
+
+        match = ROUTE_RE.match(response.strip().lower())
+        if not match:
+            return None, None
+
+        label, confidence, direct_response = match.groups()
+        confidence = float(confidence) if confidence is not None else None
+        if label in EXPERT_TYPES:
+            return ([(label, 1.0)], None), confidence
+
+        # If no specific expert needed, keep the direct response
+        if label == 'none':
+            return ([], direct_response.strip() or None), confidence
+
+        return None, None
+
+    @staticmethod
+    def _parse_json_route(data: Dict[str, Any]) -> Tuple[Optional[WeightedRoute], Optional[float]]:
+        """Parse the JSON routing answer into normalized weighted experts
+
+        Args:
+            data (Dict[str, Any]): Decoded router output
+
+        Returns:
+            Tuple[Optional[WeightedRoute], Optional[float]]: Route (None if malformed) and confidence if given
+        """
+        weights: Dict[str, float] = {}
+        for item in data.get('experts') or []:
+            name = str(item.get('name', '')).strip().lower()
+            if name not in EXPERT_TYPES:
+                return None, None
+            weights[name] = weights.get(name, 0.0) + max(float(item.get('weight', 1.0)), 0.0)
+
+        confidence = data.get('confidence')
+        confidence = float(confidence) if confidence is not None else None
+        total = sum(weights.values())
+        if weights and total > 0:
+            experts = sorted(((e, w / total) for e, w in weights.items()), key=lambda item: item[1], reverse=True)
+            return (experts, None), confidence
+
+        direct_response = data.get('answer')
+        if direct_response:
+            return ([], str(direct_response).strip()), confidence
+        return None, None
+
+    def _record_agreement(self, local_type: str, confidence: float, llm_type: Optional[str]) -> None:
+        """Record whether the local classifier agreed with the LLM router
+
+        Args:
+            local_type (str): Local classifier label
+            confidence (float): Local classifier confidence
+            llm_type (Optional[str]): LLM router label, None if routing failed or answered directly
+        """
+        # A failed or timed out LLM call says nothing about the classifier
+        if llm_type is None:
+            return
+        agreed = local_type == llm_type
+        self.stats['evaluated'] += 1
+        self.stats['agreed'] += int(agreed)
+
+        bucket = self._buckets.setdefault(min(int(confidence * 10), 9) / 10, [0, 0])
+        bucket[0] += 1
+        bucket[1] += int(agreed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get routing statistics
+
+        Accuracy is measured against the LLM router on queries that fell through
+        (and on shadowed local hits), bucketed by local confidence so the threshold
+        can be tuned: a bucket with high accuracy below the threshold is safe to take.
+
+        Returns:
+            Dict[str, Any]: Routing statistics
+        """
+        stats = dict(self.stats)
+        stats['threshold'] = self.threshold
+        stats['local_hit_rate'] = (
+            stats['local_hits'] / stats['requests'] if stats['requests'] else 0.0
+        )
+        stats['local_accuracy'] = (
+            stats['agreed'] / stats['evaluated'] if stats['evaluated'] else None
+        )
+        stats['accuracy_by_confidence'] = {
+            f"{bucket:.1f}": {
+                'evaluated': evaluated,
+                'accuracy': agreed / evaluated
+            }
+            for bucket, (evaluated, agreed) in sorted(self._buckets.items())
+        }
+        stats['cache'] = self.cache.get_stats() if self.cache is not None else None
+        stats['single_flight'] = self.single_flight.get_stats() if self.single_flight is not None else None
+
+        tiers = []
+        for position, client in enumerate(self.get_clients()):
+            tier = dict(self._tier_stats.get(position, {'calls': 0, 'accepted': 0, 'escalated': 0, 'latency_ms': 0.0}))
+            tier['model'] = client.model
+            tier['avg_latency_ms'] = tier['latency_ms'] / tier['calls'] if tier['calls'] else 0.0
+            tier['escalation_rate'] = tier['escalated'] / tier['calls'] if tier['calls'] else 0.0
+            # Client usage counts every call of the model, batch routing included and cache hits excluded
+            tier['usage'] = dict(getattr(client, 'usage', {}))
+            tiers.append(tier)
+        stats['tiers'] = tiers
+        return stats
@@ -0,0 +1,400 @@
+"""Background jobs for questions that take longer than an HTTP request"""
+import os
+import json
+import time
+import uuid
+import sqlite3
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+Job = Dict[str, Any]
+JobHandler = Callable[[str], Awaitable[Dict[str, Any]]]
+
+class MemoryJobStore:
+    """Keeps jobs in this process; they are lost on restart and visible to one worker only"""
+
+    def __init__(self):
+        """Initialize job store"""
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job_id: str, question: str, owner: Optional[str] = None,
+               lease_until: Optional[float] = None) -> Job:
+        """Store a new queued job
+
+        Args:
+            job_id (str): Job id
+            question (str): User question
+            owner (str, optional): Runner holding the job. Defaults to None.
+            lease_until (float, optional): Unix time until which the owner holds the job. Defaults to None.
+
+        Returns:
+            Job: Stored job
+        """
+        now = time.time()
+        job = {
+            'id': job_id,
+            'status': 'queued',
+            'question': question,
+            'result': None,
+            'error': None,
+            'owner': owner,
+            'lease_until': lease_until,
+            'created_at': now,
+            'updated_at': now
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+        return dict(job)
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        """Update fields of a job
+
+        Args:
+            job_id (str): Job id
+            **fields: Fields to set
+        """
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields, updated_at=time.time())
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job
+
+        Args:
+            job_id (str): Job id
+
+        Returns:
+            Optional[Job]: Job or None if unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def purge(self, older_than: float) -> int:
+        """Delete finished jobs last updated before a time
+
+        Args:
+            older_than (float): Unix time
+
+        Returns:
+            int: Number of jobs deleted
+        """
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job['status'] in ('done', 'failed') and job['updated_at'] < older_than
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+        return len(expired)
+
+    def renew(self, owner: str, lease_until: float) -> int:
+        """Extend the lease of an owner's unfinished jobs
+
+        Only this process sees these jobs, so there is no one to hold them against.
+
+        Args:
+            owner (str): Runner holding the jobs
+            lease_until (float): New lease end, Unix time
+
+        Returns:
+            int: Number of jobs renewed
+        """
+        return 0
+
+    def claim_stale(self, owner: str, lease_until: float) -> List[Job]:
+        """Claim unfinished jobs whose owner's lease expired
+
+        Nothing survives a restart in memory, so there is never anything to claim.
+
+        Args:
+            owner (str): Runner taking the jobs over
+            lease_until (float): Lease end for the claimed jobs, Unix time
+
+        Returns:
+            List[Job]: Claimed jobs
+        """
+        return []
+
+class SQLiteJobStore:
+    """Keeps jobs in a SQLite file shared by every worker on the host
+
+    Jobs survive worker restarts, and a job can be polled through any worker.
+    Each unfinished job is leased to the runner that queued it; the runner
+    renews its leases while it lives, and only jobs whose lease expired are
+    taken over by another worker.
+    """
+
+    def __init__(self, path: str):
+        """Initialize job store
+
+        Args:
+            path (str): SQLite database path
+        """
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    question TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    owner TEXT,
+                    lease_until REAL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+            # Files created before leases existed; their jobs count as unleased
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in (('owner', 'TEXT'), ('lease_until', 'REAL')):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_updated ON jobs (status, updated_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def create(self, job_id: str, question: str, owner: Optional[str] = None,
+               lease_until: Optional[float] = None) -> Job:
+        now = time.time()
+        self._connect().execute(
+            "INSERT INTO jobs (id, status, question, owner, lease_until, created_at, updated_at) "
+            "VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+            (job_id, question, owner, lease_until, now, now)
+        )
+        return self.get(job_id)
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        if 'result' in fields:
+            fields['result'] = json.dumps(fields['result'], ensure_ascii=False)
+        fields['updated_at'] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        self._connect().execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id: str) -> Optional[Job]:
+        row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_job(row) if row else None
+
+    def purge(self, older_than: float) -> int:
+        cursor = self._connect().execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?", (older_than,)
+        )
+        return cursor.rowcount
+
+    def renew(self, owner: str, lease_until: float) -> int:
+        cursor = self._connect().execute(
+            "UPDATE jobs SET lease_until = ? WHERE owner = ? AND status IN ('queued', 'running')",
+            (lease_until, owner)
+        )
+        return cursor.rowcount
+
+    def claim_stale(self, owner: str, lease_until: float) -> List[Job]:
+        conn = self._connect()
+        now = time.time()
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers never claim the same job
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE status IN ('queued', 'running') "
+                "AND (lease_until IS NULL OR lease_until < ?)",
+                (now,)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE jobs SET status = 'queued', owner = ?, lease_until = ?, updated_at = ? WHERE id = ?",
+                [(owner, lease_until, now, row['id']) for row in rows]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return [self._to_job(row) for row in rows]
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> Job:
+        job = dict(row)
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+class JobRunner:
+    """Runs jobs on a bounded pool of workers on a dedicated event loop thread
+
+    Jobs run on their own loop, so they keep going across requests whether the
+    app is served by Flask (a loop per request) or ASGI. Finished jobs are kept
+    for ttl seconds, then purged. The runner holds its unfinished jobs under a
+    lease of stale_after seconds, renewed every third of that, so a restarting
+    worker only takes over jobs whose runner stopped.
+    """
+
+    def __init__(self, store, handler: JobHandler, config: Optional[Dict[str, Any]] = None):
+        """Initialize job runner
+
+        Args:
+            store: MemoryJobStore or SQLiteJobStore
+            handler (JobHandler): Coroutine function answering a question, run on the job loop
+            config (Dict[str, Any], optional): Jobs configuration. Defaults to None.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.store = store
+        self.handler = handler
+        self.config = config or {}
+        self.workers = self.config.get('workers', 4)
+        self.max_queued = self.config.get('max_queued', 100)
+        self.ttl = self.config.get('ttl', 3600)
+        self.stale_after = self.config.get('stale_after', 300)
+        # Process id plus a boot id: a restarted worker may get the same pid
+        self.owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self.stats = {
+            'submitted': 0,
+            'rejected': 0,
+            'done': 0,
+            'failed': 0,
+            'recovered': 0,
+            'purged': 0
+        }
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the job loop thread and recover jobs abandoned by stopped workers"""
+        if self._loop is not None:
+            return
+
+        self._loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        thread = threading.Thread(target=self._run_loop, args=(ready,), name='job-runner', daemon=True)
+        thread.start()
+        ready.wait()
+
+        recovered = self.store.claim_stale(self.owner, self._lease_until())
+        for job in recovered:
+            self._enqueue(job['id'], job['question'])
+        self.stats['recovered'] += len(recovered)
+        if recovered:
+            self.logger.info(f"Recovered {len(recovered)} unfinished jobs")
+
+    def _run_loop(self, ready: threading.Event) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue()
+        for _ in range(self.workers):
+            self._loop.create_task(self._work())
+        self._loop.create_task(self._purge_periodically())
+        self._loop.create_task(self._renew_periodically())
+        self._loop.call_soon(ready.set)
+        self._loop.run_forever()
+
+    def submit(self, question: str) -> Optional[Job]:
+        """Queue a question
+
+        Args:
+            question (str): User question
+
+        Returns:
+            Optional[Job]: Queued job, None if the queue is full
+        """
+        with self._lock:
+            if self._pending >= self.max_queued:
+                self.stats['rejected'] += 1
+                return None
+            self._pending += 1
+
+        job = self.store.create(uuid.uuid4().hex, question, self.owner, self._lease_until())
+        self.stats['submitted'] += 1
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (job['id'], question))
+        return job
+
+    def _enqueue(self, job_id: str, question: str) -> None:
+        with self._lock:
+            self._pending += 1
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (job_id, question))
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job, None if unknown or expired
+
+        Args:
+            job_id (str): Job id
+
+        Returns:
+            Optional[Job]: Job
+        """
+        job = self.store.get(job_id)
+        if job and job['status'] in ('done', 'failed') and job['updated_at'] < time.time() - self.ttl:
+            return None
+        return job
+
+    async def _work(self) -> None:
+        while True:
+            job_id, question = await self._queue.get()
+            try:
+                self.store.update(job_id, status='running')
+                result = await self.handler(question)
+                self.store.update(job_id, status='done', result=result)
+                self.stats['done'] += 1
+            except Exception as e:
+                self.logger.error(f"Job {job_id} failed: {str(e)}")
+                self.store.update(job_id, status='failed', error=str(e))
+                self.stats['failed'] += 1
+            finally:
+                with self._lock:
+                    self._pending -= 1
+
+    def _lease_until(self) -> float:
+        return time.time() + self.stale_after
+
+    async def _renew_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.stale_after / 3)
+            try:
+                self.store.renew(self.owner, self._lease_until())
+            except Exception as e:
+                self.logger.error(f"Error renewing job leases: {str(e)}")
+
+    async def _purge_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(min(60, self.ttl))
+            try:
+                self.stats['purged'] += self.store.purge(time.time() - self.ttl)
+            except Exception as e:
+                self.logger.error(f"Error purging jobs: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get job statistics
+
+        Returns:
+            Dict[str, Any]: Job counters and current queue depth
+        """
+        stats = dict(self.stats)
+        stats['pending'] = self._pending
+        stats['workers'] = self.workers
+        return stats
+
+def create_job_store(config: Dict[str, Any]):
+    """Create the configured job store
+
+    Args:
+        config (Dict[str, Any]): Jobs configuration
+
+    Returns:
+        MemoryJobStore or SQLiteJobStore
+    """
+    store = config.get('store', 'memory')
+    if store == 'memory':
+        return MemoryJobStore()
+    if store == 'sqlite':
+        return SQLiteJobStore(config.get('path', 'jobs.sqlite3'))
+    raise ValueError(f"Unknown job store: {store}")
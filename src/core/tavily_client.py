@@ -1,8 +1,10 @@
 """Tavily API istemcisi"""
 import os
+import time
 import logging
 from typing import List, Dict, Any, Optional
 import aiohttp
+from src.utils.metrics import UPSTREAM_SECONDS, UPSTREAM_ERRORS
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +29,8 @@ class TavilyClient:
         search_depth: str = "advanced",
         include_domains: Optional[List[str]] = None,
         exclude_domains: Optional[List[str]] = None,
-        max_results: int = 5
+        max_results: int = 5,
+        timeout: float = 10.0
     ) -> List[Dict[str, Any]]:
         """Web araması yap
         
@@ -37,10 +40,12 @@ class TavilyClient:
             include_domains (List[str], optional): Dahil edilecek domainler
             exclude_domains (List[str], optional): Hariç tutulacak domainler
             max_results (int): Maksimum sonuç sayısı
+            timeout (float): İstek zaman aşımı (saniye)
             
         Returns:
             List[Dict[str, Any]]: Arama sonuçları
         """
+        started_at = time.perf_counter()
         try:
             url = f"{self.base_url}/search"
             
@@ -55,7 +60,7 @@ class TavilyClient:
             if exclude_domains:
                 data["exclude_domains"] = exclude_domains
                 
-            async with aiohttp.ClientSession() as session:
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
                 async with session.post(url, headers=self.headers, json=data) as response:
                     response.raise_for_status()
                     result = await response.json()
@@ -63,5 +68,9 @@ class TavilyClient:
                     return results[:max_results]
             
         except Exception as e:
+            UPSTREAM_ERRORS.inc(upstream='tavily', expert='none')
             logger.error(f"Tavily arama hatası: {str(e)}")
-            return [] 
\ No newline at end of file
+            return []
+            
+        finally:
+            UPSTREAM_SECONDS.observe(time.perf_counter() - started_at, upstream='tavily', expert='none')
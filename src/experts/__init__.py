@@ -1,7 +1,19 @@
-"""Experts package"""
-from .ai.expert import AIExpert
-from .food.expert import FoodExpert
-from .sports.expert import SportsExpert
-from .sudostar.expert import SudoStarExpert
+"""Experts package
 
-__all__ = ['AIExpert', 'FoodExpert', 'SportsExpert', 'SudoStarExpert'] 
\ No newline at end of file
+Expert classes are imported on first access, so importing this package does
+not pull in every expert's clients and knowledge bases.
+"""
+from src.utils.lazy import lazy_exports
+
+# Exported class name -> (module, class name)
+_EXPORTS = {
+    'AIExpert': ('.ai.expert', 'AIExpert'),
+    'FoodExpert': ('.food.expert', 'FoodExpert'),
+    'SportsExpert': ('.sports.expert', 'SportsExpert'),
+    'SudoStarExpert': ('.sudostar.expert', 'SudoStarExpert'),
+    'ExpertRegistry': ('.registry', 'ExpertRegistry')
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, globals(), _EXPORTS)
@@ -1,13 +1,47 @@
 """Base expert class for all expert types"""
+import time
+import asyncio
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator, Awaitable
 from src.utils.openai_client import OpenAIClient
 from src.utils.web_search import WebSearchClient
-from src.utils.cache import Cache
+from src.utils.cache import create_cache
+from src.utils.single_flight import SingleFlight
+from src.utils.text import normalize_query
+from src.utils.deadline import Deadline, run_with_timeout
+from src.utils.metrics import STAGE_SECONDS, RESPONSE_SECONDS
+
+# Share of the remaining request deadline each pipeline stage may use; what a
+# stage leaves unused goes to the next, cheaper source
+STAGE_SHARES = {
+    'local': 0.1,
+    'url': 0.3,
+    'llm': 0.8,
+    'web': 1.0
+}
+
+# Pipeline stage -> stage label of the expert_stage_seconds metric
+STAGE_METRICS = {
+    'local': 'local',
+    'url': 'url',
+    'llm': 'generation',
+    'web': 'web_search'
+}
 
 class BaseExpert:
     """Base expert class that all other experts inherit from"""
     
+    # Expert type, used to label metrics and namespace the shared cache
+    NAME = 'expert'
+    
+    # Experts answer with an apology starting with this when no source worked
+    FALLBACK_PREFIX = "Üzgünüm"
+    
+    FALLBACK_RESPONSE = "Üzgünüm, bu soruya yanıt üretemiyorum. Lütfen soruyu daha açık bir şekilde sorar mısınız?"
+    
+    SYSTEM_PROMPT = """You are an expert assistant. Provide accurate and helpful responses
+            about your area of expertise. If you're not confident about the answer, indicate that."""
+    
     def __init__(self, config: Dict[str, Any]):
         """Initialize the expert with configuration
         
@@ -22,7 +56,10 @@ class BaseExpert:
         self.openai_client = OpenAIClient(
             model=openai_config.get('model', 'gpt-4'),
             max_tokens=openai_config.get('max_tokens', 300),
-            temperature=openai_config.get('temperature', 0.7)
+            temperature=openai_config.get('temperature', 0.7),
+            timeout=openai_config.get('timeout', 30.0),
+            name=self.NAME,
+            hedge=openai_config.get('hedge', True)
         )
         
         # Initialize web search client if Tavily config exists
@@ -31,27 +68,248 @@ class BaseExpert:
         if tavily_config:
             self.web_search = WebSearchClient(
                 max_results=tavily_config.get('max_results', 5),
-                search_depth=tavily_config.get('search_depth', 'advanced')
+                search_depth=tavily_config.get('search_depth', 'advanced'),
+                timeout=tavily_config.get('timeout', 10.0),
+                name=self.NAME
             )
             
-        # Initialize cache if enabled
+        # Initialize cache if enabled, shared across workers when configured
         self.cache = None
         if config.get('cache_enabled', True):
-            self.cache = Cache(
-                enabled=True,
-                ttl=config.get('cache_ttl', 3600)
+            self.cache = create_cache(
+                self.NAME,
+                ttl=config.get('cache_ttl', 3600),
+                config=config.get('cache_backend')
             )
             
-    async def get_response(self, query: str) -> Optional[str]:
+        # Concurrent identical questions share one pipeline run
+        self.single_flight = None
+        if config.get('single_flight', True):
+            self.single_flight = SingleFlight()
+            
+        self.stage_shares = {**STAGE_SHARES, **config.get('stage_shares', {})}
+        self.stage_timeouts = {stage: 0 for stage in STAGE_SHARES}
+            
+    async def get_response(self, query: str, deadline: Optional[Deadline] = None) -> Optional[str]:
         """Main response generation pipeline
         
+        Tries cache, local knowledge and URL sources, then OpenAI, then web search.
+        
+        Args:
+            query (str): User query to respond to
+            deadline (Deadline, optional): Request deadline; each stage gets a share of
+                the remaining time and is skipped when it runs out. Defaults to None.
+            
+        Returns:
+            Optional[str]: Generated response or None if failed
+        """
+        with RESPONSE_SECONDS.time(expert=self.NAME):
+            if self.single_flight is not None:
+                return await self.single_flight.do(normalize_query(query), lambda: self._run_pipeline(query, deadline))
+            return await self._run_pipeline(query, deadline)
+        
+    async def _run_pipeline(self, query: str, deadline: Optional[Deadline] = None) -> Optional[str]:
+        """Run the response pipeline stages in order
+        
         Args:
             query (str): User query to respond to
+            deadline (Deadline, optional): Request deadline. Defaults to None.
             
         Returns:
             Optional[str]: Generated response or None if failed
         """
-        raise NotImplementedError("Subclasses must implement get_response method")
+        try:
+            source_response = await self._get_source_response(query, deadline)
+            if source_response:
+                return source_response
+                
+            # Generate response using OpenAI
+            timeout = self._stage_timeout('llm', deadline)
+            ai_response = await self._run_stage('llm', self._generate_ai_response(query, timeout), timeout)
+            if ai_response:
+                if self.cache:
+                    self.cache.set(query, ai_response)
+                return ai_response
+                
+            return await self._get_last_resort_response(query, deadline)
+            
+        except Exception as e:
+            self.logger.error(f"Error generating {self.__class__.__name__} response: {str(e)}")
+            return None
+            
+    def _stage_timeout(self, stage: str, deadline: Optional[Deadline]) -> Optional[float]:
+        """Get a stage's share of the remaining deadline
+        
+        Args:
+            stage (str): Stage name, a key of STAGE_SHARES
+            deadline (Optional[Deadline]): Request deadline
+            
+        Returns:
+            Optional[float]: Stage timeout in seconds, None without a deadline
+        """
+        if deadline is None:
+            return None
+        return deadline.share(self.stage_shares[stage])
+        
+    async def _run_stage(self, stage: str, awaitable: Awaitable[Optional[str]], timeout: Optional[float]) -> Optional[str]:
+        """Run a pipeline stage, giving up on it when its timeout runs out
+        
+        Args:
+            stage (str): Stage name, for statistics
+            awaitable (Awaitable[Optional[str]]): Stage coroutine
+            timeout (Optional[float]): Stage timeout in seconds, None to wait indefinitely
+            
+        Returns:
+            Optional[str]: Stage response, None if it failed or timed out
+        """
+        started_at = time.perf_counter()
+        try:
+            return await run_with_timeout(awaitable, timeout)
+        except asyncio.TimeoutError:
+            self.stage_timeouts[stage] += 1
+            self.logger.warning(f"{self.__class__.__name__} {stage} stage timed out after {timeout:.2f}s")
+            return None
+        finally:
+            STAGE_SECONDS.observe(time.perf_counter() - started_at, stage=STAGE_METRICS[stage], expert=self.NAME)
+            
+    async def stream_response(self, query: str, max_chars: Optional[int] = None,
+                              deadline: Optional[Deadline] = None) -> AsyncIterator[str]:
+        """Streaming variant of get_response
+        
+        Answers from cache, local knowledge and URL sources arrive as a single
+        chunk; the OpenAI stage streams its tokens as they are generated.
+        
+        Args:
+            query (str): User query to respond to
+            max_chars (int, optional): Stop generating once the answer is this long, e.g. a
+                tweet. Cut answers are not cached. Defaults to None.
+            deadline (Deadline, optional): Request deadline; the stream is cut when it passes. Defaults to None.
+            
+        Yields:
+            str: Response chunks, nothing if failed
+        """
+        try:
+            source_response = await self._get_source_response(query, deadline)
+            if source_response:
+                yield source_response[:max_chars] if max_chars else source_response
+                return
+                
+            chunks = []
+            cut = False
+            async for chunk in self.openai_client.stream_completion(
+                self._get_system_prompt(), query, max_chars=max_chars,
+                timeout=self._stage_timeout('llm', deadline)
+            ):
+                chunks.append(chunk)
+                yield chunk
+                if deadline is not None and deadline.expired():
+                    # Leaving the loop closes the stream and stops generation
+                    self.stage_timeouts['llm'] += 1
+                    cut = True
+                    break
+            if chunks:
+                response = "".join(chunks)
+                if self.cache and not cut and (max_chars is None or len(response) < max_chars):
+                    self.cache.set(query, response)
+                return
+                
+            yield await self._get_last_resort_response(query, deadline)
+            
+        except Exception as e:
+            self.logger.error(f"Error streaming {self.__class__.__name__} response: {str(e)}")
+            
+    def get_stats(self) -> Dict[str, Any]:
+        """Get expert statistics
+        
+        Returns:
+            Dict[str, Any]: Single-flight coalescing, stage timeout and shared cache statistics
+        """
+        return {
+            'single_flight': self.single_flight.get_stats() if self.single_flight is not None else None,
+            'stage_timeouts': dict(self.stage_timeouts),
+            'cache': self.cache.get_stats() if hasattr(self.cache, 'get_stats') else None
+        }
+        
+    def is_answer(self, response: Optional[str]) -> bool:
+        """Tell a real answer from an empty or fallback apology response
+        
+        Args:
+            response (Optional[str]): Response returned by get_response
+            
+        Returns:
+            bool: True if the response answers the query
+        """
+        return bool(response) and not response.startswith(self.FALLBACK_PREFIX)
+        
+    async def get_local_response(self, query: str) -> Optional[str]:
+        """Run only the cheap local stages: cache lookup and local knowledge base
+        
+        Args:
+            query (str): User query
+            
+        Returns:
+            Optional[str]: Cached or local response, None if the full pipeline is needed
+        """
+        if self.cache:
+            cached_response = self.cache.get(query)
+            if cached_response:
+                return cached_response
+                
+        local_response = await self._check_local_knowledge(query)
+        if local_response and self.cache:
+            self.cache.set(query, local_response)
+        return local_response
+        
+    async def _get_source_response(self, query: str, deadline: Optional[Deadline] = None) -> Optional[str]:
+        """Run the stages before OpenAI: cache, local knowledge and URL sources
+        
+        Args:
+            query (str): User query
+            deadline (Deadline, optional): Request deadline. Defaults to None.
+            
+        Returns:
+            Optional[str]: Response from the first stage that answered or None
+        """
+        local_response = await self._run_stage(
+            'local', self.get_local_response(query), self._stage_timeout('local', deadline)
+        )
+        if local_response:
+            return local_response
+            
+        url_response = await self._run_stage(
+            'url', self._check_url_sources(query), self._stage_timeout('url', deadline)
+        )
+        if url_response and self.cache:
+            self.cache.set(query, url_response)
+        return url_response
+        
+    async def _get_last_resort_response(self, query: str, deadline: Optional[Deadline] = None) -> str:
+        """Run web search, falling back to an apology
+        
+        Args:
+            query (str): User query
+            deadline (Deadline, optional): Request deadline. Defaults to None.
+            
+        Returns:
+            str: Web search response or fallback apology
+        """
+        web_response = await self._run_stage(
+            'web', self._perform_web_search(query), self._stage_timeout('web', deadline)
+        )
+        if web_response:
+            if self.cache:
+                self.cache.set(query, web_response)
+            return web_response
+            
+        return self.FALLBACK_RESPONSE
+        
+    def _get_system_prompt(self) -> str:
+        """Get the system prompt for the OpenAI stage
+        
+        Returns:
+            str: System prompt
+        """
+        return self.SYSTEM_PROMPT
         
     async def _check_local_knowledge(self, query: str) -> Optional[str]:
         """Check local knowledge base for relevant information
@@ -75,21 +333,21 @@ class BaseExpert:
         """
         return None
         
-    async def _generate_ai_response(self, query: str) -> Optional[str]:
+    async def _generate_ai_response(self, query: str, timeout: Optional[float] = None) -> Optional[str]:
         """Generate response using OpenAI
         
         Args:
             query (str): User query to generate response for
+            timeout (float, optional): Request timeout in seconds. Defaults to None.
             
         Returns:
             Optional[str]: Generated response or None if failed
         """
         try:
-            system_prompt = """You are an expert assistant. Provide accurate and helpful responses
-            about your area of expertise. If you're not confident about the answer, indicate that."""
-            
-            response = await self.openai_client.get_completion(system_prompt, query)
-            return response
+            result = await self.openai_client.complete(self._get_system_prompt(), query, timeout=timeout)
+            if result.upstream_down:
+                self.logger.warning(f"OpenAI unavailable for {self.__class__.__name__} ({result.status}), trying web search")
+            return result.text
         except Exception as e:
             self.logger.error(f"Error generating AI response: {str(e)}")
             return None
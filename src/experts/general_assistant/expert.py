@@ -1,6 +1,5 @@
 """General assistant for handling queries that don't match other experts"""
 import logging
-import json
 from typing import Optional, Dict, Any, List, Tuple
 from ..base_expert import BaseExpert
 from .sources import (
@@ -11,6 +10,21 @@ from .sources import (
 class GeneralAssistant(BaseExpert):
     """Assistant for handling any type of query that doesn't match specialized experts"""
     
+    NAME = 'general'
+    
+    # Shape of generated answers; anything else counts as invalid output
+    RESPONSE_SCHEMA = {
+        "type": "object",
+        "required": ["text", "confidence"],
+        "properties": {
+            "text": {"type": "string"},
+            "confidence": {"type": "number", "minimum": 0, "maximum": 1},
+            "is_supported": {"type": "boolean"},
+            "source": {"type": ["string", "null"]},
+            "expert_redirect": {"type": ["string", "null"]}
+        }
+    }
+    
     def __init__(self, config: Dict[str, Any]):
         """Initialize general assistant"""
         super().__init__(config)
@@ -114,8 +128,13 @@ class GeneralAssistant(BaseExpert):
         )
         
         try:
-            response = await self.openai_client.get_completion(system_prompt, user_prompt)
-            result = json.loads(response)
+            completion = await self.openai_client.complete_json(
+                system_prompt, user_prompt, schema=self.RESPONSE_SCHEMA, stage='generation'
+            )
+            if not completion.ok:
+                self.logger.warning(f"No usable response generated: {completion.error}")
+                return None
+            result = completion.data
             
             # Güven skoru kontrolü
             if result.get("confidence", 0) < 0.7:
@@ -4,6 +4,9 @@ import os
 import aiohttp
 from datetime import datetime
 
+# Upper bound for any external API call made while answering a question
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=10)
+
 class WeatherAPI:
     """AccuWeather API istemcisi"""
     
@@ -24,7 +27,7 @@ class WeatherAPI:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with aiohttp.ClientSession(timeout=REQUEST_TIMEOUT) as session:
                 async with session.get(url, params=params) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -44,7 +47,7 @@ class ExchangeAPI:
         url = f"{self.base_url}/{today}/today.xml"
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with aiohttp.ClientSession(timeout=REQUEST_TIMEOUT) as session:
                 async with session.get(url) as response:
                     if response.status == 200:
                         # XML'i parse et
@@ -79,7 +82,7 @@ class NewsAPI:
             params["q"] = query
             
         try:
-            async with aiohttp.ClientSession() as session:
+            async with aiohttp.ClientSession(timeout=REQUEST_TIMEOUT) as session:
                 async with session.get(url, params=params) as response:
                     if response.status == 200:
                         return await response.json()
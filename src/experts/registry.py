@@ -0,0 +1,98 @@
+"""Lazy expert registry"""
+import time
+import logging
+import importlib
+import threading
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional
+
+# Expert type -> (module, class name)
+EXPERT_MODULES = {
+    'sports': ('src.experts.sports.expert', 'SportsExpert'),
+    'food': ('src.experts.food.expert', 'FoodExpert'),
+    'ai': ('src.experts.ai.expert', 'AIExpert'),
+    'sudostar': ('src.experts.sudostar.expert', 'SudoStarExpert')
+}
+
+class ExpertRegistry(Mapping):
+    """Experts keyed by type, each imported and built the first time it is looked up
+
+    Behaves like the dict of experts the dispatcher expects. Iterating or
+    checking membership never builds anything; only item access does.
+    """
+
+    def __init__(self, config: Dict[str, Dict[str, Any]], modules: Optional[Dict[str, tuple]] = None):
+        """Initialize registry
+
+        Args:
+            config (Dict[str, Dict[str, Any]]): Expert configurations keyed by type
+            modules (Dict[str, tuple], optional): Expert type to (module, class name).
+                Defaults to EXPERT_MODULES.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.config = config
+        self.modules = modules if modules is not None else EXPERT_MODULES
+        self._experts: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        # Milliseconds spent importing and building each loaded expert
+        self.load_times: Dict[str, float] = {}
+
+    def __getitem__(self, expert_type: str) -> Any:
+        expert = self._experts.get(expert_type)
+        if expert is None:
+            expert = self._load(expert_type)
+        return expert
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.modules)
+
+    def __len__(self) -> int:
+        return len(self.modules)
+
+    def __contains__(self, expert_type: object) -> bool:
+        return expert_type in self.modules
+
+    def _load(self, expert_type: str) -> Any:
+        if expert_type not in self.modules:
+            raise KeyError(expert_type)
+
+        with self._lock:
+            # Another thread may have built it while we waited
+            if expert_type in self._experts:
+                return self._experts[expert_type]
+
+            started_at = time.perf_counter()
+            module_name, class_name = self.modules[expert_type]
+            expert_class = getattr(importlib.import_module(module_name), class_name)
+            expert = expert_class(self.config[expert_type])
+            self.load_times[expert_type] = (time.perf_counter() - started_at) * 1000
+            self._experts[expert_type] = expert
+
+        self.logger.info(f"Loaded {expert_type} expert in {self.load_times[expert_type]:.0f} ms")
+        return expert
+
+    def preload(self, expert_types: List[str]) -> int:
+        """Build experts ahead of their first question
+
+        Args:
+            expert_types (List[str]): Expert types to build
+
+        Returns:
+            int: Number of experts built
+        """
+        loaded = 0
+        for expert_type in expert_types:
+            try:
+                self[expert_type]
+                loaded += 1
+            except Exception as e:
+                self.logger.error(f"Error loading {expert_type} expert: {str(e)}")
+        return loaded
+
+    def loaded(self) -> Dict[str, Any]:
+        """Get the experts built so far
+
+        Returns:
+            Dict[str, Any]: Built experts keyed by type
+        """
+        return dict(self._experts)
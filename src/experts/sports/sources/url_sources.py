@@ -2,8 +2,10 @@
 import os
 import json
 import logging
+import time
 import aiohttp
 from typing import Dict, List, Optional
+from src.utils.metrics import UPSTREAM_SECONDS, UPSTREAM_ERRORS
 
 logger = logging.getLogger(__name__)
 
@@ -30,22 +32,28 @@ def get_url_sources() -> Dict[str, List[str]]:
             ]
         }
 
-async def fetch_url_content(url: str) -> Optional[str]:
+async def fetch_url_content(url: str, timeout: float = 10.0) -> Optional[str]:
     """Fetch content from URL
     
     Args:
         url (str): URL to fetch
+        timeout (float, optional): Total request timeout in seconds. Defaults to 10.0.
         
     Returns:
         Optional[str]: Content if successful
     """
+    started_at = time.perf_counter()
     try:
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
             async with session.get(url) as response:
                 if response.status == 200:
                     return await response.text()
+                UPSTREAM_ERRORS.inc(upstream='url', expert='sports')
     except Exception as e:
+        UPSTREAM_ERRORS.inc(upstream='url', expert='sports')
         logger.error(f"Error fetching URL {url}: {str(e)}")
+    finally:
+        UPSTREAM_SECONDS.observe(time.perf_counter() - started_at, upstream='url', expert='sports')
     return None
 
 async def search_url_sources(query: str) -> Optional[str]:
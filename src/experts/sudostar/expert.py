@@ -12,6 +12,10 @@ from .sources.openai_prompts import get_system_prompt
 class SudoStarExpert(BaseExpert):
     """Expert for handling SudoStar-related queries"""
     
+    NAME = 'sudostar'
+    
+    FALLBACK_RESPONSE = "Üzgünüm, bu SudoStar sorusuna yanıt üretemiyorum. Lütfen soruyu daha açık bir şekilde sorar mısınız?"
+    
     def __init__(self, config):
         """Initialize SudoStar expert
         
@@ -27,57 +31,14 @@ class SudoStarExpert(BaseExpert):
         self.event_bus.subscribe('question_received', self._on_question_received)
         self.event_bus.subscribe('response_generated', self._on_response_generated)
         
-    async def get_response(self, query: str) -> Optional[str]:
-        """Generate response for SudoStar query
+    def _get_system_prompt(self) -> str:
+        """Get the SudoStar system prompt
         
-        Args:
-            query (str): User query
-            
         Returns:
-            Optional[str]: Generated response or None if failed
+            str: System prompt
         """
-        try:
-            # Check cache first
-            if self.cache:
-                cached_response = self.cache.get(query)
-                if cached_response:
-                    return cached_response
-                    
-            # Check local knowledge base
-            local_response = await self._check_local_knowledge(query)
-            if local_response:
-                if self.cache:
-                    self.cache.set(query, local_response)
-                return local_response
-                
-            # Check URL sources
-            url_response = await self._check_url_sources(query)
-            if url_response:
-                if self.cache:
-                    self.cache.set(query, url_response)
-                return url_response
-                
-            # Generate response using OpenAI
-            system_prompt = get_system_prompt()
-            ai_response = await self.openai_client.get_completion(system_prompt, query)
-            if ai_response:
-                if self.cache:
-                    self.cache.set(query, ai_response)
-                return ai_response
-                
-            # Perform web search as last resort
-            web_response = await self._perform_web_search(query)
-            if web_response:
-                if self.cache:
-                    self.cache.set(query, web_response)
-                return web_response
-                
-            return "Üzgünüm, bu SudoStar sorusuna yanıt üretemiyorum. Lütfen soruyu daha açık bir şekilde sorar mısınız?"
-            
-        except Exception as e:
-            self.logger.error(f"Error generating SudoStar response: {str(e)}")
-            return None
-            
+        return get_system_prompt()
+        
     async def _check_url_sources(self, query: str) -> Optional[str]:
         """Check URL sources for answer
         
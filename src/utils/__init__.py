@@ -1,7 +1,17 @@
-"""Utility modules"""
-from .config import ConfigLoader
-from .cache import Cache
-from .logger import setup_logger
-from .openai_client import OpenAIClient
+"""Utility modules
 
-__all__ = ['ConfigLoader', 'Cache', 'setup_logger', 'OpenAIClient'] 
\ No newline at end of file
+Exports are loaded on first access, so importing one utility module does not
+import the OpenAI SDK along with it.
+"""
+from .lazy import lazy_exports
+
+_EXPORTS = {
+    'ConfigLoader': ('.config', 'ConfigLoader'),
+    'Cache': ('.cache', 'Cache'),
+    'setup_logger': ('.logger', 'setup_logger'),
+    'OpenAIClient': ('.openai_client', 'OpenAIClient')
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, globals(), _EXPORTS)
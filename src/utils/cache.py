@@ -1,19 +1,27 @@
 """Cache utility for storing responses"""
+import json
 import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
 from typing import Dict, Any, Optional
+from src.utils.metrics import CACHE_LOOKUPS, STAGE_SECONDS
 
 class Cache:
     """Simple in-memory cache with TTL support"""
     
-    def __init__(self, enabled: bool = True, ttl: int = 3600):
+    def __init__(self, enabled: bool = True, ttl: int = 3600, name: str = 'none'):
         """Initialize cache
         
         Args:
             enabled (bool, optional): Whether caching is enabled. Defaults to True.
             ttl (int, optional): Time to live in seconds. Defaults to 3600 (1 hour).
+            name (str, optional): Expert using the cache, the metrics label. Defaults to 'none'.
         """
         self.enabled = enabled
         self.ttl = ttl
+        self.name = name
         self._cache: Dict[str, Dict[str, Any]] = {}
         
     def get(self, key: str) -> Optional[str]:
@@ -28,6 +36,12 @@ class Cache:
         if not self.enabled:
             return None
             
+        started_at = time.perf_counter()
+        value = self._lookup(key)
+        _record_lookup(self.name, value, started_at)
+        return value
+        
+    def _lookup(self, key: str) -> Optional[str]:
         if key not in self._cache:
             return None
             
@@ -77,4 +91,352 @@ class Cache:
             if current_time - data['timestamp'] > self.ttl
         ]
         for key in expired_keys:
-            del self._cache[key] 
\ No newline at end of file
+            del self._cache[key]
+
+
+def _record_lookup(name: str, value: Any, started_at: float) -> None:
+    """Record a response cache lookup in the metrics"""
+    STAGE_SECONDS.observe(time.perf_counter() - started_at, stage='cache', expert=name)
+    CACHE_LOOKUPS.inc(expert=name, result='miss' if value is None else 'hit')
+
+
+class LRUCache:
+    """Bounded in-memory cache with TTL, LRU eviction and hit/miss counters"""
+    
+    def __init__(self, max_size: int = 1000, ttl: int = 3600):
+        """Initialize cache
+        
+        Args:
+            max_size (int, optional): Maximum number of entries. Defaults to 1000.
+            ttl (int, optional): Time to live in seconds. Defaults to 3600 (1 hour).
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+    def get(self, key: str) -> Optional[Any]:
+        """Get value from cache if not expired
+        
+        Args:
+            key (str): Cache key
+            
+        Returns:
+            Optional[Any]: Cached value or None if expired/not found
+        """
+        cache_data = self._cache.get(key)
+        if cache_data is None:
+            self.misses += 1
+            return None
+            
+        if time.time() - cache_data['timestamp'] > self.ttl:
+            del self._cache[key]
+            self.misses += 1
+            return None
+            
+        self._cache.move_to_end(key)
+        self.hits += 1
+        return cache_data['value']
+        
+    def set(self, key: str, value: Any) -> None:
+        """Set value in cache, evicting the least recently used entry when full
+        
+        Args:
+            key (str): Cache key
+            value (Any): Value to cache
+        """
+        self._cache[key] = {
+            'value': value,
+            'timestamp': time.time()
+        }
+        self._cache.move_to_end(key)
+        
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+            
+    def remove(self, key: str) -> None:
+        """Remove specific key from cache
+        
+        Args:
+            key (str): Cache key to remove
+        """
+        self._cache.pop(key, None)
+        
+    def clear(self) -> None:
+        """Clear all cached values"""
+        self._cache.clear()
+        
+    def __len__(self) -> int:
+        return len(self._cache)
+        
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics
+        
+        Returns:
+            Dict[str, Any]: Size, hit/miss counters and hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._cache),
+            'max_size': self.max_size,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+class SharedCache:
+    """Cache shared by every worker process on one host
+    
+    Entries live in a SQLite file in WAL mode, so readers in one worker never
+    block writers in another, and a bounded in-process LRUCache sits in front
+    of it. The L1 keeps hot keys off SQLite entirely; its short TTL bounds how
+    long a worker can serve an entry that another worker replaced or removed.
+    Has the same get/set interface as Cache, and namespaces keep each expert's
+    answers apart in the shared file.
+    
+    SQLite calls block the event loop, so a file locked by another worker's
+    write is not waited on for long: the lookup counts as a miss and the write
+    is skipped. The L1 and counters are shared by the serving loop and the job
+    runner thread and are guarded by a lock.
+    """
+    
+    # Expired rows are deleted after this many writes
+    CLEANUP_EVERY = 1000
+    # Seconds a statement waits for another worker's write lock
+    BUSY_TIMEOUT = 0.01
+    
+    def __init__(
+        self,
+        path: str,
+        namespace: str = 'default',
+        enabled: bool = True,
+        ttl: int = 3600,
+        l1_size: int = 1000,
+        l1_ttl: int = 30
+    ):
+        """Initialize cache
+        
+        Args:
+            path (str): SQLite database path, the same for every worker
+            namespace (str, optional): Key namespace of this cache. Defaults to 'default'.
+            enabled (bool, optional): Whether caching is enabled. Defaults to True.
+            ttl (int, optional): Time to live in seconds. Defaults to 3600 (1 hour).
+            l1_size (int, optional): Entries kept in this process. Defaults to 1000.
+            l1_ttl (int, optional): Seconds an entry is served from this process
+                without checking the shared file. Defaults to 30.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.namespace = namespace
+        self.enabled = enabled
+        self.ttl = ttl
+        self.l1 = LRUCache(max_size=l1_size, ttl=min(l1_ttl, ttl))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.stats = {
+            'l1_hits': 0,
+            'l2_hits': 0,
+            'misses': 0,
+            'busy': 0,
+            'errors': 0
+        }
+        
+        # Created once at startup, where waiting for another worker is fine
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+        try:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS cache (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                ) WITHOUT ROWID"""
+            )
+        finally:
+            conn.close()
+            
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.BUSY_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Losing the last writes on power failure is fine for a cache
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+        
+    def get(self, key: str) -> Optional[Any]:
+        """Get value from the L1 or the shared file if not expired
+        
+        Args:
+            key (str): Cache key
+            
+        Returns:
+            Optional[Any]: Cached value or None if expired/not found
+        """
+        if not self.enabled:
+            return None
+            
+        started_at = time.perf_counter()
+        value = self._lookup(key)
+        _record_lookup(self.namespace, value, started_at)
+        return value
+        
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+            
+    def _failed(self, action: str, error: Exception) -> None:
+        """Count a failed SQLite call; a file busy with another worker's write is expected"""
+        if isinstance(error, sqlite3.OperationalError) and 'locked' in str(error):
+            self._count('busy')
+            self.logger.debug(f"Shared cache busy, skipped {action}")
+            return
+        self._count('errors')
+        self.logger.error(f"Error {action} shared cache: {str(error)}")
+        
+    def _lookup(self, key: str) -> Optional[Any]:
+        with self._lock:
+            value = self.l1.get(key)
+            if value is not None:
+                self.stats['l1_hits'] += 1
+                return value
+                
+        try:
+            row = self._connect().execute(
+                "SELECT value FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (self.namespace, key, time.time())
+            ).fetchone()
+        except Exception as e:
+            self._failed('reading', e)
+            self._count('misses')
+            return None
+            
+        if row is None:
+            self._count('misses')
+            return None
+            
+        try:
+            value = json.loads(row[0])
+        except ValueError as e:
+            # A corrupt row is dropped and served as a miss instead of failing the caller
+            self.logger.error(f"Dropping unreadable shared cache entry: {str(e)}")
+            self._count('errors')
+            self.remove(key)
+            return None
+            
+        with self._lock:
+            self.l1.set(key, value)
+            self.stats['l2_hits'] += 1
+        return value
+        
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """Set value in the L1 and the shared file
+        
+        Args:
+            key (str): Cache key
+            value (Any): JSON serializable value to cache
+            ttl (int, optional): Time to live in seconds of this entry. Defaults to the cache's ttl.
+        """
+        if not self.enabled:
+            return
+            
+        ttl = self.ttl if ttl is None else ttl
+        # The L1 has one TTL for every entry; entries meant to expire sooner skip it
+        if ttl >= self.l1.ttl:
+            with self._lock:
+                self.l1.set(key, value)
+        try:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value, ensure_ascii=False), time.time() + ttl)
+            )
+        except Exception as e:
+            self._failed('writing', e)
+            return
+            
+        with self._lock:
+            self._writes += 1
+            cleanup = self._writes % self.CLEANUP_EVERY == 0
+        if cleanup:
+            self.cleanup()
+            
+    def clear(self) -> None:
+        """Clear all values of this namespace"""
+        with self._lock:
+            self.l1.clear()
+        try:
+            self._connect().execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+        except Exception as e:
+            self._failed('clearing', e)
+        
+    def remove(self, key: str) -> None:
+        """Remove specific key from cache
+        
+        Other workers may serve it from their L1 for up to l1_ttl seconds.
+        
+        Args:
+            key (str): Cache key to remove
+        """
+        with self._lock:
+            self.l1.remove(key)
+        try:
+            self._connect().execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+        except Exception as e:
+            self._failed('removing from', e)
+            
+    def cleanup(self) -> None:
+        """Remove all expired entries of every namespace"""
+        try:
+            self._connect().execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+        except Exception as e:
+            self._failed('cleaning up', e)
+            
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics
+        
+        Returns:
+            Dict[str, Any]: L1 and shared file hit counters and hit rate
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats['l1'] = self.l1.get_stats()
+        lookups = stats['l1_hits'] + stats['l2_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['l1_hits'] + stats['l2_hits']) / lookups if lookups else 0.0
+        return stats
+
+
+def create_cache(namespace: str, ttl: int = 3600, config: Optional[Dict[str, Any]] = None):
+    """Create the configured response cache
+    
+    Args:
+        namespace (str): Key namespace, e.g. the expert name
+        ttl (int, optional): Time to live in seconds. Defaults to 3600 (1 hour).
+        config (Dict[str, Any], optional): Cache backend configuration. Defaults to None,
+            a per-process in-memory cache.
+            
+    Returns:
+        Cache or SharedCache
+    """
+    config = config or {}
+    backend = config.get('backend', 'memory')
+    if backend == 'memory':
+        return Cache(enabled=True, ttl=ttl, name=namespace)
+    if backend == 'sqlite':
+        return SharedCache(
+            config.get('path', 'cache.sqlite3'),
+            namespace=namespace,
+            ttl=ttl,
+            l1_size=config.get('l1_size', 1000),
+            l1_ttl=config.get('l1_ttl', 30)
+        )
+    raise ValueError(f"Unknown cache backend: {backend}")
@@ -0,0 +1,111 @@
+"""Circuit breaker for upstream APIs"""
+import time
+import logging
+import threading
+from typing import Any, Dict
+
+class CircuitBreaker:
+    """Fails calls fast while an upstream is degraded
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    are refused for reset_timeout seconds. Then one probe call is let through
+    (half-open): its success closes the circuit, its failure opens it again.
+    Refused calls never reach the upstream, so a struggling provider is not
+    hit by every request and all of their retries.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """Initialize circuit breaker
+
+        Args:
+            name (str): Upstream name, for logs
+            failure_threshold (int, optional): Consecutive failures that open the circuit. Defaults to 5.
+            reset_timeout (float, optional): Seconds the circuit stays open before a probe. Defaults to 30.0.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self.stats = {
+            'opened': 0,
+            'rejected': 0
+        }
+
+    def allow(self) -> bool:
+        """Check whether a call may go to the upstream
+
+        Returns:
+            bool: True if the call may proceed; the caller must then report
+                its outcome with record_success or record_failure
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.stats['rejected'] += 1
+            return False
+
+    def record_success(self) -> None:
+        """Report a successful call"""
+        with self._lock:
+            if self.state != self.CLOSED:
+                self.logger.info(f"Circuit for {self.name} closed")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def release(self) -> None:
+        """Report a call that ended without an outcome, e.g. cancelled by its caller
+
+        Frees the half-open probe slot so the next call can probe instead.
+        """
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """Report a failed call"""
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.stats['opened'] += 1
+                    self.logger.warning(f"Circuit for {self.name} opened after {self.failures} failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def retry_after(self) -> float:
+        """Get the seconds until the next probe is allowed
+
+        Returns:
+            float: Seconds, 0 if the circuit is not open
+        """
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get circuit breaker statistics
+
+        Returns:
+            Dict[str, Any]: State, consecutive failures and open/reject counters
+        """
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            **self.stats
+        }
@@ -0,0 +1,69 @@
+"""Per-request deadlines"""
+import time
+import asyncio
+from typing import Awaitable, Optional, TypeVar
+
+T = TypeVar('T')
+
+class Deadline:
+    """Absolute time budget for one request, shared by every stage it runs
+
+    Stages ask for a share of whatever budget is left when they start, so a
+    slow early stage leaves less time to later ones instead of pushing the
+    request past its deadline.
+    """
+
+    def __init__(self, timeout: float):
+        """Initialize deadline
+
+        Args:
+            timeout (float): Seconds from now until the deadline
+        """
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout
+
+    def remaining(self) -> float:
+        """Get the time left
+
+        Returns:
+            float: Seconds until the deadline, 0 if it has passed
+        """
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        """Check whether the deadline has passed
+
+        Returns:
+            bool: True if no time is left
+        """
+        return self.remaining() <= 0
+
+    def share(self, fraction: float) -> float:
+        """Get a stage's timeout as a fraction of the remaining budget
+
+        Args:
+            fraction (float): Share of the remaining time, between 0 and 1
+
+        Returns:
+            float: Stage timeout in seconds
+        """
+        return self.remaining() * min(max(fraction, 0.0), 1.0)
+
+async def run_with_timeout(awaitable: Awaitable[T], timeout: Optional[float]) -> T:
+    """Await with an optional timeout, cancelling the awaitable when it runs out
+
+    Args:
+        awaitable (Awaitable[T]): Coroutine or future to await
+        timeout (Optional[float]): Seconds to wait, None to wait indefinitely
+
+    Returns:
+        T: Result of the awaitable
+
+    Raises:
+        asyncio.TimeoutError: If the timeout passed first
+    """
+    if timeout is not None and timeout <= 0:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise asyncio.TimeoutError()
+    return await asyncio.wait_for(awaitable, timeout)
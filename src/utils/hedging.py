@@ -0,0 +1,107 @@
+"""Hedging policy for slow upstream calls"""
+import threading
+from collections import deque
+from typing import Any, Dict, Optional
+
+class HedgePolicy:
+    """Decides when a slow call gets a duplicate, and whether one may be sent
+
+    The hedge delay tracks a percentile of the recent latencies of successful
+    calls, so it follows the upstream as it speeds up or slows down: only the
+    slowest (1 - percentile) of calls are hedged. Hedges are paid from a token
+    budget that earns max_ratio tokens per call and holds at most burst, which
+    caps the extra load at about max_ratio even when the upstream slows down
+    for everyone.
+    """
+
+    def __init__(self, percentile: float = 0.95, window: int = 200, min_samples: int = 20,
+                 min_delay: float = 0.5, max_ratio: float = 0.05, burst: float = 10.0):
+        """Initialize hedge policy
+
+        Args:
+            percentile (float, optional): Latency percentile after which a call is hedged. Defaults to 0.95.
+            window (int, optional): Recent latencies kept. Defaults to 200.
+            min_samples (int, optional): Latencies needed before hedging starts. Defaults to 20.
+            min_delay (float, optional): Shortest hedge delay in seconds. Defaults to 0.5.
+            max_ratio (float, optional): Hedges per call, at most, over time. Defaults to 0.05.
+            burst (float, optional): Hedges that may be sent back to back. Defaults to 10.0.
+        """
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_ratio = max_ratio
+        self.burst = burst
+
+        self._latencies = deque(maxlen=window)
+        self._delay: Optional[float] = None
+        self._tokens = burst
+        self._lock = threading.Lock()
+        self.stats = {
+            'calls': 0,
+            'fired': 0,
+            'won': 0,
+            'over_budget': 0,
+            'throttled': 0
+        }
+
+    def record(self, latency: float) -> None:
+        """Record the latency of a successful call
+
+        Args:
+            latency (float): Seconds
+        """
+        with self._lock:
+            self._latencies.append(latency)
+            if len(self._latencies) >= self.min_samples:
+                ordered = sorted(self._latencies)
+                index = min(len(ordered) - 1, int(self.percentile * len(ordered)))
+                self._delay = max(self.min_delay, ordered[index])
+
+    def start_call(self) -> Optional[float]:
+        """Count a call and get its hedge delay
+
+        Returns:
+            Optional[float]: Seconds to wait before hedging, None while there are too few samples
+        """
+        with self._lock:
+            self.stats['calls'] += 1
+            self._tokens = min(self.burst, self._tokens + self.max_ratio)
+            return self._delay
+
+    def try_hedge(self) -> bool:
+        """Take a hedge from the budget
+
+        Returns:
+            bool: True if the hedge may be sent
+        """
+        with self._lock:
+            if self._tokens < 1:
+                self.stats['over_budget'] += 1
+                return False
+            self._tokens -= 1
+            self.stats['fired'] += 1
+            return True
+
+    def refund_hedge(self) -> None:
+        """Return a hedge taken by try_hedge that could not be sent, e.g. rate limited"""
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+            self.stats['fired'] -= 1
+            self.stats['throttled'] += 1
+
+    def record_win(self) -> None:
+        """Count a hedge that finished before the call it duplicated"""
+        with self._lock:
+            self.stats['won'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hedging statistics
+
+        Returns:
+            Dict[str, Any]: Counters and the current hedge delay
+        """
+        return {
+            **self.stats,
+            'delay': self._delay,
+            'samples': len(self._latencies)
+        }
@@ -0,0 +1,182 @@
+"""Startup import report
+
+A built-in counterpart of `python -X importtime`: while recording, every
+module executed by the import system is timed and, optionally, the memory it
+allocates is traced. The report attributes both to each module, on its own
+(self) and including the modules it imported (cumulative).
+
+Enable it for a server with STARTUP_REPORT=1, or profile any module with
+
+    python -m src.utils.import_report app
+"""
+import os
+import sys
+import time
+import logging
+import importlib
+import tracemalloc
+from importlib.abc import MetaPathFinder
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class _TimedLoader:
+    """Wraps a module loader and records how long exec_module takes"""
+
+    def __init__(self, loader, recorder: 'ImportRecorder'):
+        self._loader = loader
+        self._recorder = recorder
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        self._recorder._enter(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._recorder._exit(module.__name__)
+
+class ImportRecorder(MetaPathFinder):
+    """Records time and memory attributed to each imported module"""
+
+    def __init__(self, trace_memory: bool = True):
+        """Initialize recorder
+
+        Args:
+            trace_memory (bool, optional): Trace allocations with tracemalloc, which slows
+                imports down noticeably. Defaults to True.
+        """
+        self.trace_memory = trace_memory
+        self.records: Dict[str, Dict[str, float]] = {}
+        # Modules being executed, innermost last: [name, started_at, memory_at_start, child_ms, child_kb]
+        self._stack: List[list] = []
+        self._started_tracemalloc = False
+
+    def start(self) -> None:
+        """Start recording imports"""
+        if self in sys.meta_path:
+            return
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        sys.meta_path.insert(0, self)
+
+    def stop(self) -> None:
+        """Stop recording imports"""
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def find_spec(self, fullname, path, target=None):
+        # Ask the finders behind us, then wrap whatever loader they found
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimedLoader(spec.loader, self)
+                return spec
+        return None
+
+    def _memory(self) -> int:
+        return tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+
+    def _enter(self, name: str) -> None:
+        self._stack.append([name, time.perf_counter(), self._memory(), 0.0, 0.0])
+
+    def _exit(self, name: str) -> None:
+        _, started_at, memory_at_start, child_ms, child_kb = self._stack.pop()
+        cumulative_ms = (time.perf_counter() - started_at) * 1000
+        cumulative_kb = (self._memory() - memory_at_start) / 1024
+        self.records[name] = {
+            'self_ms': cumulative_ms - child_ms,
+            'cumulative_ms': cumulative_ms,
+            'self_kb': cumulative_kb - child_kb,
+            'cumulative_kb': cumulative_kb
+        }
+        if self._stack:
+            self._stack[-1][3] += cumulative_ms
+            self._stack[-1][4] += cumulative_kb
+
+    def top(self, limit: int = 20, key: str = 'cumulative_ms') -> List[Dict[str, Any]]:
+        """Get the most expensive modules
+
+        Args:
+            limit (int, optional): Number of modules. Defaults to 20.
+            key (str, optional): Record field to sort by. Defaults to 'cumulative_ms'.
+
+        Returns:
+            List[Dict[str, Any]]: Records with their module name, most expensive first
+        """
+        ranked = sorted(self.records.items(), key=lambda item: item[1][key], reverse=True)
+        return [{'module': name, **record} for name, record in ranked[:limit]]
+
+    def format(self, limit: int = 20) -> str:
+        """Format the report as a table
+
+        Args:
+            limit (int, optional): Number of modules. Defaults to 20.
+
+        Returns:
+            str: Report text
+        """
+        lines = [f"{'self ms':>9} {'cum ms':>9} {'self KiB':>9} {'cum KiB':>9}  module"]
+        for record in self.top(limit):
+            lines.append(
+                f"{record['self_ms']:9.1f} {record['cumulative_ms']:9.1f} "
+                f"{record['self_kb']:9.0f} {record['cumulative_kb']:9.0f}  {record['module']}"
+            )
+        total_ms = sum(record['self_ms'] for record in self.records.values())
+        total_kb = sum(record['self_kb'] for record in self.records.values())
+        lines.append(f"{len(self.records)} modules imported in {total_ms:.0f} ms, {total_kb:.0f} KiB allocated")
+        return "\n".join(lines)
+
+_recorder: Optional[ImportRecorder] = None
+
+def start(trace_memory: bool = True) -> ImportRecorder:
+    """Start the process-wide startup report
+
+    Args:
+        trace_memory (bool, optional): Trace allocations per module. Defaults to True.
+
+    Returns:
+        ImportRecorder: Active recorder
+    """
+    global _recorder
+    if _recorder is None:
+        _recorder = ImportRecorder(trace_memory)
+        _recorder.start()
+    return _recorder
+
+def stop_and_log(limit: int = 20) -> Optional[str]:
+    """Stop the startup report and log it
+
+    Args:
+        limit (int, optional): Number of modules to list. Defaults to 20.
+
+    Returns:
+        Optional[str]: Report text, None if no report was started
+    """
+    global _recorder
+    if _recorder is None:
+        return None
+    _recorder.stop()
+    report = _recorder.format(limit)
+    logger.info(f"Startup import report:\n{report}")
+    _recorder = None
+    return report
+
+if __name__ == '__main__':
+    recorder = ImportRecorder()
+    recorder.start()
+    for module_name in sys.argv[1:] or ['app']:
+        importlib.import_module(module_name)
+    recorder.stop()
+    print(recorder.format(int(os.getenv('STARTUP_REPORT_LIMIT', '30'))))
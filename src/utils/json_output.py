@@ -0,0 +1,168 @@
+"""Parsing, local repair and validation of JSON model output"""
+import re
+import json
+from typing import Any, Dict, Optional, Tuple
+from src.utils.metrics import JSON_PARSES
+
+# A ```json fenced block anywhere in the text
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*(.*?)\s*```", re.DOTALL)
+
+# Python literals models sometimes write instead of JSON's
+_LITERALS = {'True': 'true', 'False': 'false', 'None': 'null'}
+
+_TYPES = {
+    'object': dict,
+    'array': list,
+    'string': str,
+    'boolean': bool,
+    'null': type(None)
+}
+
+def repair_json(text: str) -> str:
+    """Fix the usual defects of model-written JSON
+
+    Strips code fences and prose around the value, drops trailing commas and
+    turns Python's True/False/None into JSON literals. String contents are
+    left untouched.
+
+    Args:
+        text (str): Model output
+
+    Returns:
+        str: Text more likely to parse; unchanged parts are kept as they were
+    """
+    fenced = _FENCE_RE.search(text)
+    if fenced:
+        text = fenced.group(1)
+
+    starts = [index for index in (text.find('{'), text.find('[')) if index != -1]
+    if starts:
+        start = min(starts)
+        end = text.rfind('}' if text[start] == '{' else ']')
+        if end > start:
+            text = text[start:end + 1]
+
+    out = []
+    in_string = False
+    escaped = False
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+            out.append(char)
+        elif char == ',':
+            following = text[index + 1:].lstrip()
+            if not following.startswith(('}', ']')):
+                out.append(char)
+        elif char.isalpha():
+            end = index
+            while end < len(text) and (text[end].isalnum() or text[end] == '_'):
+                end += 1
+            word = text[index:end]
+            out.append(_LITERALS.get(word, word))
+            index = end
+            continue
+        else:
+            out.append(char)
+        index += 1
+    return ''.join(out)
+
+def _type_matches(value: Any, expected: str) -> bool:
+    if expected == 'number':
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if expected == 'integer':
+        return isinstance(value, int) and not isinstance(value, bool)
+    python_type = _TYPES.get(expected)
+    return python_type is not None and isinstance(value, python_type)
+
+def validate(data: Any, schema: Dict[str, Any], path: str = '$') -> Optional[str]:
+    """Check data against a JSON Schema subset
+
+    Supports type (a name or a list of names), required, properties, items,
+    enum, minimum and maximum; other keywords are ignored.
+
+    Args:
+        data (Any): Decoded JSON
+        schema (Dict[str, Any]): Schema
+        path (str, optional): Location of data, for the error message. Defaults to '$'.
+
+    Returns:
+        Optional[str]: First problem found, None if data is valid
+    """
+    expected = schema.get('type')
+    if expected is not None:
+        names = expected if isinstance(expected, list) else [expected]
+        if not any(_type_matches(data, name) for name in names):
+            return f"{path}: expected {' or '.join(names)}, got {type(data).__name__}"
+
+    if 'enum' in schema and data not in schema['enum']:
+        return f"{path}: {data!r} is not one of {schema['enum']}"
+
+    if isinstance(data, (int, float)) and not isinstance(data, bool):
+        if 'minimum' in schema and data < schema['minimum']:
+            return f"{path}: {data} is below {schema['minimum']}"
+        if 'maximum' in schema and data > schema['maximum']:
+            return f"{path}: {data} is above {schema['maximum']}"
+
+    if isinstance(data, dict):
+        for key in schema.get('required', []):
+            if key not in data:
+                return f"{path}: missing {key}"
+        for key, subschema in schema.get('properties', {}).items():
+            if key in data:
+                error = validate(data[key], subschema, f"{path}.{key}")
+                if error:
+                    return error
+
+    if isinstance(data, list) and 'items' in schema:
+        for position, item in enumerate(data):
+            error = validate(item, schema['items'], f"{path}[{position}]")
+            if error:
+                return error
+
+    return None
+
+def parse_json(text: Optional[str], schema: Optional[Dict[str, Any]] = None, expert: str = 'none',
+               stage: str = 'json') -> Tuple[Optional[Any], str]:
+    """Decode model output, repairing it locally if it does not parse as is
+
+    Every call is counted in json_parses_total by result: 'valid' parsed as
+    sent, 'repaired' parsed after repair_json, 'invalid' did not parse either
+    way and 'schema_mismatch' parsed but failed validation. The failure rate
+    before repair is (repaired + invalid) / total, after it invalid / total.
+
+    Args:
+        text (Optional[str]): Model output
+        schema (Dict[str, Any], optional): Schema the value must match. Defaults to None.
+        expert (str, optional): Expert name, the metrics label. Defaults to 'none'.
+        stage (str, optional): Pipeline stage, the metrics label. Defaults to 'json'.
+
+    Returns:
+        Tuple[Optional[Any], str]: Decoded value (None unless valid) and the result
+    """
+    data = None
+    result = 'invalid'
+    if text:
+        try:
+            data = json.loads(text)
+            result = 'valid'
+        except ValueError:
+            try:
+                data = json.loads(repair_json(text))
+                result = 'repaired'
+            except ValueError:
+                pass
+
+    if result != 'invalid' and schema is not None and validate(data, schema) is not None:
+        result = 'schema_mismatch'
+    JSON_PARSES.inc(expert=expert, stage=stage, result=result)
+    return (data if result in ('valid', 'repaired') else None), result
@@ -0,0 +1,29 @@
+"""Lazily loaded package exports"""
+import importlib
+from typing import Any, Callable, Dict, List, Tuple
+
+def lazy_exports(package: str, namespace: Dict[str, Any],
+                 exports: Dict[str, Tuple[str, str]]) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """Build a package's __getattr__ and __dir__ that import exports on first access
+
+    Args:
+        package (str): Package name, the __name__ of its __init__
+        namespace (Dict[str, Any]): Package globals, where loaded exports are cached
+        exports (Dict[str, Tuple[str, str]]): Exported name -> (relative module, attribute)
+
+    Returns:
+        Tuple[Callable[[str], Any], Callable[[], List[str]]]: __getattr__ and __dir__ for the package
+    """
+    def __getattr__(name: str) -> Any:
+        if name not in exports:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        module_name, attribute = exports[name]
+        value = getattr(importlib.import_module(module_name, package), attribute)
+        # Cache on the package so later lookups skip __getattr__
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(exports))
+
+    return __getattr__, __dir__
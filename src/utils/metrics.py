@@ -0,0 +1,276 @@
+"""In-process metrics in the Prometheus text format
+
+Counters, gauges and histograms are kept in memory and rendered by the
+/metrics endpoint. Recording a sample is a dict lookup and a few integer
+updates under a lock, a few microseconds, so hot paths can be instrumented
+freely.
+
+Metrics are per worker: with several gunicorn workers each scrape sees the
+worker that served it, so scrape workers individually or aggregate with sum().
+"""
+import time
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Latency buckets in seconds, from cache lookups to slow LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + '}'
+
+class _Metric:
+    """Metric with a fixed set of label names"""
+
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._defaults = ('',) * len(self.label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        # Hot path: no per-label str() or generator, missing labels render as ''
+        return tuple(map(labels.get, self.label_names, self._defaults))
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        """Render the metric in the Prometheus text format
+
+        Returns:
+            List[str]: HELP, TYPE and sample lines
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Increase the counter
+
+        Args:
+            amount (float, optional): Amount to add. Defaults to 1.
+            **labels: Label values
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels: str) -> float:
+        """Get the current value of one label set"""
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> Iterator[str]:
+        for key, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.label_names, key)} {value}"
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        """Set the gauge
+
+        Args:
+            value (float): New value
+            **labels: Label values
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _samples(self) -> Iterator[str]:
+        for key, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.label_names, key)} {value}"
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (last is +Inf), sum]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record a sample
+
+        Args:
+            value (float): Observed value, seconds for latencies
+            **labels: Label values
+        """
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def time(self, **labels: str) -> '_Timer':
+        """Time a block and observe its duration
+
+        Args:
+            **labels: Label values
+
+        Returns:
+            _Timer: Context manager
+        """
+        return _Timer(self, labels)
+
+    def get_count(self, **labels: str) -> int:
+        """Get the number of samples of one label set"""
+        state = self._values.get(self._key(labels))
+        return sum(state[0]) if state else 0
+
+    def _samples(self) -> Iterator[str]:
+        for key, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                yield f"{self.name}_bucket{_format_labels(self.label_names + ('le',), key + (le,))} {cumulative}"
+            labels = _format_labels(self.label_names, key)
+            yield f"{self.name}_sum{labels} {total}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+class _Timer:
+    """Observes the time spent in a with block"""
+
+    __slots__ = ('histogram', 'labels', 'started_at')
+
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> '_Timer':
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.histogram.observe(time.perf_counter() - self.started_at, **self.labels)
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                # Modules reloaded in tests register the same metric again
+                return existing
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format
+
+        Returns:
+            str: Exposition text
+        """
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = MetricsRegistry()
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Time spent per pipeline stage: routing, cache, local, url, web_search, grading, generation
+STAGE_SECONDS = REGISTRY.histogram(
+    'expert_stage_seconds', 'Time spent in one answer pipeline stage', ('stage', 'expert')
+)
+RESPONSE_SECONDS = REGISTRY.histogram(
+    'expert_response_seconds', 'Time to answer a question end to end, per expert', ('expert',)
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    'cache_lookups_total', 'Response cache lookups by result (hit or miss)', ('expert', 'result')
+)
+LLM_CALLS = REGISTRY.counter('llm_calls_total', 'OpenAI completion calls', ('expert', 'model'))
+LLM_TOKENS = REGISTRY.counter(
+    'llm_tokens_total', 'OpenAI tokens by type (prompt or completion)', ('expert', 'model', 'type')
+)
+LLM_TOKENS_SAVED = REGISTRY.counter(
+    'llm_tokens_saved_total', 'Tokens of completions served from the completion cache', ('expert', 'model')
+)
+PROMPT_TOKENS_DROPPED = REGISTRY.counter(
+    'prompt_tokens_dropped_total', 'Document tokens left out of prompts to fit the token budget', ('expert', 'stage')
+)
+LLM_FIRST_TOKEN_SECONDS = REGISTRY.histogram(
+    'llm_first_token_seconds', 'Time from sending a streaming completion to its first delta', ('expert', 'model')
+)
+LLM_STREAMS_STOPPED = REGISTRY.counter(
+    'llm_streams_stopped_total', 'Streaming completions closed before the end, by reason', ('expert', 'reason')
+)
+LLM_HEDGES_FIRED = REGISTRY.counter(
+    'llm_hedges_fired_total', 'Duplicate completion requests sent for slow calls', ('expert', 'model')
+)
+LLM_HEDGES_WON = REGISTRY.counter(
+    'llm_hedges_won_total', 'Duplicate completion requests that answered first', ('expert', 'model')
+)
+JSON_PARSES = REGISTRY.counter(
+    'json_parses_total', 'JSON model outputs by parse result (valid, repaired, invalid, schema_mismatch)',
+    ('expert', 'stage', 'result')
+)
+LLM_RETRIES = REGISTRY.counter(
+    'llm_retries_total', 'OpenAI completion retries by reason', ('expert', 'model', 'reason')
+)
+CIRCUIT_REJECTIONS = REGISTRY.counter(
+    'circuit_rejections_total', 'Calls refused because the circuit was open', ('upstream', 'model')
+)
+RATE_LIMIT_WAIT_SECONDS = REGISTRY.histogram(
+    'llm_rate_limit_wait_seconds', 'Time OpenAI calls waited for the client-side rate limiter', ('priority',)
+)
+UPSTREAM_SECONDS = REGISTRY.histogram(
+    'upstream_request_seconds', 'Latency of calls to upstream APIs', ('upstream', 'expert')
+)
+UPSTREAM_ERRORS = REGISTRY.counter(
+    'upstream_errors_total', 'Failed calls to upstream APIs', ('upstream', 'expert')
+)
+IN_FLIGHT = REGISTRY.gauge('ask_in_flight', 'Admitted /ask requests in flight')
+JOBS_PENDING = REGISTRY.gauge('jobs_pending', 'Background jobs queued or running')
+EXPERTS_LOADED = REGISTRY.gauge('experts_loaded', 'Experts built by the lazy registry')
@@ -1,56 +1,892 @@
 """OpenAI API client wrapper"""
 import os
+import json
+import time
+import hashlib
+import random
+import asyncio
 import logging
-from typing import Optional
+import threading
+from typing import Optional, AsyncIterator, Callable, Dict, Any, Tuple
+import httpx
+import openai
 from openai import OpenAI, AsyncOpenAI
+from src.utils.cache import SharedCache
+from src.utils.circuit_breaker import CircuitBreaker
+from src.utils.hedging import HedgePolicy
+from src.utils.json_output import parse_json
+from src.utils.rate_limiter import RateLimiter
+from src.utils.text import estimate_tokens as estimate_text_tokens
+from src.utils.metrics import (
+    LLM_CALLS, LLM_TOKENS, LLM_TOKENS_SAVED, LLM_RETRIES, LLM_FIRST_TOKEN_SECONDS, LLM_STREAMS_STOPPED,
+    LLM_HEDGES_FIRED, LLM_HEDGES_WON, UPSTREAM_SECONDS, UPSTREAM_ERRORS, CIRCUIT_REJECTIONS
+)
+
+DEFAULT_BASE_URL = 'https://api.openai.com/v1'
+
+# Connection pool settings shared by every pooled client, see configure_pool
+POOL_CONFIG = {
+    'max_connections': 100,
+    'max_keepalive_connections': 32,
+    # Idle connections are kept this long, so bursts a few seconds apart skip the TLS handshake
+    'keepalive_expiry': 60.0,
+    'connect_timeout': 5.0,
+    # The SDK's own retries would multiply with OpenAIClient's, so they are off by default
+    'max_retries': 0
+}
+
+# Retry and circuit breaker settings, see configure_retries
+RETRY_CONFIG = {
+    # Attempts per call, including the first
+    'max_attempts': 3,
+    # Backoff before retry n is uniform in [0, min(max_delay, base_delay * 2 ** (n - 1))]
+    'base_delay': 0.5,
+    'max_delay': 8.0,
+    # Consecutive failures of one model that open its circuit, and seconds it stays open
+    'failure_threshold': 5,
+    'reset_timeout': 30.0
+}
+
+# Client-side rate limit, see configure_rate_limit. Off until configured.
+RATE_LIMIT_CONFIG = {
+    'enabled': False,
+    'requests_per_minute': 500,
+    'tokens_per_minute': 90000
+}
+
+# Completion cache, see configure_completion_cache. Off until configured; clients
+# opt in with OpenAIClient(cache=True) or per call with cache_ttl.
+COMPLETION_CACHE_CONFIG = {
+    'enabled': False,
+    'path': 'completions.sqlite3',
+    # Default seconds a cached completion is served
+    'ttl': 86400,
+    'l1_size': 1000,
+    'l1_ttl': 300
+}
+
+# Request hedging, see configure_hedging. Off until configured; clients opt in
+# with OpenAIClient(hedge=True).
+HEDGE_CONFIG = {
+    'enabled': False,
+    # A call slower than this percentile of recent successful calls gets a duplicate
+    'percentile': 0.95,
+    'window': 200,
+    'min_samples': 20,
+    'min_delay': 0.5,
+    # At most this many hedges per call over time, and this many back to back
+    'max_ratio': 0.05,
+    'burst': 10.0
+}
+
+# Pooled clients: event loop -> (base URL, API key) -> AsyncOpenAI. Connections
+# belong to the loop that opened them, so each loop gets its own pool. The
+# request loops and the job runner's loop live on different threads.
+_pools: Dict[asyncio.AbstractEventLoop, Dict[Tuple[str, str], AsyncOpenAI]] = {}
+_pools_lock = threading.Lock()
+
+def configure_pool(config: Dict[str, Any]) -> None:
+    """Update the connection pool settings of clients created from now on
+
+    Args:
+        config (Dict[str, Any]): POOL_CONFIG overrides
+    """
+    POOL_CONFIG.update(config)
+
+def configure_retries(config: Dict[str, Any]) -> None:
+    """Update the retry and circuit breaker settings
+
+    Args:
+        config (Dict[str, Any]): RETRY_CONFIG overrides
+    """
+    RETRY_CONFIG.update(config)
+
+# Process-wide rate limiter, None when disabled
+_limiter: Optional[RateLimiter] = None
+
+def configure_rate_limit(config: Dict[str, Any]) -> None:
+    """Update the rate limit settings and replace the process-wide limiter
+
+    Args:
+        config (Dict[str, Any]): RATE_LIMIT_CONFIG overrides
+    """
+    global _limiter
+    RATE_LIMIT_CONFIG.update(config)
+    _limiter = RateLimiter(
+        RATE_LIMIT_CONFIG['requests_per_minute'], RATE_LIMIT_CONFIG['tokens_per_minute']
+    ) if RATE_LIMIT_CONFIG['enabled'] else None
+
+def get_limiter() -> Optional[RateLimiter]:
+    """Get the process-wide rate limiter, None when disabled"""
+    return _limiter
+
+def estimate_tokens(system_prompt: str, user_prompt: str, max_tokens: int) -> int:
+    """Estimate the tokens a completion call uses: its prompt plus at most max_tokens
+
+    Args:
+        system_prompt (str): System prompt
+        user_prompt (str): User prompt
+        max_tokens (int): Completion limit
+
+    Returns:
+        int: Estimated tokens
+    """
+    # Cheap on purpose: it runs on every call. A few tokens of chat formatting per message.
+    return estimate_text_tokens(system_prompt) + estimate_text_tokens(user_prompt) + 8 + max_tokens
+
+# Process-wide completion cache, None when disabled, and the tokens its hits saved
+_completion_cache: Optional[SharedCache] = None
+_cache_savings = {'tokens': 0}
+
+def configure_completion_cache(config: Dict[str, Any]) -> None:
+    """Update the completion cache settings and open the cache
+
+    Args:
+        config (Dict[str, Any]): COMPLETION_CACHE_CONFIG overrides
+    """
+    global _completion_cache
+    COMPLETION_CACHE_CONFIG.update(config)
+    _completion_cache = SharedCache(
+        COMPLETION_CACHE_CONFIG['path'],
+        namespace='completions',
+        ttl=COMPLETION_CACHE_CONFIG['ttl'],
+        l1_size=COMPLETION_CACHE_CONFIG['l1_size'],
+        l1_ttl=COMPLETION_CACHE_CONFIG['l1_ttl']
+    ) if COMPLETION_CACHE_CONFIG['enabled'] else None
+
+def get_completion_cache() -> Optional[SharedCache]:
+    """Get the process-wide completion cache, None when disabled"""
+    return _completion_cache
+
+def completion_key(options: Dict[str, Any], system_prompt: str, user_prompt: str) -> str:
+    """Hash of everything that determines a completion
+
+    Args:
+        options (Dict[str, Any]): Request options with model, temperature and max_tokens
+        system_prompt (str): System prompt
+        user_prompt (str): User prompt
+
+    Returns:
+        str: Cache key
+    """
+    parts = [options['model'], system_prompt, user_prompt, options['temperature'], options['max_tokens']]
+    if options.get('response_format'):
+        parts.append(options['response_format'])
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+# Models accepting response_format={'type': 'json_object'}, by name prefix
+JSON_MODE_MODELS = ('gpt-4-1106', 'gpt-4-0125', 'gpt-4-turbo', 'gpt-4o', 'gpt-3.5-turbo-1106', 'gpt-3.5-turbo-0125')
+
+def supports_json_mode(model: str) -> bool:
+    """Check whether a model can be asked for JSON output with response_format
+
+    Args:
+        model (str): Model name
+
+    Returns:
+        bool: True if the API accepts JSON mode for the model
+    """
+    return model.startswith(JSON_MODE_MODELS)
+
+# Circuit breakers: (base URL, model) -> breaker, shared by every client in the process
+_breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+
+def get_breaker(base_url: str, model: str) -> CircuitBreaker:
+    """Get the circuit breaker of a model on an endpoint
+
+    Args:
+        base_url (str): API endpoint
+        model (str): Model name
+
+    Returns:
+        CircuitBreaker: Breaker shared by every caller of the model
+    """
+    breaker = _breakers.get((base_url, model))
+    if breaker is None:
+        breaker = _breakers.setdefault((base_url, model), CircuitBreaker(
+            f"openai:{model}",
+            failure_threshold=RETRY_CONFIG['failure_threshold'],
+            reset_timeout=RETRY_CONFIG['reset_timeout']
+        ))
+    return breaker
+
+# Hedge policies: (base URL, model) -> policy, shared by every client in the process
+_hedge_policies: Dict[Tuple[str, str], HedgePolicy] = {}
+
+def configure_hedging(config: Dict[str, Any]) -> None:
+    """Update the hedging settings; policies are created afresh with them
+
+    Args:
+        config (Dict[str, Any]): HEDGE_CONFIG overrides
+    """
+    HEDGE_CONFIG.update(config)
+    _hedge_policies.clear()
+
+def get_hedge_policy(base_url: str, model: str) -> HedgePolicy:
+    """Get the hedge policy of a model on an endpoint
+
+    Args:
+        base_url (str): API endpoint
+        model (str): Model name
+
+    Returns:
+        HedgePolicy: Policy shared by every caller of the model
+    """
+    policy = _hedge_policies.get((base_url, model))
+    if policy is None:
+        settings = {key: value for key, value in HEDGE_CONFIG.items() if key != 'enabled'}
+        policy = _hedge_policies.setdefault((base_url, model), HedgePolicy(**settings))
+    return policy
+
+def get_pooled_client(api_key: str, base_url: Optional[str] = None) -> AsyncOpenAI:
+    """Get the AsyncOpenAI client for an endpoint and API key on the running event loop
+
+    Every OpenAIClient with the same endpoint and key shares this client and its
+    connection pool. Must be called from a coroutine. Pools are only reused
+    across requests under asgi.py: app.py runs each Flask request on a new
+    loop, whose pool is dropped and left to garbage collection once it closes,
+    since a closed loop can no longer await the pool's aclose().
+
+    Args:
+        api_key (str): OpenAI API key
+        base_url (str, optional): API endpoint. Defaults to OPENAI_BASE_URL or the public API.
+
+    Returns:
+        AsyncOpenAI: Pooled client
+    """
+    loop = asyncio.get_running_loop()
+    key = (base_url or os.getenv('OPENAI_BASE_URL') or DEFAULT_BASE_URL, api_key)
+    with _pools_lock:
+        clients = _pools.get(loop)
+        if clients is None:
+            # Loops that finished (e.g. Flask's loop per request) can never use their pools again
+            for closed in [other for other in _pools if other.is_closed()]:
+                del _pools[closed]
+            clients = _pools[loop] = {}
+
+        client = clients.get(key)
+        if client is None:
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=POOL_CONFIG['max_connections'],
+                    max_keepalive_connections=POOL_CONFIG['max_keepalive_connections'],
+                    keepalive_expiry=POOL_CONFIG['keepalive_expiry']
+                ),
+                timeout=httpx.Timeout(600.0, connect=POOL_CONFIG['connect_timeout'])
+            )
+            client = clients[key] = AsyncOpenAI(
+                api_key=api_key,
+                base_url=key[0],
+                max_retries=POOL_CONFIG['max_retries'],
+                http_client=http_client
+            )
+        return client
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Get the number of pooled clients
+
+    Returns:
+        Dict[str, Any]: Event loops with a pool and pooled clients in total
+    """
+    with _pools_lock:
+        pools = [dict(clients) for clients in _pools.values()]
+    return {
+        'loops': len(pools),
+        'clients': sum(len(clients) for clients in pools),
+        'rate_limit': _limiter.get_stats() if _limiter else None,
+        'completion_cache': {
+            **_completion_cache.get_stats(), 'tokens_saved': _cache_savings['tokens']
+        } if _completion_cache else None,
+        'circuits': {model: breaker.get_stats() for (_, model), breaker in list(_breakers.items())},
+        'hedging': {model: policy.get_stats() for (_, model), policy in list(_hedge_policies.items())}
+    }
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Read the delay a rate limit or overload response asks for, in seconds"""
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    try:
+        if 'retry-after-ms' in response.headers:
+            return float(response.headers['retry-after-ms']) / 1000
+        if 'retry-after' in response.headers:
+            return float(response.headers['retry-after'])
+    except ValueError:
+        pass
+    return None
+
+class CompletionResult:
+    """Outcome of a completion call
+
+    Lets callers tell "the model had nothing to say" (ok with empty text) from
+    "the provider is unavailable" (upstream_down), which should not trigger
+    more calls to it.
+    """
+
+    OK = 'ok'
+    # The model answered with no content
+    EMPTY = 'empty'
+    # Rejected as invalid (4xx other than 429); retrying will not help
+    REQUEST_ERROR = 'request_error'
+    RATE_LIMITED = 'rate_limited'
+    TIMEOUT = 'timeout'
+    UPSTREAM_ERROR = 'upstream_error'
+    # Not sent: the model's circuit is open
+    CIRCUIT_OPEN = 'circuit_open'
+    # Not sent: the client-side rate limit would not allow it within the time budget
+    THROTTLED = 'throttled'
+    # Answered, but not with the JSON asked for, even after local repair
+    INVALID_OUTPUT = 'invalid_output'
+
+    UPSTREAM_DOWN = (RATE_LIMITED, TIMEOUT, UPSTREAM_ERROR, CIRCUIT_OPEN, THROTTLED)
+
+    __slots__ = ('status', 'text', 'error', 'attempts', 'retry_after', 'tokens', 'cached', 'data')
+
+    def __init__(self, status: str, text: Optional[str] = None, error: Optional[str] = None,
+                 attempts: int = 0, retry_after: Optional[float] = None, tokens: int = 0,
+                 cached: bool = False, data: Any = None):
+        """Initialize result
+
+        Args:
+            status (str): One of the status constants
+            text (str, optional): Completion text. Defaults to None.
+            error (str, optional): Error message. Defaults to None.
+            attempts (int, optional): Requests sent. Defaults to 0.
+            retry_after (float, optional): Seconds the provider asked to wait. Defaults to None.
+            tokens (int, optional): Prompt and completion tokens the call used. Defaults to 0.
+            cached (bool, optional): Served from the completion cache. Defaults to False.
+            data (Any, optional): Decoded JSON, for complete_json. Defaults to None.
+        """
+        self.status = status
+        self.text = text
+        self.error = error
+        self.attempts = attempts
+        self.retry_after = retry_after
+        self.tokens = tokens
+        self.cached = cached
+        self.data = data
+
+    @property
+    def ok(self) -> bool:
+        return self.status == self.OK
+
+    @property
+    def upstream_down(self) -> bool:
+        return self.status in self.UPSTREAM_DOWN
+
+    def __repr__(self) -> str:
+        return f"CompletionResult(status={self.status!r}, attempts={self.attempts}, error={self.error!r})"
 
 class OpenAIClient:
-    """OpenAI API client wrapper"""
+    """OpenAI API client wrapper
     
-    def __init__(self, model: str = 'gpt-4', max_tokens: int = 300, temperature: float = 0.7):
+    Holds per-caller defaults (model, max_tokens, temperature, timeout) and usage
+    counters; requests go through the process-wide pooled AsyncOpenAI client, so
+    creating many OpenAIClient instances is cheap and they share connections.
+    """
+    
+    def __init__(self, model: str = 'gpt-4', max_tokens: int = 300, temperature: float = 0.7, timeout: float = 30.0,
+                 name: str = 'none', base_url: Optional[str] = None, cache: bool = False, hedge: bool = False):
         """Initialize OpenAI client
         
         Args:
             model (str, optional): Model to use. Defaults to 'gpt-4'.
             max_tokens (int, optional): Maximum tokens to generate. Defaults to 300.
             temperature (float, optional): Temperature for response generation. Defaults to 0.7.
+            timeout (float, optional): Default request timeout in seconds. Defaults to 30.0.
+            name (str, optional): Expert using the client, the metrics label. Defaults to 'none'.
+            base_url (str, optional): API endpoint. Defaults to OPENAI_BASE_URL or the public API.
+            cache (bool, optional): Serve repeated completions from the completion cache,
+                if it is enabled. Defaults to False.
+            hedge (bool, optional): Duplicate completions slower than usual, if hedging is
+                enabled. Defaults to False.
         """
         self.logger = logging.getLogger(__name__)
+        self.name = name
         
-        api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
+        self.api_key = os.getenv('OPENAI_API_KEY')
+        if not self.api_key:
             raise ValueError("OPENAI_API_KEY environment variable is not set")
             
-        self.client = AsyncOpenAI(api_key=api_key)
+        self.base_url = base_url
         self.model = model
         self.max_tokens = max_tokens
         self.temperature = temperature
+        self.timeout = timeout
+        self.cache = cache
+        self.hedge = hedge
+        
+        # Token spend of this client, for cost reporting
+        self.usage = {
+            'calls': 0,
+            'prompt_tokens': 0,
+            'completion_tokens': 0,
+            'cache_hits': 0,
+            'tokens_saved': 0
+        }
+        
+    @property
+    def client(self) -> AsyncOpenAI:
+        """Pooled AsyncOpenAI client for the running event loop"""
+        return get_pooled_client(self.api_key, self.base_url)
+        
+    @property
+    def pool_key(self) -> Tuple[str, str]:
+        """Endpoint and API key identifying the connection pool this client uses"""
+        return (self.base_url or os.getenv('OPENAI_BASE_URL') or DEFAULT_BASE_URL, self.api_key)
         
-        self.logger.info("OpenAI client initialized successfully")
+    def _request_options(self, model: Optional[str], max_tokens: Optional[int], temperature: Optional[float],
+                         timeout: Optional[float]) -> Dict[str, Any]:
+        """Completion options with per-call overrides applied over the client defaults"""
+        return {
+            'model': model or self.model,
+            'max_tokens': max_tokens or self.max_tokens,
+            'temperature': self.temperature if temperature is None else temperature,
+            'timeout': self.timeout if timeout is None else timeout
+        }
         
-    async def get_completion(self, system_prompt: str, user_prompt: str) -> Optional[str]:
+    async def warm_up(self, connections: int = 1) -> bool:
+        """Open connections to the API ahead of the first completion
+        
+        Args:
+            connections (int, optional): Connections to open, by sending that many
+                concurrent requests. Defaults to 1.
+                
+        Returns:
+            bool: True if the API answered
+        """
+        try:
+            client = self.client
+            await asyncio.gather(*(client.models.list() for _ in range(max(1, connections))))
+            return True
+        except Exception as e:
+            self.logger.warning(f"Error warming up OpenAI connection: {str(e)}")
+            return False
+            
+    async def get_completion(self, system_prompt: str, user_prompt: str, max_tokens: Optional[int] = None,
+                             timeout: Optional[float] = None, model: Optional[str] = None,
+                             temperature: Optional[float] = None, cache_ttl: Optional[int] = None,
+                             bypass_cache: bool = False) -> Optional[str]:
         """Get completion from OpenAI API
         
         Args:
             system_prompt (str): System prompt to guide response
             user_prompt (str): User prompt to generate response for
+            max_tokens (int, optional): Override for the client's max_tokens. Defaults to None.
+            timeout (float, optional): Time budget in seconds, retries included. Defaults to the client's timeout.
+            model (str, optional): Override for the client's model. Defaults to None.
+            temperature (float, optional): Override for the client's temperature. Defaults to None.
+            cache_ttl (int, optional): Completion cache TTL for this call, 0 to not cache. Defaults to None.
+            bypass_cache (bool, optional): Skip the cache lookup but store the fresh answer. Defaults to False.
+            
+        Returns:
+            Optional[str]: Generated response or None if failed; use complete() to know why
+        """
+        result = await self.complete(
+            system_prompt, user_prompt, max_tokens, timeout, model, temperature, cache_ttl, bypass_cache
+        )
+        return result.text
+        
+    async def complete(self, system_prompt: str, user_prompt: str, max_tokens: Optional[int] = None,
+                       timeout: Optional[float] = None, model: Optional[str] = None,
+                       temperature: Optional[float] = None, cache_ttl: Optional[int] = None,
+                       bypass_cache: bool = False) -> CompletionResult:
+        """Get completion from OpenAI API, retrying transient failures
+        
+        Rate limits, timeouts, connection errors and 5xx responses are retried
+        with jittered exponential backoff, waiting at least as long as the
+        provider's Retry-After, while the time budget allows. Calls to a model
+        whose circuit is open fail immediately. Each attempt first waits for
+        the client-side rate limiter, if enabled, at the current priority class.
+        
+        If the completion cache is enabled and the client or the call opts in,
+        an identical earlier call (model, prompts, temperature, max_tokens) is
+        answered from the cache, and successful answers are stored.
+        
+        Args:
+            system_prompt (str): System prompt to guide response
+            user_prompt (str): User prompt to generate response for
+            max_tokens (int, optional): Override for the client's max_tokens. Defaults to None.
+            timeout (float, optional): Time budget in seconds, retries included. Defaults to the client's timeout.
+            model (str, optional): Override for the client's model. Defaults to None.
+            temperature (float, optional): Override for the client's temperature. Defaults to None.
+            cache_ttl (int, optional): Completion cache TTL for this call, 0 to not cache. Defaults to
+                the configured TTL if the client was created with cache=True, else no caching.
+            bypass_cache (bool, optional): Skip the cache lookup but store the fresh answer. Defaults to False.
+            
+        Returns:
+            CompletionResult: Completion text or the reason there is none
+        """
+        options = self._request_options(model, max_tokens, temperature, timeout)
+        return await self._complete_cached(system_prompt, user_prompt, options, cache_ttl, bypass_cache)
+        
+    async def complete_json(self, system_prompt: str, user_prompt: str, schema: Optional[Dict[str, Any]] = None,
+                            stage: str = 'json', max_tokens: Optional[int] = None, timeout: Optional[float] = None,
+                            model: Optional[str] = None, temperature: Optional[float] = None,
+                            cache_ttl: Optional[int] = None, bypass_cache: bool = False) -> CompletionResult:
+        """Get a JSON completion, decoded and validated
+        
+        Asks for JSON mode on models that support it; the prompts must still
+        mention JSON. Output that does not parse is repaired locally (code
+        fences, trailing commas, Python literals) rather than asked for again.
+        Only valid output is cached, together with its decoded value, so a
+        cache hit is not parsed or counted in json_parses_total again.
+        
+        Args:
+            system_prompt (str): System prompt to guide response
+            user_prompt (str): User prompt to generate response for
+            schema (Dict[str, Any], optional): JSON Schema subset the output must match. Defaults to None.
+            stage (str, optional): Pipeline stage, the parse metrics label. Defaults to 'json'.
+            max_tokens (int, optional): Override for the client's max_tokens. Defaults to None.
+            timeout (float, optional): Time budget in seconds, retries included. Defaults to the client's timeout.
+            model (str, optional): Override for the client's model. Defaults to None.
+            temperature (float, optional): Override for the client's temperature. Defaults to None.
+            cache_ttl (int, optional): Completion cache TTL for this call, 0 to not cache. Defaults to None.
+            bypass_cache (bool, optional): Skip the cache lookup but store the fresh answer. Defaults to False.
             
         Returns:
-            Optional[str]: Generated response or None if failed
+            CompletionResult: Decoded value in data when ok; INVALID_OUTPUT if it could not be used
         """
+        options = self._request_options(model, max_tokens, temperature, timeout)
+        if supports_json_mode(options['model']):
+            options['response_format'] = {'type': 'json_object'}
+            
+        def decode(result: CompletionResult) -> CompletionResult:
+            if not result.ok:
+                return result
+            result.data, outcome = parse_json(result.text, schema, self.name, stage)
+            if result.data is None:
+                result.status = CompletionResult.INVALID_OUTPUT
+                result.error = f"Unusable JSON output ({outcome})"
+                self.logger.warning(f"{self.name} {stage}: {result.error}: {result.text[:200]!r}")
+            return result
+            
+        return await self._complete_cached(system_prompt, user_prompt, options, cache_ttl, bypass_cache, decode)
+        
+    async def _complete_cached(self, system_prompt: str, user_prompt: str, options: Dict[str, Any],
+                               cache_ttl: Optional[int], bypass_cache: bool,
+                               decode: Optional[Callable[[CompletionResult], CompletionResult]] = None) -> CompletionResult:
+        """Answer from the completion cache if allowed, else complete and store usable answers"""
+        if cache_ttl is None:
+            cache_ttl = COMPLETION_CACHE_CONFIG['ttl'] if self.cache else 0
+        cache = _completion_cache if cache_ttl else None
+        key = completion_key(options, system_prompt, user_prompt) if cache is not None else None
+        
+        if cache is not None and not bypass_cache:
+            cached = cache.get(key)
+            if cached is not None:
+                self._record_cache_hit(options['model'], cached['tokens'])
+                result = CompletionResult(CompletionResult.OK, text=cached['text'], tokens=cached['tokens'], cached=True)
+                if 'data' in cached:
+                    result.data = cached['data']
+                    return result
+                return decode(result) if decode else result
+                
+        result = await self._complete(system_prompt, user_prompt, options)
+        if decode:
+            result = decode(result)
+        if cache is not None and result.ok:
+            entry = {'text': result.text, 'tokens': result.tokens}
+            if decode:
+                entry['data'] = result.data
+            cache.set(key, entry, ttl=cache_ttl)
+        return result
+        
+    def _record_cache_hit(self, model: str, tokens: int) -> None:
+        """Count a completion served from the cache and the tokens it saved"""
+        self.usage['cache_hits'] += 1
+        self.usage['tokens_saved'] += tokens
+        _cache_savings['tokens'] += tokens
+        LLM_TOKENS_SAVED.inc(tokens, expert=self.name, model=model)
+        
+    async def _complete(self, system_prompt: str, user_prompt: str, options: Dict[str, Any]) -> CompletionResult:
+        """Send a completion through the breaker and rate limiter, retrying transient failures"""
+        budget_at = time.monotonic() + options['timeout']
+        breaker = get_breaker(self.pool_key[0], options['model'])
+        estimate = estimate_tokens(system_prompt, user_prompt, options['max_tokens'])
+        policy = get_hedge_policy(self.pool_key[0], options['model']) if self.hedge and HEDGE_CONFIG['enabled'] else None
+        
+        attempts = 0
+        while True:
+            if not breaker.allow():
+                CIRCUIT_REJECTIONS.inc(upstream='openai', model=options['model'])
+                return CompletionResult(
+                    CompletionResult.CIRCUIT_OPEN,
+                    error=f"Circuit open for {options['model']}",
+                    attempts=attempts,
+                    retry_after=breaker.retry_after()
+                )
+                
+            try:
+                if not await self._throttle(estimate, budget_at - time.monotonic()):
+                    breaker.release()
+                    return CompletionResult(
+                        CompletionResult.THROTTLED,
+                        error=f"Rate limit leaves no room for {options['model']} within the time budget",
+                        attempts=attempts
+                    )
+                attempts += 1
+                if policy is None:
+                    result = await self._attempt(system_prompt, user_prompt, options, budget_at - time.monotonic(), estimate)
+                else:
+                    result = await self._hedged_attempt(system_prompt, user_prompt, options, budget_at, estimate, policy)
+            except asyncio.CancelledError:
+                breaker.release()
+                raise
+            result.attempts = attempts
+            
+            if not result.upstream_down:
+                # Any answer, even a rejected request, shows the provider is up
+                breaker.record_success()
+                return result
+                
+            breaker.record_failure()
+            if attempts >= RETRY_CONFIG['max_attempts']:
+                return result
+                
+            delay = self._backoff(attempts, result.retry_after)
+            if time.monotonic() + delay >= budget_at:
+                return result
+                
+            LLM_RETRIES.inc(expert=self.name, model=options['model'], reason=result.status)
+            self.logger.warning(f"Retrying {options['model']} completion in {delay:.2f}s after {result.status}")
+            await asyncio.sleep(delay)
+            
+    @staticmethod
+    def _backoff(attempt: int, retry_after: Optional[float]) -> float:
+        """Delay before the next attempt: full jitter, but never shorter than Retry-After"""
+        ceiling = min(RETRY_CONFIG['max_delay'], RETRY_CONFIG['base_delay'] * 2 ** (attempt - 1))
+        return max(random.uniform(0, ceiling), retry_after or 0.0)
+        
+    async def _throttle(self, tokens: int, timeout: float) -> bool:
+        """Wait for the rate limiter; False if it cannot admit the call within timeout"""
+        limiter = _limiter
+        if limiter is None:
+            return True
+        return await limiter.acquire(tokens, timeout=max(0.0, timeout)) is not None
+        
+    async def _hedged_attempt(self, system_prompt: str, user_prompt: str, options: Dict[str, Any],
+                              budget_at: float, estimate: int, policy: HedgePolicy) -> CompletionResult:
+        """Send one request, and a duplicate if it outlasts the hedge delay; the first good answer wins"""
+        delay = policy.start_call()
+        started = {}
+        
+        def launch() -> asyncio.Future:
+            task = asyncio.ensure_future(
+                self._attempt(system_prompt, user_prompt, options, budget_at - time.monotonic(), estimate)
+            )
+            started[task] = time.monotonic()
+            return task
+            
+        primary = launch()
+        try:
+            if delay is not None and time.monotonic() + delay < budget_at:
+                done, _ = await asyncio.wait([primary], timeout=delay)
+                # The hedge must fit both the hedge budget and the rate limit right now
+                if not done and policy.try_hedge():
+                    if await self._throttle(estimate, 0.0):
+                        LLM_HEDGES_FIRED.inc(expert=self.name, model=options['model'])
+                        launch()
+                    else:
+                        policy.refund_hedge()
+                    
+            result = None
+            pending = set(started)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda task: task.result().upstream_down):
+                    result = task.result()
+                    if result.upstream_down:
+                        continue
+                    if result.ok:
+                        policy.record(time.monotonic() - started[task])
+                    if task is not primary:
+                        policy.record_win()
+                        LLM_HEDGES_WON.inc(expert=self.name, model=options['model'])
+                    return result
+            return result
+            
+        finally:
+            for task in started:
+                if not task.done():
+                    task.cancel()
+                    
+    async def _attempt(self, system_prompt: str, user_prompt: str, options: Dict[str, Any],
+                       timeout: float, estimate: int = 0) -> CompletionResult:
+        """Send one completion request and classify its outcome"""
+        if timeout <= 0:
+            return CompletionResult(CompletionResult.TIMEOUT, error='Time budget exhausted')
+            
+        started_at = time.perf_counter()
+        LLM_CALLS.inc(expert=self.name, model=options['model'])
         try:
             response = await self.client.chat.completions.create(
-                model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
-                max_tokens=self.max_tokens,
-                temperature=self.temperature
+                **{**options, 'timeout': timeout}
             )
             
-            return response.choices[0].message.content
+            self.usage['calls'] += 1
+            if response.usage:
+                self._record_usage(options['model'], response.usage.prompt_tokens, response.usage.completion_tokens)
+                if _limiter is not None and estimate:
+                    _limiter.settle(estimate, response.usage.total_tokens)
+                
+            content = response.choices[0].message.content
+            if not content:
+                return CompletionResult(CompletionResult.EMPTY)
+            return CompletionResult(
+                CompletionResult.OK, text=content, tokens=response.usage.total_tokens if response.usage else 0
+            )
             
         except Exception as e:
-            self.logger.error(f"Error getting completion: {str(e)}")
-            return None 
\ No newline at end of file
+            result = self._classify_error(e)
+            UPSTREAM_ERRORS.inc(upstream='openai', expert=self.name)
+            self.logger.error(f"Error getting completion ({result.status}): {str(e)}")
+            return result
+            
+        finally:
+            UPSTREAM_SECONDS.observe(time.perf_counter() - started_at, upstream='openai', expert=self.name)
+            
+    @staticmethod
+    def _classify_error(error: Exception) -> CompletionResult:
+        """Map an SDK exception to a result status"""
+        if isinstance(error, openai.RateLimitError):
+            return CompletionResult(CompletionResult.RATE_LIMITED, error=str(error), retry_after=_retry_after(error))
+        if isinstance(error, (openai.APITimeoutError, asyncio.TimeoutError)):
+            return CompletionResult(CompletionResult.TIMEOUT, error=str(error))
+        if isinstance(error, openai.APIConnectionError):
+            return CompletionResult(CompletionResult.UPSTREAM_ERROR, error=str(error))
+        if isinstance(error, openai.APIStatusError) and (error.status_code >= 500 or error.status_code in (408, 409)):
+            return CompletionResult(CompletionResult.UPSTREAM_ERROR, error=str(error), retry_after=_retry_after(error))
+        return CompletionResult(CompletionResult.REQUEST_ERROR, error=str(error))
+        
+    def _record_usage(self, model: str, prompt_tokens: int, completion_tokens: int) -> None:
+        """Add a call's token usage to the client totals and the metrics"""
+        self.usage['prompt_tokens'] += prompt_tokens
+        self.usage['completion_tokens'] += completion_tokens
+        LLM_TOKENS.inc(prompt_tokens, expert=self.name, model=model, type='prompt')
+        LLM_TOKENS.inc(completion_tokens, expert=self.name, model=model, type='completion')
+        
+    async def stream_completion(self, system_prompt: str, user_prompt: str, max_tokens: Optional[int] = None,
+                                model: Optional[str] = None, temperature: Optional[float] = None,
+                                timeout: Optional[float] = None, max_chars: Optional[int] = None) -> AsyncIterator[str]:
+        """Stream completion from OpenAI API
+        
+        Goes through the same pool, circuit breaker, rate limiter and metrics as
+        complete(). Failures before the first delta are retried like complete()'s;
+        after it they end the stream, since the consumer already has part of the
+        text. When the consumer stops reading (breaks out, closes or is
+        cancelled) or max_chars is reached, the HTTP response is closed, which
+        stops generation and returns the connection to the pool.
+        
+        Args:
+            system_prompt (str): System prompt to guide response
+            user_prompt (str): User prompt to generate response for
+            max_tokens (int, optional): Override for the client's max_tokens. Defaults to None.
+            model (str, optional): Override for the client's model. Defaults to None.
+            temperature (float, optional): Override for the client's temperature. Defaults to None.
+            timeout (float, optional): Time budget in seconds until the first delta, retries
+                included, and between deltas. Defaults to the client's timeout.
+            max_chars (int, optional): Stop once this many characters were yielded. Defaults to None.
+            
+        Yields:
+            str: Content deltas as they arrive, nothing if failed
+        """
+        options = self._request_options(model, max_tokens, temperature, timeout)
+        budget_at = time.monotonic() + options['timeout']
+        breaker = get_breaker(self.pool_key[0], options['model'])
+        estimate = estimate_tokens(system_prompt, user_prompt, options['max_tokens'])
+        
+        attempts = 0
+        while True:
+            if not breaker.allow():
+                CIRCUIT_REJECTIONS.inc(upstream='openai', model=options['model'])
+                self.logger.warning(f"Not streaming from {options['model']}: circuit open")
+                return
+                
+            recorded = False
+            stream = None
+            parts = []
+            yielded = 0
+            started_at = time.perf_counter()
+            try:
+                if not await self._throttle(estimate, budget_at - time.monotonic()):
+                    self.logger.warning(f"Not streaming from {options['model']}: rate limit leaves no room")
+                    return
+                    
+                attempts += 1
+                LLM_CALLS.inc(expert=self.name, model=options['model'])
+                stream = await self.client.chat.completions.create(
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    stream=True,
+                    **{**options, 'timeout': max(0.0, budget_at - time.monotonic())}
+                )
+                
+                self.usage['calls'] += 1
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    content = chunk.choices[0].delta.content
+                    if not content:
+                        continue
+                    if not yielded:
+                        LLM_FIRST_TOKEN_SECONDS.observe(
+                            time.perf_counter() - started_at, expert=self.name, model=options['model']
+                        )
+                    if max_chars is not None and yielded + len(content) >= max_chars:
+                        content = content[:max_chars - yielded]
+                        yielded += len(content)
+                        parts.append(content)
+                        LLM_STREAMS_STOPPED.inc(expert=self.name, reason='max_chars')
+                        yield content
+                        break
+                    yielded += len(content)
+                    parts.append(content)
+                    yield content
+                breaker.record_success()
+                recorded = True
+                return
+                
+            except GeneratorExit:
+                LLM_STREAMS_STOPPED.inc(expert=self.name, reason='consumer')
+                raise
+                
+            except Exception as e:
+                result = self._classify_error(e)
+                if result.upstream_down:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                recorded = True
+                UPSTREAM_ERRORS.inc(upstream='openai', expert=self.name)
+                self.logger.error(f"Error streaming completion ({result.status}): {str(e)}")
+                if yielded or not result.upstream_down or attempts >= RETRY_CONFIG['max_attempts']:
+                    return
+                delay = self._backoff(attempts, result.retry_after)
+                if time.monotonic() + delay >= budget_at:
+                    return
+                LLM_RETRIES.inc(expert=self.name, model=options['model'], reason=result.status)
+                
+            finally:
+                if stream is not None:
+                    # Not consumed to the end: closing the response stops generation
+                    await stream.response.aclose()
+                    UPSTREAM_SECONDS.observe(time.perf_counter() - started_at, upstream='openai', expert=self.name)
+                    # Streams report no usage; estimate it from the prompt and the text
+                    if parts:
+                        completion_tokens = estimate_text_tokens(''.join(parts))
+                        self._record_usage(options['model'], estimate - options['max_tokens'], completion_tokens)
+                        if _limiter is not None:
+                            _limiter.settle(estimate, estimate - options['max_tokens'] + completion_tokens)
+                # Closed early by the consumer or cancelled
+                if not recorded:
+                    breaker.release()
+                    
+            self.logger.warning(f"Retrying {options['model']} stream in {delay:.2f}s")
+            await asyncio.sleep(delay)
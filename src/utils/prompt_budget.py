@@ -0,0 +1,234 @@
+"""Token counting and token-budgeted prompt assembly
+
+Counts with tiktoken when it is installed and its encoding files can be
+loaded, otherwise with the character heuristic of text.estimate_tokens.
+"""
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+from src.utils.metrics import PROMPT_TOKENS_DROPPED
+from src.utils.text import estimate_tokens, tokenize
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Context window in tokens by model name prefix; the longest matching prefix wins
+CONTEXT_WINDOWS = {
+    'gpt-4': 8192,
+    'gpt-4-32k': 32768,
+    'gpt-4-1106': 128000,
+    'gpt-4-turbo': 128000,
+    'gpt-3.5-turbo': 4096,
+    'gpt-3.5-turbo-16k': 16385,
+    'gpt-3.5-turbo-1106': 16385
+}
+DEFAULT_CONTEXT_WINDOW = 4096
+
+# Chat formatting around the system and user messages and the reply
+MESSAGE_OVERHEAD = 12
+
+# Encodings by model, None where tiktoken is unavailable or failed to load
+_encodings: Dict[str, Any] = {}
+
+def _encoding(model: str) -> Optional[Any]:
+    if model in _encodings:
+        return _encodings[model]
+    encoding = None
+    if tiktoken is not None:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = _encoding('gpt-4') if model != 'gpt-4' else None
+        except Exception as e:
+            # The encoding file is downloaded on first use; offline hosts fall back to the heuristic
+            logger.warning(f"tiktoken encoding for {model} unavailable, estimating tokens: {str(e)}")
+    _encodings[model] = encoding
+    return encoding
+
+def count_tokens(text: str, model: str = 'gpt-4') -> int:
+    """Count the tokens of a text for a model
+
+    Args:
+        text (str): Text to count
+        model (str, optional): Model name. Defaults to 'gpt-4'.
+
+    Returns:
+        int: Token count, estimated if tiktoken is unavailable
+    """
+    encoding = _encoding(model)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+def truncate_tokens(text: str, limit: int, model: str = 'gpt-4') -> str:
+    """Cut a text to at most limit tokens, at a word boundary where possible
+
+    Args:
+        text (str): Text to cut
+        limit (int): Token limit
+        model (str, optional): Model name. Defaults to 'gpt-4'.
+
+    Returns:
+        str: Text that fits in limit tokens
+    """
+    if limit <= 0:
+        return ''
+    encoding = _encoding(model)
+    if encoding is None:
+        # Inverse of estimate_tokens
+        cut = text[:max(0, (limit - 1) * 3)]
+    else:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= limit:
+            return text
+        cut = encoding.decode(tokens[:limit])
+    if len(cut) < len(text) and ' ' in cut:
+        cut = cut[:cut.rindex(' ')]
+    return cut
+
+def context_window(model: str) -> int:
+    """Get the context window of a model in tokens
+
+    Args:
+        model (str): Model name
+
+    Returns:
+        int: Context window, DEFAULT_CONTEXT_WINDOW for unknown models
+    """
+    matches = [prefix for prefix in CONTEXT_WINDOWS if model.startswith(prefix)]
+    return CONTEXT_WINDOWS[max(matches, key=len)] if matches else DEFAULT_CONTEXT_WINDOW
+
+def rank_by_query(passages: Sequence[str], query: str) -> List[str]:
+    """Order passages by how many of the query's words they contain, most first
+
+    Ties keep their original order, so an unrelated query leaves the text as it was.
+
+    Args:
+        passages (Sequence[str]): Passages, e.g. the paragraphs of a page
+        query (str): User question
+
+    Returns:
+        List[str]: Passages in priority order
+    """
+    words = set(tokenize(query))
+    return sorted(passages, key=lambda passage: -len(words.intersection(tokenize(passage))))
+
+class PackedDocuments:
+    """Documents that fit in a prompt budget and what was left out"""
+
+    __slots__ = ('documents', 'tokens', 'dropped', 'dropped_tokens', 'truncated')
+
+    def __init__(self, documents: List[str], tokens: int, dropped: int, dropped_tokens: int, truncated: bool):
+        """Initialize result
+
+        Args:
+            documents (List[str]): Documents kept, in priority order, the last one possibly cut
+            tokens (int): Tokens of the kept documents
+            dropped (int): Documents left out entirely
+            dropped_tokens (int): Tokens left out, from dropped and cut documents
+            truncated (bool): The last kept document was cut
+        """
+        self.documents = documents
+        self.tokens = tokens
+        self.dropped = dropped
+        self.dropped_tokens = dropped_tokens
+        self.truncated = truncated
+
+    def join(self, separator: str = '\n') -> str:
+        return separator.join(self.documents)
+
+class PromptBuilder:
+    """Packs documents into a prompt within a model's context window
+
+    The budget is the context window minus the completion's max_tokens, the
+    fixed parts of the prompt (system prompt, question, instructions) and the
+    chat formatting, optionally capped lower to keep prompts fast and cheap.
+    Documents go in priority order; the first one that does not fit is cut to
+    the remaining budget and the rest are dropped.
+    """
+
+    def __init__(self, model: str = 'gpt-4', max_tokens: int = 300, max_prompt_tokens: Optional[int] = None,
+                 min_document_tokens: int = 50, name: str = 'none'):
+        """Initialize prompt builder
+
+        Args:
+            model (str, optional): Model the prompt is for. Defaults to 'gpt-4'.
+            max_tokens (int, optional): Tokens reserved for the completion. Defaults to 300.
+            max_prompt_tokens (int, optional): Cap on the whole prompt. Defaults to the context window.
+            min_document_tokens (int, optional): Smallest useful piece of a cut document. Defaults to 50.
+            name (str, optional): Expert using the builder, the metrics label. Defaults to 'none'.
+        """
+        self.model = model
+        self.max_tokens = max_tokens
+        self.max_prompt_tokens = max_prompt_tokens
+        self.min_document_tokens = min_document_tokens
+        self.name = name
+
+    def budget(self, *fixed: str) -> int:
+        """Get the tokens left for documents
+
+        Args:
+            *fixed: Prompt parts sent regardless of the documents
+
+        Returns:
+            int: Document budget, 0 if the fixed parts already fill the window
+        """
+        limit = context_window(self.model) - self.max_tokens
+        if self.max_prompt_tokens is not None:
+            limit = min(limit, self.max_prompt_tokens)
+        used = MESSAGE_OVERHEAD + sum(count_tokens(part, self.model) for part in fixed)
+        return max(0, limit - used)
+
+    def pack(self, documents: Sequence[str], *fixed: str, stage: str = 'prompt',
+             separator: str = '\n') -> PackedDocuments:
+        """Keep the documents that fit next to the fixed prompt parts
+
+        Args:
+            documents (Sequence[str]): Documents, highest priority first
+            *fixed: Prompt parts sent regardless of the documents
+            stage (str, optional): Pipeline stage, the metrics label. Defaults to 'prompt'.
+            separator (str, optional): Text placed between documents. Defaults to a newline.
+
+        Returns:
+            PackedDocuments: Kept documents and what was dropped
+        """
+        remaining = self.budget(*fixed)
+        separator_tokens = count_tokens(separator, self.model) if separator else 0
+        kept: List[str] = []
+        used = 0
+        dropped = 0
+        dropped_tokens = 0
+        truncated = False
+
+        for document in documents:
+            tokens = count_tokens(document, self.model)
+            if dropped or truncated:
+                dropped += 1
+                dropped_tokens += tokens
+                continue
+            room = remaining - (separator_tokens if kept else 0)
+            if tokens <= room:
+                kept.append(document)
+                used += tokens
+                remaining = room - tokens
+            elif room >= self.min_document_tokens:
+                piece = truncate_tokens(document, room, self.model)
+                piece_tokens = count_tokens(piece, self.model)
+                kept.append(piece)
+                used += piece_tokens
+                dropped_tokens += tokens - piece_tokens
+                truncated = True
+            else:
+                dropped += 1
+                dropped_tokens += tokens
+
+        if dropped_tokens:
+            PROMPT_TOKENS_DROPPED.inc(dropped_tokens, expert=self.name, stage=stage)
+            logger.info(
+                f"{self.name} {stage} prompt: kept {len(kept)} of {len(documents)} documents "
+                f"({used} tokens), dropped {dropped_tokens} tokens"
+            )
+        return PackedDocuments(kept, used, dropped, dropped_tokens, truncated)
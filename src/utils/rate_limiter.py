@@ -0,0 +1,181 @@
+"""Client-side rate limiting of OpenAI requests and tokens per minute"""
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from src.utils.metrics import RATE_LIMIT_WAIT_SECONDS
+
+# Priority classes, lower goes first
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+PRIORITIES = {INTERACTIVE: 0, BACKGROUND: 1}
+
+_priority: ContextVar[str] = ContextVar('openai_priority', default=INTERACTIVE)
+
+@contextmanager
+def priority(name: str) -> Iterator[None]:
+    """Run the OpenAI calls made in a block, and in tasks it starts, at a priority class
+
+    Args:
+        name (str): INTERACTIVE or BACKGROUND
+    """
+    if name not in PRIORITIES:
+        raise ValueError(f"Unknown priority: {name}")
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def current_priority() -> str:
+    """Get the priority class of the running code, INTERACTIVE unless set"""
+    return _priority.get()
+
+class TokenBucket:
+    """Bucket refilled at a constant rate, holding at most one minute's worth"""
+
+    def __init__(self, per_minute: float):
+        """Initialize bucket, full
+
+        Args:
+            per_minute (float): Refill rate and capacity
+        """
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def delay(self, amount: float, now: float) -> float:
+        """Seconds until amount is available, 0 if it is now
+
+        Amounts over the capacity are treated as a full bucket, so a single
+        oversized call waits for a full bucket instead of forever.
+        """
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+    def give_back(self, amount: float) -> None:
+        """Return unused units; a negative amount charges an underestimate"""
+        self.level = min(self.capacity, self.level + amount)
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits shared by every coroutine in the process
+
+    Callers queue by priority class, then arrival: a background call never
+    takes capacity while an interactive one is waiting. State is guarded by a
+    thread lock and waiting is plain sleeping, so one limiter serves the
+    request loops, the job loop and any other loop in the process.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float, poll_interval: float = 0.05):
+        """Initialize rate limiter
+
+        Args:
+            requests_per_minute (float): Request budget
+            tokens_per_minute (float): Token budget, prompt and completion
+            poll_interval (float, optional): Seconds between checks while others are ahead in the queue. Defaults to 0.05.
+        """
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.poll_interval = poll_interval
+
+        self._waiters: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self.stats = {
+            'acquired': 0,
+            'waited': 0,
+            'timed_out': 0
+        }
+
+    async def acquire(self, tokens: int, priority: Optional[str] = None,
+                      timeout: Optional[float] = None) -> Optional[float]:
+        """Wait until one request and tokens fit in the budgets, then take them
+
+        Args:
+            tokens (int): Estimated tokens of the call, prompt plus max_tokens
+            priority (str, optional): Priority class. Defaults to the current one.
+            timeout (float, optional): Longest wait in seconds. Defaults to no limit.
+
+        Returns:
+            Optional[float]: Seconds waited, None if the budget would not allow the call within timeout
+        """
+        priority = priority or _priority.get()
+        started_at = time.monotonic()
+        give_up_at = started_at + timeout if timeout is not None else None
+        ticket = (PRIORITIES[priority], next(self._sequence))
+
+        with self._lock:
+            heapq.heappush(self._waiters, ticket)
+        try:
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    if self._waiters[0] == ticket:
+                        delay = max(self.requests.delay(1, now), self.tokens.delay(tokens, now))
+                        if delay == 0:
+                            heapq.heappop(self._waiters)
+                            self.requests.take(1)
+                            self.tokens.take(tokens)
+                            return self._acquired(priority, now - started_at)
+                    else:
+                        delay = self.poll_interval
+
+                if give_up_at is not None and now + delay > give_up_at:
+                    with self._lock:
+                        self.stats['timed_out'] += 1
+                    RATE_LIMIT_WAIT_SECONDS.observe(now - started_at, priority=priority)
+                    return None
+                # The head sleeps until its refill; a call of higher priority arriving meanwhile goes next
+                await asyncio.sleep(delay)
+        finally:
+            with self._lock:
+                if ticket in self._waiters:
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+
+    def _acquired(self, priority: str, waited: float) -> float:
+        self.stats['acquired'] += 1
+        if waited > 0:
+            self.stats['waited'] += 1
+        RATE_LIMIT_WAIT_SECONDS.observe(waited, priority=priority)
+        return waited
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """Correct the token budget once a call's real usage is known
+
+        Args:
+            estimated (int): Tokens taken by acquire
+            actual (int): Tokens the API reported
+        """
+        with self._lock:
+            self.tokens.give_back(estimated - actual)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get limiter statistics
+
+        Returns:
+            Dict[str, Any]: Counters, queue length and remaining budgets
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.requests.delay(0, now)
+            self.tokens.delay(0, now)
+            return {
+                **self.stats,
+                'queued': len(self._waiters),
+                'requests_available': int(self.requests.level),
+                'tokens_available': int(self.tokens.level)
+            }
@@ -0,0 +1,75 @@
+"""Single-flight coalescing of concurrent identical calls"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar('T')
+
+class _Flight:
+    """One in-flight computation and the number of callers waiting on it"""
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """Runs one computation per key at a time and shares its result
+
+    Callers arriving while a computation for their key is in flight await it
+    instead of starting their own. A caller being cancelled does not cancel the
+    shared computation unless it was the last one waiting. Flights are kept per
+    event loop, since a future cannot be awaited from another loop.
+    """
+
+    def __init__(self):
+        """Initialize single-flight group"""
+        self._flights: Dict[Tuple[int, Hashable], _Flight] = {}
+        self.stats = {
+            'calls': 0,
+            'coalesced': 0
+        }
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Run func, or join the in-flight run for the same key
+
+        Args:
+            key (Hashable): Coalescing key
+            func (Callable[[], Awaitable[T]]): Computation to run if none is in flight
+
+        Returns:
+            T: Result of the shared computation
+        """
+        self.stats['calls'] += 1
+        flight_key = (id(asyncio.get_running_loop()), key)
+
+        flight = self._flights.get(flight_key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(func()))
+            self._flights[flight_key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(flight_key, flight))
+        else:
+            self.stats['coalesced'] += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget(self, flight_key: Tuple[int, Hashable], flight: _Flight) -> None:
+        if self._flights.get(flight_key) is flight:
+            del self._flights[flight_key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing statistics
+
+        Returns:
+            Dict[str, Any]: Calls, coalesced calls, in-flight count and coalesced rate
+        """
+        stats = dict(self.stats)
+        stats['in_flight'] = len(self._flights)
+        stats['coalesced_rate'] = stats['coalesced'] / stats['calls'] if stats['calls'] else 0.0
+        return stats
@@ -0,0 +1,82 @@
+"""Text normalization helpers"""
+import re
+from typing import List
+
+# str.lower() maps 'I' to 'i' and 'İ' to 'i̇' (with a combining dot), both wrong for Turkish
+_TURKISH_LOWER_MAP = str.maketrans({'İ': 'i', 'I': 'ı'})
+
+# Turkish letters folded to their closest ASCII form so "fenerbahçe" matches "fenerbahce"
+_TURKISH_FOLD_MAP = str.maketrans({
+    'ç': 'c', 'ğ': 'g', 'ı': 'i', 'ö': 'o', 'ş': 's', 'ü': 'u',
+    'â': 'a', 'î': 'i', 'û': 'u'
+})
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_PUNCTUATION_RE = re.compile(r"[^\w\s]+", re.UNICODE)
+
+
+def turkish_lower(text: str) -> str:
+    """Lowercase text using Turkish casing rules
+
+    Args:
+        text (str): Text to lowercase
+
+    Returns:
+        str: Lowercased text
+    """
+    return text.translate(_TURKISH_LOWER_MAP).lower()
+
+
+def fold_turkish(text: str) -> str:
+    """Lowercase text and fold Turkish letters to ASCII
+
+    Args:
+        text (str): Text to fold
+
+    Returns:
+        str: Folded text
+    """
+    return turkish_lower(text).translate(_TURKISH_FOLD_MAP)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into folded word tokens
+
+    Args:
+        text (str): Text to tokenize
+
+    Returns:
+        List[str]: Folded tokens, punctuation removed
+    """
+    return _WORD_RE.findall(fold_turkish(text))
+
+
+def normalize_query(text: str) -> str:
+    """Normalize a query for use as a cache key
+
+    Casefolds with Turkish rules, drops punctuation and collapses whitespace,
+    so "Elmas kaç dolar?" and "  elmas  KAÇ dolar" share a key.
+
+    Args:
+        text (str): Query text
+
+    Returns:
+        str: Normalized query
+    """
+    text = _PUNCTUATION_RE.sub(' ', turkish_lower(text).casefold())
+    return ' '.join(text.split())
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the token count of a text
+
+    Turkish text averages about three characters per token with the GPT tokenizers,
+    so this errs on the high side for English.
+
+    Args:
+        text (str): Text to estimate
+
+    Returns:
+        int: Estimated token count
+    """
+    return len(text) // 3 + 1
@@ -1,21 +1,29 @@
 """Web search utility"""
+import asyncio
 import logging
 import os
+import time
+from functools import partial
 from typing import List, Optional, Dict, Any
 import aiohttp
 from tavily import TavilyClient
+from src.utils.metrics import UPSTREAM_SECONDS, UPSTREAM_ERRORS
 
 class WebSearchClient:
     """Web search client using Tavily API"""
     
-    def __init__(self, max_results: int = 5, search_depth: str = 'advanced'):
+    def __init__(self, max_results: int = 5, search_depth: str = 'advanced', timeout: float = 10.0,
+                 name: str = 'none'):
         """Initialize web search client
         
         Args:
             max_results (int, optional): Maximum number of results to return. Defaults to 5.
             search_depth (str, optional): Search depth level. Defaults to 'advanced'.
+            timeout (float, optional): Default search timeout in seconds. Defaults to 10.0.
+            name (str, optional): Expert using the client, the metrics label. Defaults to 'none'.
         """
         self.logger = logging.getLogger(__name__)
+        self.name = name
         
         api_key = os.getenv('TAVILY_API_KEY')
         if not api_key:
@@ -24,24 +32,32 @@ class WebSearchClient:
         self.client = TavilyClient(api_key=api_key)
         self.max_results = max_results
         self.search_depth = search_depth
+        self.timeout = timeout
         
         self.logger.info("Web search client initialized successfully")
         
-    async def search(self, query: str) -> Optional[str]:
+    async def search(self, query: str, timeout: Optional[float] = None) -> Optional[str]:
         """Perform web search
         
         Args:
             query (str): Search query
+            timeout (float, optional): Search timeout in seconds. Defaults to the client's timeout.
             
         Returns:
             Optional[str]: Search results summary or None if failed
         """
+        started_at = time.perf_counter()
         try:
-            # Tavily API'si async değil, bu yüzden sync olarak çağırıyoruz
-            response = self.client.search(
-                query=query,
-                max_results=self.max_results,
-                search_depth=self.search_depth
+            # Tavily API'si async değil; event loop'u bloklamamak için thread'de çalıştırıyoruz
+            loop = asyncio.get_running_loop()
+            response = await asyncio.wait_for(
+                loop.run_in_executor(None, partial(
+                    self.client.search,
+                    query=query,
+                    max_results=self.max_results,
+                    search_depth=self.search_depth
+                )),
+                timeout if timeout is not None else self.timeout
             )
             
             if not response or 'results' not in response:
@@ -62,9 +78,16 @@ class WebSearchClient:
                     
             return "\n\n".join(summary) if summary else None
             
+        except asyncio.TimeoutError:
+            UPSTREAM_ERRORS.inc(upstream='tavily', expert=self.name)
+            self.logger.warning(f"Web search timed out: {query}")
+            return None
         except Exception as e:
+            UPSTREAM_ERRORS.inc(upstream='tavily', expert=self.name)
             self.logger.error(f"Error performing web search: {str(e)}")
             return None
+        finally:
+            UPSTREAM_SECONDS.observe(time.perf_counter() - started_at, upstream='tavily', expert=self.name)
 
 class WebSearch:
     """Simple web search client"""
@@ -0,0 +1,70 @@
+import unittest
+
+from src.core.admission import AdmissionController
+
+
+class TestAdmissionController(unittest.TestCase):
+    def test_in_flight_limit(self):
+        controller = AdmissionController({'max_in_flight': 2})
+        first, second = controller.admit(), controller.admit()
+        self.assertIsNotNone(first)
+        self.assertIsNotNone(second)
+        self.assertIsNone(controller.admit())
+
+        controller.release(first)
+        self.assertIsNotNone(controller.admit())
+
+        stats = controller.get_stats()
+        self.assertEqual((stats['in_flight'], stats['admitted'], stats['shed']), (2, 3, 1))
+
+    def test_estimated_wait_sheds_before_the_limit(self):
+        controller = AdmissionController({'max_in_flight': 100, 'concurrency': 2, 'max_wait': 10.0})
+        controller.avg_latency = 4.0
+        controller.in_flight = 3
+
+        # Two more rounds of 4 s latency ahead of a new request: 8 s, admitted
+        self.assertIsNotNone(controller.admit())
+        # Now three rounds: 12 s, shed
+        self.assertIsNone(controller.admit())
+        self.assertGreaterEqual(controller.retry_after(), 4)
+
+    def test_recovers_after_a_slow_request(self):
+        controller = AdmissionController({'concurrency': 2, 'max_wait': 15.0, 'ewma_alpha': 0.5})
+        controller.release(controller.admit() - 20.0)
+        self.assertGreater(controller.estimated_wait(), controller.max_wait)
+
+        # A free slot admits regardless of the estimate, and fast requests bring it back down
+        for _ in range(3):
+            admitted_at = controller.admit()
+            self.assertIsNotNone(admitted_at)
+            controller.release(admitted_at)
+        self.assertLess(controller.avg_latency, 3.0)
+
+        first, second = controller.admit(), controller.admit()
+        self.assertIsNotNone(controller.admit())
+        self.assertEqual(controller.stats['shed'], 0)
+
+    def test_batch_takes_a_slot_per_question(self):
+        controller = AdmissionController({'max_in_flight': 10})
+        single = controller.admit()
+
+        self.assertIsNone(controller.admit(10))
+        admitted_at = controller.admit(9)
+        self.assertIsNotNone(admitted_at)
+        self.assertEqual(controller.in_flight, 10)
+
+        controller.release(admitted_at, 9, record_latency=False)
+        controller.release(single)
+        self.assertEqual(controller.in_flight, 0)
+        self.assertEqual(controller.stats['shed'], 1)
+
+    def test_latency_average(self):
+        controller = AdmissionController({'ewma_alpha': 0.5})
+        controller.release(controller.admit() - 2.0)
+        self.assertAlmostEqual(controller.avg_latency, 2.0, places=2)
+        controller.release(controller.admit())
+        self.assertAlmostEqual(controller.avg_latency, 1.0, places=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import asyncio
+import unittest
+
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+
+from src.experts.base_expert import BaseExpert
+from src.utils.deadline import Deadline
+from src.utils.openai_client import CompletionResult
+
+
+class FakeStreamingClient:
+    """Streams a fixed answer in chunks"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.calls = 0
+
+    async def complete(self, system_prompt, user_prompt, **kwargs):
+        self.calls += 1
+        text = "".join(self.chunks)
+        return CompletionResult(CompletionResult.OK if text else CompletionResult.EMPTY, text=text or None)
+
+    async def stream_completion(self, system_prompt, user_prompt, **kwargs):
+        self.calls += 1
+        for chunk in self.chunks:
+            yield chunk
+
+
+class SlowClient:
+    """Takes longer than any test deadline"""
+
+    def __init__(self):
+        self.timeouts = []
+
+    async def complete(self, system_prompt, user_prompt, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        await asyncio.sleep(5)
+        return CompletionResult(CompletionResult.OK, text='geç yanıt')
+
+
+class LocalExpert(BaseExpert):
+    async def _check_local_knowledge(self, query):
+        return 'yerel yanıt' if 'yerel' in query else None
+
+
+class TestStreamResponse(unittest.TestCase):
+    def setUp(self):
+        self.expert = LocalExpert({})
+
+    def collect(self, query):
+        async def run():
+            return [chunk async for chunk in self.expert.stream_response(query)]
+        return asyncio.run(run())
+
+    def test_streams_and_caches_completion(self):
+        self.expert.openai_client = FakeStreamingClient(['Merhaba', ' dünya'])
+        self.assertEqual(self.collect('soru'), ['Merhaba', ' dünya'])
+
+        # The joined answer is cached, so the non-streaming pipeline reuses it
+        self.assertEqual(asyncio.run(self.expert.get_response('soru')), 'Merhaba dünya')
+        self.assertEqual(self.expert.openai_client.calls, 1)
+
+    def test_local_answer_is_one_chunk(self):
+        self.expert.openai_client = FakeStreamingClient(['x'])
+        self.assertEqual(self.collect('yerel soru'), ['yerel yanıt'])
+        self.assertEqual(self.expert.openai_client.calls, 0)
+
+    def test_failed_stream_falls_back(self):
+        self.expert.openai_client = FakeStreamingClient([])
+        self.assertEqual(self.collect('soru'), [BaseExpert.FALLBACK_RESPONSE])
+
+
+class TestDeadline(unittest.TestCase):
+    def test_slow_llm_stage_falls_through(self):
+        expert = LocalExpert({})
+        expert.openai_client = SlowClient()
+
+        async def run():
+            return await expert.get_response('soru', Deadline(0.2))
+
+        self.assertEqual(asyncio.run(run()), BaseExpert.FALLBACK_RESPONSE)
+        self.assertEqual(expert.get_stats()['stage_timeouts']['llm'], 1)
+        # The client is told its share of the remaining budget
+        self.assertLess(expert.openai_client.timeouts[0], 0.2)
+
+    def test_share_of_remaining_time(self):
+        deadline = Deadline(10)
+        self.assertAlmostEqual(deadline.share(0.3), 3.0, places=1)
+        self.assertEqual(Deadline(-1).share(0.5), 0.0)
+        self.assertTrue(Deadline(0).expired())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import time
+import sqlite3
+import tempfile
+import unittest
+
+from src.utils.cache import Cache, LRUCache, SharedCache, create_cache
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get_stats()['evictions'], 1)
+
+    def test_expired_entries_miss(self):
+        cache = LRUCache(max_size=10, ttl=0)
+        cache.set('a', 1)
+        time.sleep(0.01)
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.get_stats()['misses'], 1)
+
+
+class TestSharedCache(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'cache.sqlite3')
+
+    def test_workers_share_entries(self):
+        writer = SharedCache(self.path, namespace='SportsExpert')
+        reader = SharedCache(self.path, namespace='SportsExpert')
+        writer.set('maç ne zaman?', 'Yarın')
+
+        self.assertEqual(reader.get('maç ne zaman?'), 'Yarın')
+        self.assertEqual(reader.get('maç ne zaman?'), 'Yarın')
+        self.assertEqual(reader.stats['l2_hits'], 1)
+        self.assertEqual(reader.stats['l1_hits'], 1)
+
+    def test_namespaces_are_separate(self):
+        SharedCache(self.path, namespace='SportsExpert').set('soru', 'spor')
+
+        self.assertIsNone(SharedCache(self.path, namespace='FoodExpert').get('soru'))
+
+    def test_expired_entries_miss(self):
+        SharedCache(self.path, ttl=0).set('a', 'b')
+        time.sleep(0.01)
+        cache = SharedCache(self.path, ttl=0)
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats['misses'], 1)
+
+    def test_per_entry_ttl(self):
+        cache = SharedCache(self.path, ttl=3600)
+        cache.set('short', 'b', ttl=0)
+        cache.set('long', 'c')
+        time.sleep(0.01)
+
+        self.assertIsNone(cache.get('short'))
+        self.assertEqual(cache.get('long'), 'c')
+
+    def test_corrupt_entry_is_a_miss(self):
+        cache = SharedCache(self.path)
+        cache.set('soru', 'yanıt')
+        cache._connect().execute("UPDATE cache SET value = '{bozuk'")
+        cache.l1.clear()
+
+        self.assertIsNone(cache.get('soru'))
+        self.assertEqual(cache.stats['errors'], 1)
+        self.assertIsNone(cache._connect().execute("SELECT value FROM cache").fetchone())
+
+    def test_busy_file_skips_write(self):
+        cache = SharedCache(self.path)
+        other = sqlite3.connect(self.path, isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")
+        try:
+            started = time.monotonic()
+            cache.set('soru', 'yanıt')
+            cache.remove('soru')
+            cache.clear()
+            elapsed = time.monotonic() - started
+        finally:
+            other.execute("ROLLBACK")
+            other.close()
+
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(cache.stats['busy'], 3)
+        self.assertEqual(cache.stats['errors'], 0)
+        self.assertIsNone(SharedCache(self.path).get('soru'))
+
+    def test_create_cache(self):
+        self.assertIsInstance(create_cache('SportsExpert'), Cache)
+        self.assertIsInstance(create_cache('SportsExpert', config={'backend': 'sqlite', 'path': self.path}), SharedCache)
+        with self.assertRaises(ValueError):
+            create_cache('SportsExpert', config={'backend': 'redis'})
+
+
+if __name__ == '__main__':
+    unittest.main()
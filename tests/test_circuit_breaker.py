@@ -0,0 +1,56 @@
+import unittest
+from unittest.mock import patch
+
+from src.utils.circuit_breaker import CircuitBreaker
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker('openai', failure_threshold=3, reset_timeout=30.0)
+        for _ in range(2):
+            self.assertTrue(breaker.allow())
+            breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+        self.assertEqual(breaker.get_stats()['rejected'], 1)
+
+    def test_success_resets_failure_count(self):
+        breaker = CircuitBreaker('openai', failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_lets_one_probe_through(self):
+        breaker = CircuitBreaker('openai', failure_threshold=1, reset_timeout=10.0)
+        with patch('src.utils.circuit_breaker.time.monotonic', return_value=100.0):
+            breaker.record_failure()
+        with patch('src.utils.circuit_breaker.time.monotonic', return_value=111.0):
+            self.assertTrue(breaker.allow())
+            self.assertFalse(breaker.allow())
+            breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker('openai', failure_threshold=1, reset_timeout=10.0)
+        with patch('src.utils.circuit_breaker.time.monotonic', return_value=100.0):
+            breaker.record_failure()
+        with patch('src.utils.circuit_breaker.time.monotonic', return_value=111.0):
+            self.assertTrue(breaker.allow())
+            breaker.record_failure()
+            self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+            self.assertAlmostEqual(breaker.retry_after(), 10.0)
+
+    def test_released_probe_frees_the_slot(self):
+        breaker = CircuitBreaker('openai', failure_threshold=1, reset_timeout=0.0)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.release()
+        self.assertTrue(breaker.allow())
+
+
+if __name__ == '__main__':
+    unittest.main()
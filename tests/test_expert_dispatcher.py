@@ -0,0 +1,195 @@
+import asyncio
+import unittest
+
+from src.core.expert_dispatcher import ExpertDispatcher
+
+
+class FakeExpert:
+    def __init__(self, local=None, full='full answer', delay=0.0):
+        self.local = local
+        self.full = full
+        self.delay = delay
+        self.full_calls = 0
+        self.local_cancelled = False
+
+    async def get_local_response(self, query):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.local_cancelled = True
+            raise
+        return self.local
+
+    async def get_response(self, query, deadline=None):
+        self.full_calls += 1
+        await asyncio.sleep(self.delay)
+        return self.full
+
+    async def stream_response(self, query, max_chars=None, deadline=None):
+        self.full_calls += 1
+        for word in self.full.split(' '):
+            yield word
+
+    def is_answer(self, response):
+        return bool(response) and not response.startswith('Üzgünüm')
+
+
+class FakeSelector:
+    def __init__(self, route, likely, delay=0.01, weighted=None):
+        self.route = route
+        self.likely = likely
+        self.delay = delay
+        self.weighted = weighted
+
+    def classify_local(self, query):
+        return self.likely, 0.5
+
+    async def select_expert(self, query, deadline=None):
+        await asyncio.sleep(self.delay)
+        return self.route
+
+    async def select_expert_weights(self, query, deadline=None):
+        return self.weighted
+
+    def select_expert_cached(self, query):
+        return self.route if self.likely else None
+
+    async def select_experts(self, queries, deadline=None):
+        return [self.route if query != 'selam' else (None, 'Merhaba') for query in queries]
+
+
+class TestSpeculation(unittest.TestCase):
+    def test_hit_skips_full_pipeline(self):
+        experts = {'food': FakeExpert(local='cached tarif')}
+        dispatcher = ExpertDispatcher(experts, FakeSelector(('food', None), 'food'),
+                                      {'speculation': {'mode': 'likely'}})
+
+        self.assertEqual(asyncio.run(dispatcher.answer('kebap')), ('food', 'cached tarif'))
+        self.assertEqual(experts['food'].full_calls, 0)
+
+        stats = dispatcher.get_stats()
+        self.assertEqual(stats['speculation_hits'], 1)
+        self.assertGreater(stats['latency_saved_ms'], 0)
+
+    def test_disagreement_cancels_speculation(self):
+        experts = {'food': FakeExpert(local='x', delay=1), 'sports': FakeExpert()}
+        dispatcher = ExpertDispatcher(experts, FakeSelector(('sports', None), 'food'),
+                                      {'speculation': {'mode': 'likely'}})
+
+        self.assertEqual(asyncio.run(dispatcher.answer('soru')), ('sports', 'full answer'))
+        self.assertTrue(experts['food'].local_cancelled)
+        self.assertEqual(dispatcher.get_stats()['speculation_misses'], 1)
+
+    def test_direct_response(self):
+        experts = {'food': FakeExpert()}
+        dispatcher = ExpertDispatcher(experts, FakeSelector((None, 'Merhaba'), None),
+                                      {'speculation': {'mode': 'all'}})
+        self.assertEqual(asyncio.run(dispatcher.answer('selam')), (None, 'Merhaba'))
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            ExpertDispatcher({}, FakeSelector((None, None), None), {'speculation': {'mode': 'sometimes'}})
+
+
+class TestFanOut(unittest.TestCase):
+    def _dispatcher(self, experts, strategy, deadline=1.0, weighted=(('sports', 0.6), ('food', 0.4))):
+        selector = FakeSelector(None, None, weighted=(list(weighted), None))
+        return ExpertDispatcher(experts, selector, {
+            'fanout': {'enabled': True, 'strategy': strategy, 'deadline': deadline}
+        })
+
+    def test_merge_joins_answers_by_weight(self):
+        experts = {'sports': FakeExpert(full='protein önemli', delay=0.02), 'food': FakeExpert(full='tavuk göğsü')}
+        result = asyncio.run(self._dispatcher(experts, 'merge').answer('sporcular için protein ağırlıklı yemek'))
+        self.assertEqual(result, ('sports+food', 'protein önemli\n\ntavuk göğsü'))
+
+    def test_merge_skips_weak_secondary_expert(self):
+        experts = {'sports': FakeExpert(full='protein önemli'), 'food': FakeExpert(full='tavuk göğsü')}
+        dispatcher = self._dispatcher(experts, 'merge', weighted=(('sports', 0.7), ('food', 0.3)))
+
+        self.assertEqual(asyncio.run(dispatcher.answer('soru')), ('sports', 'protein önemli'))
+        self.assertEqual(experts['food'].full_calls, 0)
+        self.assertEqual(dispatcher.get_stats()['fanouts'], 0)
+
+    def test_first_good_answer_cancels_the_rest(self):
+        experts = {'sports': FakeExpert(full='geç', delay=1), 'food': FakeExpert(full='tavuk göğsü')}
+        dispatcher = self._dispatcher(experts, 'first', deadline=5)
+        self.assertEqual(asyncio.run(dispatcher.answer('soru')), ('food', 'tavuk göğsü'))
+        self.assertEqual(dispatcher.get_stats()['fanout_cancelled'], 1)
+
+    def test_deadline_keeps_finished_answers(self):
+        experts = {'sports': FakeExpert(full='geç', delay=1), 'food': FakeExpert(full='Üzgünüm, bilmiyorum')}
+        dispatcher = self._dispatcher(experts, 'merge', deadline=0.05)
+        self.assertEqual(asyncio.run(dispatcher.answer('soru')), ('food', 'Üzgünüm, bilmiyorum'))
+        self.assertEqual(dispatcher.get_stats()['fanout_timeouts'], 1)
+
+
+class CountingExpert(FakeExpert):
+    def __init__(self):
+        super().__init__(delay=0.01)
+        self.running = 0
+        self.max_running = 0
+
+    async def get_response(self, query, deadline=None):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            return await super().get_response(query)
+        finally:
+            self.running -= 1
+
+
+class TestAnswerMany(unittest.TestCase):
+    def test_concurrency_cap_and_dedupe(self):
+        expert = CountingExpert()
+        dispatcher = ExpertDispatcher({'ai': expert}, FakeSelector(('ai', None), None),
+                                      {'ask_batch': {'concurrency': 3}})
+        questions = [f'soru {i}' for i in range(10)] + ['Soru 0?', 'selam']
+
+        answers = asyncio.run(dispatcher.answer_many(questions))
+
+        self.assertEqual(answers[:11], [('ai', 'full answer')] * 11)
+        self.assertEqual(answers[11], (None, 'Merhaba'))
+        self.assertEqual(expert.full_calls, 10)
+        self.assertEqual(expert.max_running, 3)
+        self.assertEqual(dispatcher.get_stats()['batch_deduplicated'], 1)
+
+
+class TestAnswerCached(unittest.TestCase):
+    def test_only_local_stages_run(self):
+        experts = {'food': FakeExpert(local='cached tarif')}
+        dispatcher = ExpertDispatcher(experts, FakeSelector(('food', None), 'food'))
+        self.assertEqual(asyncio.run(dispatcher.answer_cached('kebap')), ('food', 'cached tarif'))
+        self.assertEqual(experts['food'].full_calls, 0)
+
+    def test_unrouted_question_has_no_answer(self):
+        dispatcher = ExpertDispatcher({'food': FakeExpert()}, FakeSelector(('food', None), None))
+        self.assertEqual(asyncio.run(dispatcher.answer_cached('soru')), (None, None))
+
+
+class TestStreaming(unittest.TestCase):
+    def collect(self, dispatcher, question):
+        async def run():
+            return [event async for event in dispatcher.answer_stream(question)]
+        return asyncio.run(run())
+
+    def test_route_comes_before_tokens(self):
+        dispatcher = ExpertDispatcher({'food': FakeExpert(full='bol tereyağı')}, FakeSelector(('food', None), None))
+        self.assertEqual(self.collect(dispatcher, 'kebap'), [
+            ('route', {'expert_type': 'food'}),
+            ('token', {'text': 'bol'}),
+            ('token', {'text': 'tereyağı'}),
+            ('done', {'answered': True})
+        ])
+
+    def test_direct_response_is_one_token(self):
+        dispatcher = ExpertDispatcher({}, FakeSelector((None, 'Merhaba'), None))
+        self.assertEqual(self.collect(dispatcher, 'selam'), [
+            ('route', {'expert_type': 'general'}),
+            ('token', {'text': 'Merhaba'}),
+            ('done', {'answered': True})
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
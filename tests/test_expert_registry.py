@@ -0,0 +1,78 @@
+import os
+import sys
+import unittest
+
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+
+from src.experts.registry import ExpertRegistry
+from src.utils.import_report import ImportRecorder
+
+
+class FakeExpert:
+    built = 0
+
+    def __init__(self, config):
+        FakeExpert.built += 1
+        self.config = config
+
+
+class TestExpertRegistry(unittest.TestCase):
+    def setUp(self):
+        FakeExpert.built = 0
+        self.registry = ExpertRegistry(
+            {'fake': {'name': 'fake'}},
+            modules={'fake': (__name__, 'FakeExpert')}
+        )
+
+    def test_membership_does_not_build(self):
+        self.assertIn('fake', self.registry)
+        self.assertNotIn('general', self.registry)
+        self.assertEqual(list(self.registry), ['fake'])
+        self.assertEqual(FakeExpert.built, 0)
+        self.assertEqual(self.registry.loaded(), {})
+
+    def test_builds_once_on_first_use(self):
+        expert = self.registry['fake']
+
+        self.assertIs(self.registry['fake'], expert)
+        self.assertEqual(expert.config, {'name': 'fake'})
+        self.assertEqual(FakeExpert.built, 1)
+        self.assertIn('fake', self.registry.load_times)
+
+    def test_unknown_expert(self):
+        with self.assertRaises(KeyError):
+            self.registry['general']
+
+    def test_preload(self):
+        self.assertEqual(self.registry.preload(['fake', 'general']), 1)
+        self.assertEqual(list(self.registry.loaded()), ['fake'])
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_package_attribute_loads_expert(self):
+        import src.experts
+        from src.experts import SportsExpert
+
+        self.assertEqual(SportsExpert.__name__, 'SportsExpert')
+        with self.assertRaises(AttributeError):
+            src.experts.MissingExpert
+
+
+class TestImportRecorder(unittest.TestCase):
+    def test_records_modules_imported_while_running(self):
+        sys.modules.pop('colorsys', None)
+        recorder = ImportRecorder(trace_memory=False)
+        recorder.start()
+        try:
+            import colorsys  # noqa: F401
+        finally:
+            recorder.stop()
+
+        self.assertIn('colorsys', recorder.records)
+        self.assertGreaterEqual(recorder.records['colorsys']['cumulative_ms'], 0)
+        self.assertNotIn(recorder, sys.meta_path)
+        self.assertIn('colorsys', recorder.format())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,255 @@
+import os
+import asyncio
+import unittest
+
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+
+from src.core.expert_selector import ExpertSelector
+from src.core.expert_classifier import KeywordClassifier
+from src.utils.deadline import Deadline
+
+
+class FakeOpenAIClient:
+    """Records prompts and answers with a fixed routing label"""
+
+    def __init__(self, answer, model='gpt-4'):
+        self.answer = answer
+        self.model = model
+        self.calls = []
+
+    async def get_completion(self, system_prompt, user_prompt, **kwargs):
+        self.calls.append(user_prompt)
+        return self.answer
+
+
+class TestKeywordClassifier(unittest.TestCase):
+    def setUp(self):
+        self.classifier = KeywordClassifier()
+
+    def test_known_entities(self):
+        """Team, dish and app names route to their experts"""
+        self.assertEqual(self.classifier.classify("Galatasaray'ın stadyumu neresi?")[0], 'sports')
+        self.assertEqual(self.classifier.classify("Menemen tarifi")[0], 'food')
+        self.assertEqual(self.classifier.classify("Yapay zeka nedir?")[0], 'ai')
+        self.assertEqual(self.classifier.classify("SudoStar minimum çekim")[0], 'sudostar')
+
+    def test_turkish_casing(self):
+        """Dotted capital İ and folded letters match the same keywords"""
+        self.assertEqual(self.classifier.classify("İSKENDER"), self.classifier.classify("iskender"))
+        self.assertEqual(self.classifier.classify("FENERBAHCE")[0], 'sports')
+
+    def test_no_match(self):
+        self.assertEqual(self.classifier.classify("bugün hava nasıl"), (None, 0.0))
+
+    def test_short_terms_match_whole_words(self):
+        self.assertEqual(self.classifier.classify("maç kaç kaç bitti")[0], 'sports')
+        self.assertIsNone(self.classifier.classify("gölge oyunu nasıl yapılır")[0])
+        self.assertNotEqual(self.classifier.classify("machine nedir")[0], 'sports')
+
+    def test_mixed_domains_are_low_confidence(self):
+        _, confidence = self.classifier.classify("sporcular için protein ağırlıklı yemek")
+        self.assertLess(confidence, 0.6)
+
+
+class TestExpertSelector(unittest.TestCase):
+    def setUp(self):
+        self.selector = ExpertSelector()
+        self.selector.openai_client = FakeOpenAIClient('food')
+
+    def test_local_fast_path_skips_llm(self):
+        expert_type, direct_response = asyncio.run(self.selector.select_expert("Kebap nasıl yapılır?"))
+        self.assertEqual(expert_type, 'food')
+        self.assertIsNone(direct_response)
+        self.assertEqual(self.selector.openai_client.calls, [])
+        self.assertEqual(self.selector.get_stats()['local_hits'], 1)
+
+    def test_ambiguous_query_falls_through(self):
+        expert_type, _ = asyncio.run(self.selector.select_expert("sporcular için protein ağırlıklı yemek"))
+        self.assertEqual(expert_type, 'food')
+        self.assertEqual(len(self.selector.openai_client.calls), 1)
+
+        stats = self.selector.get_stats()
+        self.assertEqual(stats['local_hit_rate'], 0.0)
+        self.assertEqual(stats['evaluated'], 1)
+        self.assertEqual(stats['local_accuracy'], 1.0)
+
+    def test_failed_llm_routing_is_not_a_disagreement(self):
+        self.selector.openai_client = FakeOpenAIClient(None)
+        asyncio.run(self.selector.select_expert("sporcular için protein ağırlıklı yemek"))
+
+        self.assertEqual(self.selector.get_stats()['evaluated'], 0)
+
+    def test_shadow_routing_runs_off_the_request_path(self):
+        self.selector.shadow_rate = 1.0
+
+        async def route():
+            expert_type = (await self.selector.select_expert("Kebap nasıl yapılır?"))[0]
+            calls_before_shadow = len(self.selector.openai_client.calls)
+            await asyncio.gather(*self.selector._shadow_tasks)
+            return expert_type, calls_before_shadow
+
+        self.assertEqual(asyncio.run(route()), ('food', 0))
+        self.assertEqual(self.selector.get_stats()['evaluated'], 1)
+
+    def test_disabled_classifier(self):
+        selector = ExpertSelector({'local_classifier': {'enabled': False}})
+        selector.openai_client = FakeOpenAIClient('none Merhaba!')
+        self.assertEqual(asyncio.run(selector.select_expert("Kebap nasıl yapılır?")), (None, 'merhaba!'))
+
+    def test_routing_cache_normalizes_queries(self):
+        selector = ExpertSelector({'local_classifier': {'enabled': False}})
+        selector.openai_client = FakeOpenAIClient('none 5000 elmas 1 dolar eder')
+
+        first = asyncio.run(selector.select_expert("Elmas kaç dolar?"))
+        second = asyncio.run(selector.select_expert("  ELMAS   kaç dolar"))
+        self.assertEqual(first, second)
+        self.assertEqual(len(selector.openai_client.calls), 1)
+
+        cache_stats = selector.get_stats()['cache']
+        self.assertEqual((cache_stats['hits'], cache_stats['misses']), (1, 1))
+
+    def test_concurrent_duplicates_share_one_llm_call(self):
+        selector = ExpertSelector({'local_classifier': {'enabled': False}})
+        selector.openai_client = FakeOpenAIClient('ai')
+
+        async def run():
+            return await asyncio.gather(*(selector.select_expert(q) for q in ("Elmas nedir?", "elmas nedir", "ELMAS NEDİR")))
+
+        self.assertEqual(asyncio.run(run()), [('ai', None)] * 3)
+        self.assertEqual(len(selector.openai_client.calls), 1)
+        self.assertEqual(selector.get_stats()['single_flight']['coalesced'], 2)
+
+    def test_deadline_falls_back_to_local_guess(self):
+        class SlowClient(FakeOpenAIClient):
+            async def get_completion(self, system_prompt, user_prompt, **kwargs):
+                await asyncio.sleep(5)
+
+        selector = ExpertSelector({'cache': {'enabled': False}, 'deadline': {'routing_share': 1.0}})
+        selector.openai_client = SlowClient('ai')
+        query = "sporcular için protein ağırlıklı yemek"
+        local_type, _ = selector.classify_local(query)
+
+        route = asyncio.run(selector.select_expert(query, Deadline(0.1)))
+        self.assertEqual(route, (local_type, None))
+        self.assertEqual(selector.get_stats()['deadline_fallbacks'], 1)
+
+    def test_failed_routing_is_not_cached(self):
+        self.selector.openai_client = FakeOpenAIClient(None)
+        asyncio.run(self.selector.select_expert("bugün hava nasıl"))
+        asyncio.run(self.selector.select_expert("bugün hava nasıl"))
+        self.assertEqual(len(self.selector.openai_client.calls), 2)
+
+
+class TestRoutingCascade(unittest.TestCase):
+    def setUp(self):
+        self.selector = ExpertSelector({'local_classifier': {'enabled': False}, 'cache': {'enabled': False}})
+        self.selector.openai_client = FakeOpenAIClient('ai')
+
+    def test_confident_cheap_answer_is_kept(self):
+        self.selector.cascade_clients = [FakeOpenAIClient('food 0.95', model='gpt-3.5-turbo')]
+        self.assertEqual(asyncio.run(self.selector.select_expert("soru")), ('food', None))
+        self.assertEqual(self.selector.openai_client.calls, [])
+
+    def test_low_confidence_or_malformed_escalates(self):
+        for answer in ('food 0.4', 'food', 'I think it is about cooking'):
+            self.selector.cascade_clients = [FakeOpenAIClient(answer, model='gpt-3.5-turbo')]
+            self.assertEqual(asyncio.run(self.selector.select_expert("soru")), ('ai', None))
+
+        # Client usage also counts calls made outside routing; it must not replace the tier's own count
+        self.selector.openai_client.usage = {'calls': 10, 'total_tokens': 500}
+        cheap, final = self.selector.get_stats()['tiers']
+        self.assertEqual((cheap['model'], final['model']), ('gpt-3.5-turbo', 'gpt-4'))
+        self.assertEqual(cheap['escalation_rate'], 1.0)
+        self.assertEqual(final['calls'], 3)
+        self.assertEqual(final['usage']['calls'], 10)
+
+    def test_failed_last_tier_keeps_cheap_route(self):
+        class FailingClient(FakeOpenAIClient):
+            async def get_completion(self, system_prompt, user_prompt, **kwargs):
+                raise RuntimeError('upstream down')
+
+        self.selector.cascade_clients = [FakeOpenAIClient('food 0.4', model='gpt-3.5-turbo')]
+        self.selector.openai_client = FailingClient(None)
+
+        self.assertEqual(asyncio.run(self.selector.select_expert("soru")), ('food', None))
+        final = self.selector.get_stats()['tiers'][1]
+        self.assertEqual((final['calls'], final['accepted']), (1, 0))
+
+    def test_direct_response_after_confidence(self):
+        self.selector.cascade_clients = [FakeOpenAIClient('none 0.9 5000 elmas 1 dolar', model='gpt-3.5-turbo')]
+        self.assertEqual(asyncio.run(self.selector.select_expert("soru")), (None, '5000 elmas 1 dolar'))
+
+class TestWeightedRouting(unittest.TestCase):
+    def setUp(self):
+        self.selector = ExpertSelector({'local_classifier': {'enabled': False}})
+
+    def test_json_answer_with_weights(self):
+        self.selector.openai_client = FakeOpenAIClient(
+            '{"experts": [{"name": "food", "weight": 3}, {"name": "sports", "weight": 1}], "confidence": 0.8}'
+        )
+        experts, direct_response = asyncio.run(self.selector.select_expert_weights("sporcular için yemek"))
+        self.assertEqual(experts, [('food', 0.75), ('sports', 0.25)])
+        self.assertIsNone(direct_response)
+        self.assertEqual(asyncio.run(self.selector.select_expert("sporcular için yemek")), ('food', None))
+
+    def test_low_weights_are_dropped(self):
+        self.selector.openai_client = FakeOpenAIClient(
+            '{"experts": [{"name": "food", "weight": 0.9}, {"name": "ai", "weight": 0.1}]}'
+        )
+        experts, _ = asyncio.run(self.selector.select_expert_weights("soru"))
+        self.assertEqual(experts, [('food', 1.0)])
+
+    def test_json_direct_answer(self):
+        self.selector.openai_client = FakeOpenAIClient('```json\n{"experts": [], "answer": "Merhaba!"}\n```')
+        self.assertEqual(asyncio.run(self.selector.select_expert("selam")), (None, 'Merhaba!'))
+
+
+class TestBatchRouting(unittest.TestCase):
+    def setUp(self):
+        self.selector = ExpertSelector({'local_classifier': {'enabled': False}})
+
+    def test_one_call_for_many_queries(self):
+        self.selector.openai_client = FakeOpenAIClient(
+            '[{"id": 1, "expert": "ai"}, {"id": 2, "expert": "none", "answer": "Merhaba"}, {"id": 3, "expert": "food"}]'
+        )
+        routes = asyncio.run(self.selector.select_experts(["soru bir", "soru iki", "soru üç", "Soru bir?"]))
+
+        self.assertEqual(routes, [('ai', None), (None, 'Merhaba'), ('food', None), ('ai', None)])
+        self.assertEqual(len(self.selector.openai_client.calls), 1)
+
+    def test_missing_items_fall_back_to_single_calls(self):
+        self.selector.openai_client = FakeOpenAIClient('[{"id": 1, "expert": "sports"}]')
+        routes = asyncio.run(self.selector.select_experts(["soru bir", "soru iki"]))
+
+        self.assertEqual(routes[0], ('sports', None))
+        self.assertEqual(len(self.selector.openai_client.calls), 2)
+
+    def test_expired_deadline_skips_routing_calls(self):
+        self.selector.openai_client = FakeOpenAIClient('[{"id": 1, "expert": "ai"}]')
+        routes = asyncio.run(self.selector.select_experts(["soru bir", "soru iki"], Deadline(0)))
+
+        self.assertEqual(routes, [(None, None), (None, None)])
+        self.assertEqual(self.selector.openai_client.calls, [])
+
+    def test_malformed_items_are_skipped(self):
+        self.selector.openai_client = FakeOpenAIClient(
+            '["sports", {"id": "bir", "expert": "ai"}, {"id": null, "expert": "ai"}, {"id": 2, "expert": "food"}]'
+        )
+        routes = asyncio.run(self.selector.select_experts(["soru bir", "soru iki"]))
+
+        self.assertEqual(routes[1], ('food', None))
+        self.assertEqual(len(self.selector.openai_client.calls), 2)
+
+    def test_token_budget_splits_batches(self):
+        self.selector.batch_max_items = 2
+        chunks = self.selector._pack_batches(["a", "b", "c", "d", "e"])
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+
+        self.selector.batch_max_items = 40
+        self.selector.batch_prompt_tokens = 400
+        chunks = self.selector._pack_batches(["x" * 300] * 3)
+        self.assertEqual(len(chunks), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
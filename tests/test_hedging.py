@@ -0,0 +1,42 @@
+import unittest
+
+from src.utils.hedging import HedgePolicy
+
+
+class TestHedgePolicy(unittest.TestCase):
+    def test_no_delay_until_enough_samples(self):
+        policy = HedgePolicy(min_samples=5, min_delay=0.0)
+        for _ in range(4):
+            policy.record(1.0)
+
+        self.assertIsNone(policy.start_call())
+        policy.record(1.0)
+        self.assertEqual(policy.start_call(), 1.0)
+
+    def test_delay_follows_the_percentile(self):
+        policy = HedgePolicy(percentile=0.9, min_samples=10, min_delay=0.0)
+        for latency in range(1, 101):
+            policy.record(latency / 100)
+
+        self.assertAlmostEqual(policy.start_call(), 0.91)
+
+    def test_delay_has_a_floor(self):
+        policy = HedgePolicy(min_samples=1, min_delay=0.5)
+        policy.record(0.01)
+
+        self.assertEqual(policy.start_call(), 0.5)
+
+    def test_budget_caps_the_hedge_rate(self):
+        policy = HedgePolicy(max_ratio=0.1, burst=2)
+        fired = 0
+        for _ in range(100):
+            policy.start_call()
+            fired += policy.try_hedge()
+
+        # The initial burst plus about one hedge per ten calls
+        self.assertTrue(10 <= fired <= 12, fired)
+        self.assertEqual(policy.get_stats()['over_budget'], 100 - fired)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import time
+import asyncio
+import tempfile
+import unittest
+
+from src.core.jobs import JobRunner, MemoryJobStore, SQLiteJobStore
+
+
+def wait_for_status(runner, job_id, statuses=('done', 'failed'), timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = runner.get(job_id)
+        if job and job['status'] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+async def answer(question):
+    await asyncio.sleep(0.01)
+    if question == 'hata':
+        raise RuntimeError('Could not generate response')
+    return {'answer': question.upper(), 'expert_type': 'general'}
+
+
+class TestJobRunner(unittest.TestCase):
+    def test_job_lifecycle(self):
+        runner = JobRunner(MemoryJobStore(), answer, {'workers': 2})
+        runner.start()
+
+        job = runner.submit('merhaba')
+        self.assertEqual(job['status'], 'queued')
+        done = wait_for_status(runner, job['id'])
+        self.assertEqual((done['status'], done['result']['answer']), ('done', 'MERHABA'))
+
+        failed = wait_for_status(runner, runner.submit('hata')['id'])
+        self.assertEqual((failed['status'], failed['error']), ('failed', 'Could not generate response'))
+        self.assertIsNone(runner.get('bilinmeyen'))
+
+    def test_queue_limit(self):
+        async def slow(question):
+            await asyncio.sleep(1)
+
+        runner = JobRunner(MemoryJobStore(), slow, {'workers': 1, 'max_queued': 2})
+        runner.start()
+        self.assertIsNotNone(runner.submit('a'))
+        self.assertIsNotNone(runner.submit('b'))
+        self.assertIsNone(runner.submit('c'))
+        self.assertEqual(runner.get_stats()['rejected'], 1)
+
+    def test_expired_jobs_are_hidden(self):
+        runner = JobRunner(MemoryJobStore(), answer, {'ttl': 0})
+        runner.start()
+        job = runner.submit('merhaba')
+        time.sleep(0.1)
+        self.assertIsNone(runner.get(job['id']))
+
+
+class TestSQLiteJobStore(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+
+    def tearDown(self):
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def test_jobs_survive_a_new_store(self):
+        store = SQLiteJobStore(self.path)
+        store.create('1', 'soru')
+        store.update('1', status='done', result={'answer': 'yanıt'})
+
+        job = SQLiteJobStore(self.path).get('1')
+        self.assertEqual((job['status'], job['result']), ('done', {'answer': 'yanıt'}))
+
+    def test_unfinished_jobs_are_claimed_once(self):
+        store = SQLiteJobStore(self.path)
+        store.create('1', 'soru', 'stopped', time.time() - 1)
+        store.update('1', status='running')
+        store.create('2', 'bitti', 'stopped', time.time() - 1)
+        store.update('2', status='done', result={})
+        store.create('3', 'canlı', 'alive', time.time() + 60)
+
+        claimed = store.claim_stale('new', time.time() + 60)
+        self.assertEqual([job['id'] for job in claimed], ['1'])
+        self.assertEqual((store.get('1')['status'], store.get('1')['owner']), ('queued', 'new'))
+        # Claiming takes a fresh lease, so another worker does not take it too
+        self.assertEqual(SQLiteJobStore(self.path).claim_stale('other', time.time() + 60), [])
+
+    def test_live_runner_keeps_its_queued_jobs(self):
+        async def slow(question):
+            await asyncio.sleep(0.6)
+            return {'answer': question}
+
+        config = {'store': 'sqlite', 'workers': 1, 'stale_after': 0.2}
+        first = JobRunner(SQLiteJobStore(self.path), slow, config)
+        first.start()
+        running = first.submit('bir')
+        waiting = first.submit('iki')
+        # Past stale_after: without lease renewal both jobs would look abandoned
+        time.sleep(0.4)
+
+        second = JobRunner(SQLiteJobStore(self.path), slow, config)
+        second.start()
+
+        self.assertEqual(second.get_stats()['recovered'], 0)
+        self.assertEqual(second.get(waiting['id'])['owner'], first.owner)
+        self.assertEqual(wait_for_status(first, running['id'])['status'], 'done')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+from src.utils.json_output import parse_json, repair_json, validate
+from src.utils.metrics import JSON_PARSES
+
+
+GRADING_SCHEMA = {
+    'type': 'object',
+    'required': ['is_useful', 'relevance_score'],
+    'properties': {
+        'is_useful': {'type': 'boolean'},
+        'relevance_score': {'type': 'number', 'minimum': 0, 'maximum': 1}
+    }
+}
+
+
+class TestRepair(unittest.TestCase):
+    def test_code_fence_and_prose_are_stripped(self):
+        text = 'Değerlendirme:\n```json\n{"is_useful": true}\n```\nUmarım yardımcı olur.'
+        self.assertEqual(repair_json(text), '{"is_useful": true}')
+
+    def test_value_is_cut_from_surrounding_prose(self):
+        self.assertEqual(repair_json('Yanıt: {"a": 1} bitti'), '{"a": 1}')
+
+    def test_trailing_commas_are_dropped(self):
+        self.assertEqual(repair_json('{"a": [1, 2,], "b": 3,}'), '{"a": [1, 2], "b": 3}')
+
+    def test_python_literals_become_json(self):
+        self.assertEqual(repair_json('{"a": True, "b": None}'), '{"a": true, "b": null}')
+
+    def test_strings_are_untouched(self):
+        text = '{"text": "True, None,}", "ok": False}'
+        self.assertEqual(repair_json(text), '{"text": "True, None,}", "ok": false}')
+
+
+class TestValidate(unittest.TestCase):
+    def test_valid_data(self):
+        self.assertIsNone(validate({'is_useful': True, 'relevance_score': 0.8}, GRADING_SCHEMA))
+
+    def test_missing_required_key(self):
+        self.assertEqual(validate({'is_useful': True}, GRADING_SCHEMA), '$: missing relevance_score')
+
+    def test_wrong_type_and_range(self):
+        self.assertIn('expected boolean', validate({'is_useful': 'yes', 'relevance_score': 0.8}, GRADING_SCHEMA))
+        self.assertIn('above 1', validate({'is_useful': True, 'relevance_score': 8}, GRADING_SCHEMA))
+
+    def test_boolean_is_not_a_number(self):
+        self.assertIsNotNone(validate(True, {'type': 'number'}))
+
+    def test_items_and_enum(self):
+        schema = {'type': 'array', 'items': {'enum': ['a', 'b']}}
+        self.assertIsNone(validate(['a', 'b'], schema))
+        self.assertEqual(validate(['a', 'c'], schema), "$[1]: 'c' is not one of ['a', 'b']")
+
+
+class TestParse(unittest.TestCase):
+    def _count(self, result):
+        return JSON_PARSES.get(expert='test', stage='grading', result=result)
+
+    def test_results_are_counted(self):
+        cases = [
+            ('{"is_useful": true, "relevance_score": 0.9}', 'valid'),
+            ('{"is_useful": True, "relevance_score": 0.9,}', 'repaired'),
+            ('Değerlendirme yapamadım.', 'invalid'),
+            ('{"is_useful": true}', 'schema_mismatch')
+        ]
+        for text, expected in cases:
+            before = self._count(expected)
+
+            data, result = parse_json(text, GRADING_SCHEMA, expert='test', stage='grading')
+
+            self.assertEqual(result, expected)
+            self.assertEqual(data is not None, expected in ('valid', 'repaired'))
+            self.assertEqual(self._count(expected), before + 1)
+
+    def test_empty_output_is_invalid(self):
+        self.assertEqual(parse_json(None), (None, 'invalid'))
+
+
+if __name__ == '__main__':
+    unittest.main()
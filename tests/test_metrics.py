@@ -0,0 +1,59 @@
+import unittest
+
+from src.utils.cache import Cache
+from src.utils.metrics import MetricsRegistry, CACHE_LOOKUPS
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_renders_labels(self):
+        counter = self.registry.counter('llm_calls_total', 'Calls', ('expert', 'model'))
+        counter.inc(expert='sports', model='gpt-4')
+        counter.inc(2, expert='sports', model='gpt-4')
+        counter.inc(expert='say "hi"', model='gpt-4')
+
+        text = self.registry.render()
+        self.assertIn('# TYPE llm_calls_total counter', text)
+        self.assertIn('llm_calls_total{expert="sports",model="gpt-4"} 3', text)
+        self.assertIn('llm_calls_total{expert="say \\"hi\\"",model="gpt-4"} 1', text)
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = self.registry.histogram('stage_seconds', 'Stage time', ('stage',), buckets=(0.1, 1.0))
+        histogram.observe(0.05, stage='url')
+        histogram.observe(0.5, stage='url')
+        histogram.observe(5.0, stage='url')
+
+        text = self.registry.render()
+        self.assertIn('stage_seconds_bucket{stage="url",le="0.1"} 1', text)
+        self.assertIn('stage_seconds_bucket{stage="url",le="1.0"} 2', text)
+        self.assertIn('stage_seconds_bucket{stage="url",le="+Inf"} 3', text)
+        self.assertIn('stage_seconds_count{stage="url"} 3', text)
+        self.assertIn('stage_seconds_sum{stage="url"} 5.55', text)
+
+    def test_timer_observes(self):
+        histogram = self.registry.histogram('block_seconds', 'Block time', ('stage',))
+        with histogram.time(stage='routing'):
+            pass
+
+        self.assertEqual(histogram.get_count(stage='routing'), 1)
+
+    def test_registering_twice_returns_the_same_metric(self):
+        first = self.registry.counter('errors_total', 'Errors')
+        self.assertIs(self.registry.counter('errors_total', 'Errors'), first)
+
+
+class TestCacheMetrics(unittest.TestCase):
+    def test_cache_counts_hits_and_misses(self):
+        cache = Cache(name='metrics-test')
+        cache.get('soru')
+        cache.set('soru', 'yanıt')
+        cache.get('soru')
+
+        self.assertEqual(CACHE_LOOKUPS.get(expert='metrics-test', result='miss'), 1)
+        self.assertEqual(CACHE_LOOKUPS.get(expert='metrics-test', result='hit'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,421 @@
+import os
+import asyncio
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import PropertyMock, patch
+
+import httpx
+import openai
+
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+
+from src.utils import openai_client
+from src.utils.metrics import JSON_PARSES
+from src.utils.rate_limiter import RateLimiter
+from src.utils.openai_client import CompletionResult, OpenAIClient, get_pooled_client
+
+
+class TestClientPool(unittest.TestCase):
+    def test_clients_share_one_pool_per_loop(self):
+        async def pooled():
+            first = OpenAIClient(model='gpt-4', name='sports')
+            second = OpenAIClient(model='gpt-3.5-turbo', name='router')
+            return first.client, second.client
+
+        first, second = asyncio.run(pooled())
+        self.assertIs(first, second)
+
+    def test_endpoints_get_separate_pools(self):
+        async def pooled():
+            return get_pooled_client('key', 'http://a/v1'), get_pooled_client('key', 'http://b/v1')
+
+        first, second = asyncio.run(pooled())
+        self.assertIsNot(first, second)
+
+    def test_closed_loops_are_dropped(self):
+        async def pooled():
+            return asyncio.get_running_loop(), OpenAIClient().client
+
+        first_loop, first = asyncio.run(pooled())
+        second_loop, second = asyncio.run(pooled())
+
+        self.assertIsNot(first, second)
+        self.assertNotIn(first_loop, openai_client._pools)
+        self.assertIn(second_loop, openai_client._pools)
+
+
+class TestRequestOptions(unittest.TestCase):
+    def test_per_call_overrides(self):
+        client = OpenAIClient(model='gpt-4', max_tokens=300, temperature=0.7, timeout=30.0)
+
+        self.assertEqual(
+            client._request_options(None, None, None, None),
+            {'model': 'gpt-4', 'max_tokens': 300, 'temperature': 0.7, 'timeout': 30.0}
+        )
+        self.assertEqual(
+            client._request_options('gpt-3.5-turbo', 50, 0.0, 2.0),
+            {'model': 'gpt-3.5-turbo', 'max_tokens': 50, 'temperature': 0.0, 'timeout': 2.0}
+        )
+
+
+class TestRetries(unittest.TestCase):
+    def setUp(self):
+        openai_client._breakers.clear()
+        self.addCleanup(openai_client._breakers.clear)
+        delays = patch.dict(openai_client.RETRY_CONFIG, {'base_delay': 0.0, 'max_delay': 0.0})
+        delays.start()
+        self.addCleanup(delays.stop)
+
+    def _client(self, outcomes):
+        client = OpenAIClient(model='gpt-4', name='sports')
+        calls = []
+
+        async def attempt(system_prompt, user_prompt, options, timeout, estimate=0):
+            calls.append(timeout)
+            return outcomes.pop(0)
+
+        client._attempt = attempt
+        return client, calls
+
+    def test_transient_failure_is_retried(self):
+        client, calls = self._client([
+            CompletionResult(CompletionResult.RATE_LIMITED),
+            CompletionResult(CompletionResult.OK, text='yanıt')
+        ])
+
+        result = asyncio.run(client.complete('system', 'user'))
+
+        self.assertTrue(result.ok)
+        self.assertEqual(result.attempts, 2)
+        self.assertEqual(len(calls), 2)
+
+    def test_request_errors_are_not_retried(self):
+        client, calls = self._client([CompletionResult(CompletionResult.REQUEST_ERROR)])
+
+        result = asyncio.run(client.complete('system', 'user'))
+
+        self.assertEqual(result.status, CompletionResult.REQUEST_ERROR)
+        self.assertEqual(len(calls), 1)
+
+    def test_retry_after_beyond_budget_gives_up(self):
+        client, calls = self._client([CompletionResult(CompletionResult.RATE_LIMITED, retry_after=60.0)])
+
+        result = asyncio.run(client.complete('system', 'user', timeout=1.0))
+
+        self.assertEqual(result.status, CompletionResult.RATE_LIMITED)
+        self.assertEqual(len(calls), 1)
+
+    def test_open_circuit_fails_fast(self):
+        with patch.dict(openai_client.RETRY_CONFIG, {'failure_threshold': 3}):
+            client, calls = self._client([CompletionResult(CompletionResult.UPSTREAM_ERROR)] * 4)
+
+            first = asyncio.run(client.complete('system', 'user'))
+            second = asyncio.run(client.complete('system', 'user'))
+
+        self.assertEqual(first.status, CompletionResult.UPSTREAM_ERROR)
+        self.assertEqual(second.status, CompletionResult.CIRCUIT_OPEN)
+        self.assertTrue(second.upstream_down)
+        self.assertEqual(len(calls), 3)
+
+    def test_rate_limited_locally_is_not_sent(self):
+        client, calls = self._client([CompletionResult(CompletionResult.OK, text='yanıt')])
+        limiter = RateLimiter(60, 1000)
+        limiter.tokens.level = 0
+
+        with patch.object(openai_client, '_limiter', limiter):
+            result = asyncio.run(client.complete('system', 'user', timeout=0.5))
+
+        self.assertEqual(result.status, CompletionResult.THROTTLED)
+        self.assertEqual(calls, [])
+        self.assertEqual(openai_client.get_breaker(client.pool_key[0], 'gpt-4').state, 'closed')
+
+    def test_error_classification(self):
+        request = httpx.Request('POST', 'https://api.openai.com/v1/chat/completions')
+        limited = openai.RateLimitError(
+            'slow down', response=httpx.Response(429, request=request, headers={'retry-after': '2'}), body=None
+        )
+        server = openai.InternalServerError('boom', response=httpx.Response(500, request=request), body=None)
+        bad = openai.BadRequestError('bad', response=httpx.Response(400, request=request), body=None)
+
+        self.assertEqual(OpenAIClient._classify_error(limited).retry_after, 2.0)
+        self.assertEqual(OpenAIClient._classify_error(server).status, CompletionResult.UPSTREAM_ERROR)
+        self.assertEqual(OpenAIClient._classify_error(bad).status, CompletionResult.REQUEST_ERROR)
+        self.assertEqual(
+            OpenAIClient._classify_error(openai.APITimeoutError(request)).status, CompletionResult.TIMEOUT
+        )
+
+
+class TestCompletionCache(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        config = patch.dict(openai_client.COMPLETION_CACHE_CONFIG)
+        config.start()
+        self.addCleanup(config.stop)
+        openai_client.configure_completion_cache({'enabled': True, 'path': os.path.join(directory.name, 'c.sqlite3')})
+        self.addCleanup(setattr, openai_client, '_completion_cache', None)
+
+    def _client(self, cache=True):
+        client = OpenAIClient(model='gpt-4', name='router', cache=cache)
+        calls = []
+
+        async def complete(system_prompt, user_prompt, options):
+            calls.append(options)
+            return CompletionResult(CompletionResult.OK, text='sports', tokens=120)
+
+        client._complete = complete
+        return client, calls
+
+    def test_repeat_is_served_from_cache(self):
+        client, calls = self._client()
+
+        first = asyncio.run(client.complete('route', 'Maç kaç kaç bitti?'))
+        second = asyncio.run(client.complete('route', 'Maç kaç kaç bitti?'))
+
+        self.assertFalse(first.cached)
+        self.assertTrue(second.cached)
+        self.assertEqual(second.text, 'sports')
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(client.usage['tokens_saved'], 120)
+
+    def test_key_covers_model_and_temperature(self):
+        client, calls = self._client()
+
+        asyncio.run(client.complete('route', 'soru'))
+        asyncio.run(client.complete('route', 'soru', model='gpt-3.5-turbo'))
+        asyncio.run(client.complete('route', 'soru', temperature=0.0))
+
+        self.assertEqual(len(calls), 3)
+
+    def test_bypass_refreshes_the_entry(self):
+        client, calls = self._client()
+
+        asyncio.run(client.complete('route', 'soru'))
+        refreshed = asyncio.run(client.complete('route', 'soru', bypass_cache=True))
+
+        self.assertFalse(refreshed.cached)
+        self.assertEqual(len(calls), 2)
+
+    def test_clients_must_opt_in(self):
+        client, calls = self._client(cache=False)
+
+        asyncio.run(client.complete('grade', 'docs'))
+        asyncio.run(client.complete('grade', 'docs'))
+        self.assertEqual(len(calls), 2)
+
+        asyncio.run(client.complete('grade', 'docs', cache_ttl=60))
+        self.assertTrue(asyncio.run(client.complete('grade', 'docs', cache_ttl=60)).cached)
+
+
+class TestJsonCompletion(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        config = patch.dict(openai_client.COMPLETION_CACHE_CONFIG)
+        config.start()
+        self.addCleanup(config.stop)
+        openai_client.configure_completion_cache({'enabled': True, 'path': os.path.join(directory.name, 'c.sqlite3')})
+        self.addCleanup(setattr, openai_client, '_completion_cache', None)
+
+    def _client(self, text, model='gpt-4-1106-preview'):
+        client = OpenAIClient(model=model, name='sports')
+        calls = []
+
+        async def complete(system_prompt, user_prompt, options):
+            calls.append(options)
+            return CompletionResult(CompletionResult.OK, text=text, tokens=50)
+
+        client._complete = complete
+        return client, calls
+
+    def test_json_mode_only_where_supported(self):
+        client, calls = self._client('{"is_useful": true}')
+        asyncio.run(client.complete_json('grade as JSON', 'docs'))
+        legacy, legacy_calls = self._client('{"is_useful": true}', model='gpt-4')
+        asyncio.run(legacy.complete_json('grade as JSON', 'docs'))
+
+        self.assertEqual(calls[0]['response_format'], {'type': 'json_object'})
+        self.assertNotIn('response_format', legacy_calls[0])
+
+    def test_repaired_output_is_decoded(self):
+        client, _ = self._client('```json\n{"is_useful": True, "reason": "ok",}\n```')
+
+        result = asyncio.run(client.complete_json('grade as JSON', 'docs'))
+
+        self.assertTrue(result.ok)
+        self.assertEqual(result.data, {'is_useful': True, 'reason': 'ok'})
+
+    def test_schema_mismatch_is_invalid_and_not_cached(self):
+        client, calls = self._client('{"reason": "eksik"}')
+        schema = {'type': 'object', 'required': ['is_useful']}
+
+        first = asyncio.run(client.complete_json('grade as JSON', 'docs', schema=schema, cache_ttl=60))
+        asyncio.run(client.complete_json('grade as JSON', 'docs', schema=schema, cache_ttl=60))
+
+        self.assertEqual(first.status, CompletionResult.INVALID_OUTPUT)
+        self.assertFalse(first.upstream_down)
+        self.assertIsNone(first.data)
+        self.assertEqual(len(calls), 2)
+
+    def test_cached_output_is_decoded(self):
+        client, calls = self._client('{"is_useful": false}')
+
+        asyncio.run(client.complete_json('grade as JSON', 'docs', cache_ttl=60))
+        parses = JSON_PARSES.get(expert=client.name, stage='json', result='valid')
+        second = asyncio.run(client.complete_json('grade as JSON', 'docs', cache_ttl=60))
+
+        self.assertTrue(second.cached)
+        self.assertEqual(second.data, {'is_useful': False})
+        self.assertEqual(len(calls), 1)
+        # A cache hit is not parsed, or counted, a second time
+        self.assertEqual(JSON_PARSES.get(expert=client.name, stage='json', result='valid'), parses)
+
+
+class TestHedging(unittest.TestCase):
+    def setUp(self):
+        openai_client._breakers.clear()
+        self.addCleanup(openai_client._breakers.clear)
+        config = patch.dict(openai_client.HEDGE_CONFIG)
+        config.start()
+        self.addCleanup(config.stop)
+        openai_client.configure_hedging({'enabled': True, 'min_samples': 1, 'min_delay': 0.05})
+        self.addCleanup(openai_client._hedge_policies.clear)
+
+    def test_slow_call_is_hedged_and_loser_cancelled(self):
+        client = OpenAIClient(model='gpt-4', name='sports', hedge=True)
+        policy = openai_client.get_hedge_policy(client.pool_key[0], 'gpt-4')
+        policy.record(0.05)
+        delays = [5.0, 0.0]
+        cancelled = []
+
+        async def attempt(system_prompt, user_prompt, options, timeout, estimate=0):
+            delay = delays.pop(0)
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                cancelled.append(delay)
+                raise
+            return CompletionResult(CompletionResult.OK, text=f'{delay}')
+
+        client._attempt = attempt
+        result = asyncio.run(client.complete('system', 'user', timeout=10.0))
+
+        self.assertEqual(result.text, '0.0')
+        self.assertEqual(cancelled, [5.0])
+        self.assertEqual(policy.get_stats()['won'], 1)
+
+    def test_fast_call_is_not_hedged(self):
+        client = OpenAIClient(model='gpt-4', name='sports', hedge=True)
+        policy = openai_client.get_hedge_policy(client.pool_key[0], 'gpt-4')
+        policy.record(0.05)
+        calls = []
+
+        async def attempt(system_prompt, user_prompt, options, timeout, estimate=0):
+            calls.append(timeout)
+            return CompletionResult(CompletionResult.OK, text='hızlı')
+
+        client._attempt = attempt
+        asyncio.run(client.complete('system', 'user'))
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(policy.get_stats()['fired'], 0)
+
+    def test_rate_limited_hedge_is_refunded(self):
+        client = OpenAIClient(model='gpt-4', name='sports', hedge=True)
+        policy = openai_client.get_hedge_policy(client.pool_key[0], 'gpt-4')
+        policy.record(0.05)
+        calls = []
+
+        async def attempt(system_prompt, user_prompt, options, timeout, estimate=0):
+            calls.append(timeout)
+            await asyncio.sleep(0.2)
+            return CompletionResult(CompletionResult.OK, text='yavaş')
+
+        async def throttle(tokens, timeout):
+            # The limiter admits the first request but has nothing left for an immediate hedge
+            return timeout > 0
+
+        client._attempt = attempt
+        client._throttle = throttle
+        tokens = policy._tokens
+        asyncio.run(client.complete('system', 'user'))
+
+        stats = policy.get_stats()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((stats['fired'], stats['throttled']), (0, 1))
+        self.assertGreaterEqual(policy._tokens, tokens)
+
+
+class FakeStream:
+    def __init__(self, deltas):
+        self.deltas = deltas
+        self.sent = 0
+        self.response = SimpleNamespace(aclose=self._close)
+        self.closed = False
+
+    async def _close(self):
+        self.closed = True
+
+    async def __aiter__(self):
+        for delta in self.deltas:
+            self.sent += 1
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))])
+
+
+class TestStreaming(unittest.TestCase):
+    def setUp(self):
+        openai_client._breakers.clear()
+        self.addCleanup(openai_client._breakers.clear)
+        delays = patch.dict(openai_client.RETRY_CONFIG, {'base_delay': 0.0, 'max_delay': 0.0})
+        delays.start()
+        self.addCleanup(delays.stop)
+
+    def _stream(self, outcomes, consume):
+        async def create(**kwargs):
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        fake = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        with patch.object(OpenAIClient, 'client', new_callable=PropertyMock, return_value=fake):
+            return asyncio.run(consume(OpenAIClient(name='sports')))
+
+    def test_max_chars_stops_generation(self):
+        stream = FakeStream(['Fener', 'bahçe ', 'yarın ', 'oynuyor'])
+
+        async def consume(client):
+            return [chunk async for chunk in client.stream_completion('system', 'user', max_chars=10)]
+
+        chunks = self._stream([stream], consume)
+
+        self.assertEqual(''.join(chunks), 'Fenerbahçe')
+        self.assertEqual(stream.sent, 2)
+        self.assertTrue(stream.closed)
+
+    def test_consumer_stopping_closes_the_response(self):
+        stream = FakeStream(['bir', 'iki', 'üç'])
+
+        async def consume(client):
+            chunks = client.stream_completion('system', 'user')
+            first = await chunks.__anext__()
+            await chunks.aclose()
+            return first
+
+        self.assertEqual(self._stream([stream], consume), 'bir')
+        self.assertTrue(stream.closed)
+        self.assertEqual(openai_client.get_breaker(openai_client.DEFAULT_BASE_URL, 'gpt-4').state, 'closed')
+
+    def test_failure_before_first_delta_is_retried(self):
+        request = httpx.Request('POST', 'https://api.openai.com/v1/chat/completions')
+        stream = FakeStream(['tamam'])
+
+        async def consume(client):
+            return [chunk async for chunk in client.stream_completion('system', 'user')]
+
+        self.assertEqual(self._stream([openai.APIConnectionError(request=request), stream], consume), ['tamam'])
+
+
+if __name__ == '__main__':
+    unittest.main()
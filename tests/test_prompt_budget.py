@@ -0,0 +1,66 @@
+import unittest
+from unittest.mock import patch
+
+from src.utils import prompt_budget
+from src.utils.prompt_budget import PromptBuilder, context_window, count_tokens, rank_by_query
+
+
+class TestPromptBuilder(unittest.TestCase):
+    def setUp(self):
+        # Count with the character heuristic, whether or not tiktoken is installed
+        for patcher in (patch.object(prompt_budget, 'tiktoken', None), patch.dict(prompt_budget._encodings, clear=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_context_window_by_prefix(self):
+        self.assertEqual(context_window('gpt-4'), 8192)
+        self.assertEqual(context_window('gpt-4-32k-0613'), 32768)
+        self.assertEqual(context_window('gpt-3.5-turbo-16k'), 16385)
+        self.assertEqual(context_window('unknown'), prompt_budget.DEFAULT_CONTEXT_WINDOW)
+
+    def test_budget_leaves_room_for_completion(self):
+        builder = PromptBuilder(model='gpt-4', max_tokens=300)
+        system_prompt = 'x' * 300
+
+        self.assertEqual(
+            builder.budget(system_prompt), 8192 - 300 - prompt_budget.MESSAGE_OVERHEAD - count_tokens(system_prompt)
+        )
+
+    def test_documents_fit_in_priority_order(self):
+        builder = PromptBuilder(max_prompt_tokens=prompt_budget.MESSAGE_OVERHEAD + 200, min_document_tokens=20)
+        documents = ['birinci ' * 30, 'ikinci ' * 60, 'üçüncü ' * 40]
+
+        packed = builder.pack(documents, stage='grading')
+
+        self.assertEqual(packed.documents[0], documents[0])
+        self.assertTrue(packed.truncated)
+        self.assertTrue(packed.documents[1].startswith('ikinci'))
+        self.assertLess(len(packed.documents[1]), len(documents[1]))
+        self.assertEqual(packed.dropped, 1)
+        self.assertLessEqual(packed.tokens, 200)
+        self.assertGreater(packed.dropped_tokens, count_tokens(documents[2]))
+
+    def test_small_remainder_drops_instead_of_cutting(self):
+        builder = PromptBuilder(max_prompt_tokens=prompt_budget.MESSAGE_OVERHEAD + 100, min_document_tokens=50)
+
+        packed = builder.pack(['a' * 270, 'b' * 600])
+
+        self.assertEqual(len(packed.documents), 1)
+        self.assertFalse(packed.truncated)
+        self.assertEqual(packed.dropped, 1)
+
+    def test_everything_fits(self):
+        packed = PromptBuilder().pack(['kısa', 'doküman'], 'sistem')
+
+        self.assertEqual(packed.join(), 'kısa\ndoküman')
+        self.assertEqual(packed.dropped_tokens, 0)
+
+    def test_rank_by_query(self):
+        paragraphs = ['Menü', 'Fenerbahçe maçı yarın 19:00da', 'İletişim']
+
+        self.assertEqual(rank_by_query(paragraphs, 'fenerbahce maçı ne zaman?')[0], paragraphs[1])
+        self.assertEqual(rank_by_query(paragraphs, 'alakasız'), paragraphs)
+
+
+if __name__ == '__main__':
+    unittest.main()
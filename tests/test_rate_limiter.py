@@ -0,0 +1,62 @@
+import asyncio
+import unittest
+
+from src.utils import rate_limiter
+from src.utils.rate_limiter import RateLimiter
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_waits_for_request_budget(self):
+        # 600 requests per minute: a full bucket of 600, then one every 0.1s
+        limiter = RateLimiter(600, 1000000, poll_interval=0.01)
+        limiter.requests.level = 0
+
+        waited = asyncio.run(limiter.acquire(10))
+
+        self.assertGreater(waited, 0.05)
+        self.assertEqual(limiter.get_stats()['waited'], 1)
+
+    def test_token_budget_gives_up_past_timeout(self):
+        limiter = RateLimiter(1000, 600, poll_interval=0.01)
+        limiter.tokens.level = 0
+
+        waited = asyncio.run(limiter.acquire(500, timeout=0.1))
+
+        self.assertIsNone(waited)
+        stats = limiter.get_stats()
+        self.assertEqual(stats['timed_out'], 1)
+        self.assertEqual(stats['queued'], 0)
+
+    def test_interactive_goes_before_background(self):
+        limiter = RateLimiter(600, 1000000, poll_interval=0.01)
+        limiter.requests.level = 0
+        order = []
+
+        async def call(name, priority):
+            await limiter.acquire(1, priority=priority)
+            order.append(name)
+
+        async def run():
+            background = asyncio.ensure_future(call('background', rate_limiter.BACKGROUND))
+            await asyncio.sleep(0.02)
+            await asyncio.gather(background, call('interactive', rate_limiter.INTERACTIVE))
+
+        asyncio.run(run())
+        self.assertEqual(order, ['interactive', 'background'])
+
+    def test_priority_context(self):
+        self.assertEqual(rate_limiter.current_priority(), rate_limiter.INTERACTIVE)
+        with rate_limiter.priority(rate_limiter.BACKGROUND):
+            self.assertEqual(rate_limiter.current_priority(), rate_limiter.BACKGROUND)
+        self.assertEqual(rate_limiter.current_priority(), rate_limiter.INTERACTIVE)
+
+    def test_settle_returns_unused_tokens(self):
+        limiter = RateLimiter(100, 1000)
+        asyncio.run(limiter.acquire(400))
+        limiter.settle(400, 100)
+
+        self.assertGreaterEqual(limiter.get_stats()['tokens_available'], 700)
+
+
+if __name__ == '__main__':
+    unittest.main()
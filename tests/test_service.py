@@ -0,0 +1,49 @@
+import os
+import sys
+import unittest
+import subprocess
+
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+
+from src.api import ExpertService
+
+
+class TestReadiness(unittest.TestCase):
+    def test_health_never_builds_the_expert_system(self):
+        service = ExpertService()
+        payload, status = service.health()
+
+        self.assertEqual(status, 503)
+        self.assertEqual(payload['status'], 'unhealthy')
+        self.assertIsNone(service.expert_system)
+
+    def test_ready_after_init(self):
+        service = ExpertService()
+        service.ready = True
+        service.expert_system = {}
+
+        self.assertTrue(service.init())
+        self.assertEqual(service.health()[1], 200)
+
+
+class TestLazyExperts(unittest.TestCase):
+    def test_init_imports_no_expert(self):
+        # A fresh interpreter: other tests have imported the experts already
+        script = (
+            "import sys\n"
+            "from src.api import ExpertService\n"
+            "service = ExpertService()\n"
+            "assert service.init()\n"
+            "print('loaded:' + ','.join(m for m in sys.modules if m.startswith('src.experts.') and m.endswith('.expert')))\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = {**os.environ, 'OPENAI_API_KEY': 'test-key'}
+        result = subprocess.run([sys.executable, '-c', script], cwd=root, env=env,
+                                capture_output=True, text=True, timeout=60)
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip().splitlines()[-1], 'loaded:')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import asyncio
+import unittest
+
+from src.utils.single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.group = SingleFlight()
+        self.runs = 0
+
+    async def compute(self, value, delay=0.01):
+        self.runs += 1
+        await asyncio.sleep(delay)
+        return value
+
+    def test_concurrent_duplicates_share_one_run(self):
+        async def run():
+            return await asyncio.gather(
+                *(self.group.do('q', lambda: self.compute('cevap')) for _ in range(5)),
+                self.group.do('other', lambda: self.compute('başka'))
+            )
+
+        self.assertEqual(asyncio.run(run()), ['cevap'] * 5 + ['başka'])
+        self.assertEqual(self.runs, 2)
+        stats = self.group.get_stats()
+        self.assertEqual((stats['calls'], stats['coalesced'], stats['in_flight']), (6, 4, 0))
+
+    def test_sequential_calls_run_again(self):
+        asyncio.run(self.group.do('q', lambda: self.compute(1)))
+        asyncio.run(self.group.do('q', lambda: self.compute(2)))
+        self.assertEqual(self.runs, 2)
+
+    def test_exception_reaches_every_waiter(self):
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError('boom')
+
+        async def run():
+            return await asyncio.gather(*(self.group.do('q', fail) for _ in range(3)), return_exceptions=True)
+
+        self.assertTrue(all(isinstance(r, ValueError) for r in asyncio.run(run())))
+
+    def test_cancelled_waiter_keeps_shared_run(self):
+        async def run():
+            first = asyncio.ensure_future(self.group.do('q', lambda: self.compute('cevap', 0.05)))
+            second = asyncio.ensure_future(self.group.do('q', lambda: self.compute('x')))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await second
+
+        self.assertEqual(asyncio.run(run()), 'cevap')
+        self.assertEqual(self.runs, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()